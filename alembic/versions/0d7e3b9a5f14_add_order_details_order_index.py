@@ -0,0 +1,26 @@
+"""add order_details order_id index
+
+Revision ID: 0d7e3b9a5f14
+Revises: f61a2c8e4b97
+Create Date: 2026-10-18 19:02:11.384517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0d7e3b9a5f14'
+down_revision: Union[str, None] = 'f61a2c8e4b97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_order_details_order_id', 'order_details', ['order_id', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_order_details_order_id', table_name='order_details')
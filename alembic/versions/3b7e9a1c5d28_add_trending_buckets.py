@@ -0,0 +1,34 @@
+"""add trending buckets
+
+Revision ID: 3b7e9a1c5d28
+Revises: 9e4b7c2a6d05
+Create Date: 2026-10-18 22:14:06.381527
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e9a1c5d28'
+down_revision: Union[str, None] = '9e4b7c2a6d05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'trending_buckets',
+        sa.Column('summary_id', sa.Integer(), nullable=False),
+        sa.Column('bucket', sa.Integer(), nullable=False),
+        sa.Column('weight', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('summary_id', 'bucket'),
+    )
+    op.create_index('ix_trending_buckets_bucket', 'trending_buckets', ['bucket'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_trending_buckets_bucket', table_name='trending_buckets')
+    op.drop_table('trending_buckets')
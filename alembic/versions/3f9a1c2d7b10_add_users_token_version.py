@@ -0,0 +1,26 @@
+"""add users.token_version
+
+Revision ID: 3f9a1c2d7b10
+Revises: 76366edb1115
+Create Date: 2026-10-18 09:12:41.203118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c2d7b10'
+down_revision: Union[str, None] = '76366edb1115'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
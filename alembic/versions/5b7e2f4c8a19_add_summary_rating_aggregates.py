@@ -0,0 +1,55 @@
+"""add summary rating aggregates
+
+Revision ID: 5b7e2f4c8a19
+Revises: 8d2e4b6a9c31
+Create Date: 2026-10-18 15:12:40.218374
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b7e2f4c8a19'
+down_revision: Union[str, None] = '8d2e4b6a9c31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('summaries', sa.Column('rating_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('summaries', sa.Column('rating_sum', sa.Float(), nullable=False, server_default='0'))
+    # Unique (user_id, summary_id): giữ rating mới nhất nếu đã có bản trùng
+    op.execute(
+        """
+        DELETE FROM ratings WHERE rating_id NOT IN (
+            SELECT keep_id FROM (
+                SELECT MAX(rating_id) AS keep_id FROM ratings GROUP BY user_id, summary_id
+            ) AS keep
+        )
+        """
+    )
+    # Backfill từ bảng ratings hiện có
+    op.execute(
+        """
+        UPDATE summaries SET
+            rating_count = (SELECT COUNT(*) FROM ratings r WHERE r.summary_id = summaries.id),
+            rating_sum = (SELECT COALESCE(SUM(r.score), 0) FROM ratings r WHERE r.summary_id = summaries.id)
+        """
+    )
+    op.execute(
+        "UPDATE summaries SET avg_rating = CASE WHEN rating_count > 0 THEN rating_sum / rating_count ELSE 0 END"
+    )
+    with op.batch_alter_table('ratings') as batch_op:
+        batch_op.create_unique_constraint('uq_ratings_user_summary', ['user_id', 'summary_id'])
+        batch_op.create_index('ix_ratings_summary_id', ['summary_id'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('ratings') as batch_op:
+        batch_op.drop_index('ix_ratings_summary_id')
+        batch_op.drop_constraint('uq_ratings_user_summary', type_='unique')
+    op.drop_column('summaries', 'rating_sum')
+    op.drop_column('summaries', 'rating_count')
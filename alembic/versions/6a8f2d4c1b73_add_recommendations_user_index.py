@@ -0,0 +1,30 @@
+"""add recommendations user/algorithm/score index
+
+Revision ID: 6a8f2d4c1b73
+Revises: 0d7e3b9a5f14
+Create Date: 2026-10-18 19:48:36.902441
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6a8f2d4c1b73'
+down_revision: Union[str, None] = '0d7e3b9a5f14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_recommendations_user_algorithm_score',
+        'recommendations',
+        ['user_id', 'algorithm_type', 'score'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recommendations_user_algorithm_score', table_name='recommendations')
@@ -0,0 +1,43 @@
+"""add SM-2 schedule to vocabulary flashcards
+
+Revision ID: 7c1f4e8a2b96
+Revises: 3b7e9a1c5d28
+Create Date: 2026-10-18 23:02:41.905318
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1f4e8a2b96'
+down_revision: Union[str, None] = '3b7e9a1c5d28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('vocabulary_flashcards', sa.Column('ease', sa.Float(), server_default='2.5', nullable=False))
+    op.add_column('vocabulary_flashcards', sa.Column('interval_days', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('vocabulary_flashcards', sa.Column('repetitions', sa.Integer(), server_default='0', nullable=False))
+    # Thẻ đã có đến hạn ngay. Backfill bằng giờ UTC tính ở đây chứ không dùng NOW():
+    # app ghi và so sánh due_at theo naive UTC, NOW() của MySQL theo time zone của session
+    op.add_column('vocabulary_flashcards', sa.Column('due_at', sa.DateTime(timezone=True), nullable=True))
+    op.get_bind().execute(
+        sa.text("UPDATE vocabulary_flashcards SET due_at = :now"),
+        {"now": datetime.now(timezone.utc).replace(tzinfo=None)},
+    )
+    with op.batch_alter_table('vocabulary_flashcards') as batch_op:
+        batch_op.alter_column('due_at', existing_type=sa.DateTime(timezone=True), nullable=False)
+    op.create_index('ix_vocabulary_flashcards_user_due', 'vocabulary_flashcards', ['user_id', 'due_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vocabulary_flashcards_user_due', table_name='vocabulary_flashcards')
+    op.drop_column('vocabulary_flashcards', 'due_at')
+    op.drop_column('vocabulary_flashcards', 'repetitions')
+    op.drop_column('vocabulary_flashcards', 'interval_days')
+    op.drop_column('vocabulary_flashcards', 'ease')
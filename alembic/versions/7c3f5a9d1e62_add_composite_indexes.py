@@ -0,0 +1,68 @@
+"""add composite indexes for router filters
+
+Revision ID: 7c3f5a9d1e62
+Revises: e2b8c6f1a957
+Create Date: 2026-10-18 16:58:12.447190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3f5a9d1e62'
+down_revision: Union[str, None] = 'e2b8c6f1a957'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# reading_history(user_id, summary_id) và ratings(summary_id) đã có từ các migration trước
+INDEXES = [
+    ('ix_summaries_status_id', 'summaries', ['status', 'id']),
+    ('ix_summaries_user_status', 'summaries', ['user_id', 'status']),
+    ('ix_summaries_book_id', 'summaries', ['book_id']),
+    ('ix_orders_user_id', 'orders', ['user_id', 'id']),
+    ('ix_comments_summary_id', 'comments', ['summary_id', 'id']),
+    ('ix_content_sections_summary_order', 'content_sections', ['summary_id', 'section_order', 'section_id']),
+    ('ix_notes_highlights_user_summary', 'notes_highlights', ['user_id', 'summary_id']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+    # Index mới bắt đầu bằng summary_id nên thay thế được index đơn (cả cho FK trên MySQL)
+    op.drop_index('ix_content_sections_summary_id', table_name='content_sections')
+
+    # Gộp cart item trùng trước khi thêm unique (cart_id, book_id)
+    op.execute(
+        """
+        UPDATE cart_items SET quantity = (
+            SELECT SUM(d.quantity) FROM (SELECT * FROM cart_items) AS d
+            WHERE d.cart_id = cart_items.cart_id AND d.book_id = cart_items.book_id
+        )
+        WHERE id IN (
+            SELECT keep_id FROM (
+                SELECT MAX(id) AS keep_id FROM cart_items GROUP BY cart_id, book_id HAVING COUNT(*) > 1
+            ) AS keep
+        )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM cart_items WHERE id NOT IN (
+            SELECT keep_id FROM (SELECT MAX(id) AS keep_id FROM cart_items GROUP BY cart_id, book_id) AS keep
+        )
+        """
+    )
+    with op.batch_alter_table('cart_items') as batch_op:
+        batch_op.create_unique_constraint('uq_cart_items_cart_book', ['cart_id', 'book_id'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('cart_items') as batch_op:
+        batch_op.drop_constraint('uq_cart_items_cart_book', type_='unique')
+    op.create_index('ix_content_sections_summary_id', 'content_sections', ['summary_id'])
+    for name, table, _columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
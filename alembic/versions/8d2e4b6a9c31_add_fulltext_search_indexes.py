@@ -0,0 +1,39 @@
+"""add fulltext search indexes
+
+Revision ID: 8d2e4b6a9c31
+Revises: 3f9a1c2d7b10
+Create Date: 2026-10-18 10:03:17.554902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2e4b6a9c31'
+down_revision: Union[str, None] = '3f9a1c2d7b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FULLTEXT_INDEXES = [
+    ('ft_summaries_title', 'summaries', 'title'),
+    ('ft_books_title', 'books', 'title'),
+    ('ft_authors_name', 'authors', 'name'),
+]
+
+
+def upgrade() -> None:
+    # FULLTEXT chỉ hỗ trợ trên MySQL; SQLite dùng inverted index trong process
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    for name, table, column in FULLTEXT_INDEXES:
+        op.create_index(name, table, [column], mysql_prefix='FULLTEXT')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    for name, table, _column in FULLTEXT_INDEXES:
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,67 @@
+"""add interaction event log and stored recommender model
+
+Revision ID: 9e4b7c2a6d05
+Revises: 6a8f2d4c1b73
+Create Date: 2026-10-18 20:37:52.614208
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4b7c2a6d05'
+down_revision: Union[str, None] = '6a8f2d4c1b73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'interaction_events',
+        sa.Column('event_id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('summary_id', sa.Integer(), nullable=True),
+        sa.Column('book_id', sa.Integer(), nullable=True),
+        sa.Column('source', sa.String(length=20), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('event_id'),
+    )
+    op.create_table(
+        'recommender_watermarks',
+        sa.Column('algorithm_type', sa.String(length=100), nullable=False),
+        sa.Column('last_event_id', sa.BigInteger(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('algorithm_type'),
+    )
+    op.create_table(
+        'summary_neighbors',
+        sa.Column('summary_id', sa.Integer(), nullable=False),
+        sa.Column('neighbor_id', sa.Integer(), nullable=False),
+        sa.Column('similarity', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['summary_id'], ['summaries.id']),
+        sa.ForeignKeyConstraint(['neighbor_id'], ['summaries.id']),
+        sa.PrimaryKeyConstraint('summary_id', 'neighbor_id'),
+    )
+    op.create_index('ix_summary_neighbors_neighbor_id', 'summary_neighbors', ['neighbor_id'])
+    op.create_table(
+        'summary_norms',
+        sa.Column('summary_id', sa.Integer(), nullable=False),
+        sa.Column('norm', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['summary_id'], ['summaries.id']),
+        sa.PrimaryKeyConstraint('summary_id'),
+    )
+    op.create_index('ix_reading_history_summary_id', 'reading_history', ['summary_id'])
+    op.create_index('ix_order_details_book_id', 'order_details', ['book_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_order_details_book_id', table_name='order_details')
+    op.drop_index('ix_reading_history_summary_id', table_name='reading_history')
+    op.drop_table('summary_norms')
+    op.drop_index('ix_summary_neighbors_neighbor_id', table_name='summary_neighbors')
+    op.drop_table('summary_neighbors')
+    op.drop_table('recommender_watermarks')
+    op.drop_table('interaction_events')
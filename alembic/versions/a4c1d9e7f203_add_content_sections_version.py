@@ -0,0 +1,28 @@
+"""add content_sections version
+
+Revision ID: a4c1d9e7f203
+Revises: 5b7e2f4c8a19
+Create Date: 2026-10-18 15:41:08.731552
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c1d9e7f203'
+down_revision: Union[str, None] = '5b7e2f4c8a19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('content_sections', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+    op.create_index('ix_content_sections_summary_id', 'content_sections', ['summary_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_content_sections_summary_id', table_name='content_sections')
+    op.drop_column('content_sections', 'version')
@@ -0,0 +1,26 @@
+"""add comments parent_comment_id index
+
+Revision ID: b9d4e1a6c358
+Revises: 7c3f5a9d1e62
+Create Date: 2026-10-18 17:31:45.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9d4e1a6c358'
+down_revision: Union[str, None] = '7c3f5a9d1e62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_comments_parent_comment_id', 'comments', ['parent_comment_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_comments_parent_comment_id', table_name='comments')
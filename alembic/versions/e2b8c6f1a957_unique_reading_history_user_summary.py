@@ -0,0 +1,57 @@
+"""unique reading_history per user and summary
+
+Revision ID: e2b8c6f1a957
+Revises: a4c1d9e7f203
+Create Date: 2026-10-18 16:20:51.904117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b8c6f1a957'
+down_revision: Union[str, None] = 'a4c1d9e7f203'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Gộp các dòng trùng vào dòng mới nhất: cộng time_spent, giữ progress_percent lớn nhất
+    op.execute(
+        """
+        UPDATE reading_history SET
+            time_spent = (
+                SELECT SUM(COALESCE(d.time_spent, 0)) FROM (SELECT * FROM reading_history) AS d
+                WHERE d.user_id = reading_history.user_id AND d.summary_id = reading_history.summary_id
+            ),
+            progress_percent = (
+                SELECT MAX(COALESCE(d.progress_percent, 0)) FROM (SELECT * FROM reading_history) AS d
+                WHERE d.user_id = reading_history.user_id AND d.summary_id = reading_history.summary_id
+            )
+        WHERE reading_id IN (
+            SELECT keep_id FROM (
+                SELECT MAX(reading_id) AS keep_id FROM reading_history
+                GROUP BY user_id, summary_id HAVING COUNT(*) > 1
+            ) AS keep
+        )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM reading_history WHERE reading_id NOT IN (
+            SELECT keep_id FROM (
+                SELECT MAX(reading_id) AS keep_id FROM reading_history GROUP BY user_id, summary_id
+            ) AS keep
+        )
+        """
+    )
+    with op.batch_alter_table('reading_history') as batch_op:
+        batch_op.create_unique_constraint('uq_reading_history_user_summary', ['user_id', 'summary_id'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('reading_history') as batch_op:
+        batch_op.drop_constraint('uq_reading_history_user_summary', type_='unique')
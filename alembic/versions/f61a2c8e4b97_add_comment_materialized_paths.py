@@ -0,0 +1,63 @@
+"""add materialized paths to comments and admin_comments
+
+Revision ID: f61a2c8e4b97
+Revises: b9d4e1a6c358
+Create Date: 2026-10-18 18:05:27.630841
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f61a2c8e4b97'
+down_revision: Union[str, None] = 'b9d4e1a6c358'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, primary key, index) — định dạng path giống app.services.comments
+TABLES = [
+    ('comments', 'id', 'ix_comments_path'),
+    ('admin_comments', 'comment_id', 'ix_admin_comments_path'),
+]
+PATH_WIDTH = 10
+CHUNK = 1000
+
+
+def _backfill(bind, table: str, pk: str) -> None:
+    parents = dict(bind.execute(sa.text(f"SELECT {pk}, parent_comment_id FROM {table}")).all())
+    paths: dict[int, str] = {}
+
+    def path_of(node: int) -> str:
+        # Đi lên tới root (không đệ quy để không vướng giới hạn stack với thread sâu)
+        chain = []
+        while node is not None and node not in paths:
+            chain.append(node)
+            node = parents.get(node)
+        prefix = paths.get(node, "") if node is not None else ""
+        for item in reversed(chain):
+            prefix += f"{item:0{PATH_WIDTH}d}/"
+            paths[item] = prefix
+        return paths[chain[0]] if chain else prefix
+
+    rows = [{"pk": node, "path": path_of(node)} for node in parents]
+    update = sa.text(f"UPDATE {table} SET path = :path WHERE {pk} = :pk")
+    for start in range(0, len(rows), CHUNK):
+        bind.execute(update, rows[start:start + CHUNK])
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for table, pk, index in TABLES:
+        op.add_column(table, sa.Column('path', sa.String(length=512), nullable=True))
+        _backfill(bind, table, pk)
+        op.create_index(index, table, ['path'])
+
+
+def downgrade() -> None:
+    for table, _pk, index in TABLES:
+        op.drop_index(index, table_name=table)
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('path')
@@ -1,39 +1,116 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
 
 from app.config import SECRET_KEY
 from app.core.security import ALGORITHM
-from app.database import get_db
+from app.core.principal_cache import ClaimsPrincipal, Principal, principal_cache, token_versions
+from app.database import get_async_db, get_db
 from app import models
-from typing import Any
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Any:
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _decode_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str | None = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
+        if payload.get("sub") is None:
+            raise _credentials_exception()
     except JWTError:
-        raise credentials_exception
-    user = db.get(models.user.User, int(user_id))
+        raise _credentials_exception()
+    return payload
+
+
+def _user_with_role(user_id: int):
+    # User + role trong một query để tạo Principal
+    return (
+        select(models.user.User)
+        .options(joinedload(models.user.User.role))
+        .filter(models.user.User.id == user_id)
+    )
+
+
+def _remember(token: str, user) -> Principal:
+    principal = Principal.from_user(user)
+    principal_cache.set(token, principal)
+    token_versions.set(principal.id, principal.token_version)
+    return principal
+
+
+def _load_principal(db: Session, user_id: int, token: str) -> Principal:
+    # Cache miss dùng chính session của request: mỗi request chỉ giữ một connection
+    principal = principal_cache.get(user_id, token)
+    if principal is not None:
+        return principal
+    user = db.execute(_user_with_role(user_id)).scalars().first()
     if user is None:
-        raise credentials_exception
-    return user
+        raise _credentials_exception()
+    return _remember(token, user)
 
 
-def require_admin(current_user = Depends(get_current_user)):
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Principal:
+    return _load_principal(db, int(_decode_token(token)["sub"]), token)
+
+
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> Principal:
+    """Async variant of get_current_user for `async def` routers"""
+    user_id = int(_decode_token(token)["sub"])
+    principal = principal_cache.get(user_id, token)
+    if principal is not None:
+        return principal
+    result = await db.execute(_user_with_role(user_id))
+    user = result.scalars().first()
+    if user is None:
+        raise _credentials_exception()
+    return _remember(token, user)
+
+
+def get_role_principal(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db),
+) -> ClaimsPrincipal | Principal:
+    """Authorize from signed role/version claims, falling back to the DB on version mismatch"""
+    payload = _decode_token(token)
+    user_id = int(payload["sub"])
+    version = payload.get("ver")
+    if "role" in payload and version is not None and token_versions.matches(user_id, version):
+        return ClaimsPrincipal(id=user_id, role_name=payload["role"])
+    return _load_principal(db, user_id, token)
+
+
+def bump_token_versions(db: Session, user_ids: list[int]) -> None:
+    """Invalidate role claims of already issued tokens (caller commits)"""
+    if user_ids:
+        db.execute(
+            update(models.user.User)
+            .where(models.user.User.id.in_(user_ids))
+            .values(token_version=models.user.User.token_version + 1)
+        )
+
+
+def forget_principals(user_ids: list[int]) -> None:
+    for user_id in user_ids:
+        principal_cache.invalidate_user(user_id)
+        token_versions.discard(user_id)
+
+
+def require_admin(current_user = Depends(get_role_principal)):
     """Require user to have admin role"""
-    if not current_user.role or current_user.role.role_name != "admin":
+    if current_user.role_name != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin access required"
@@ -41,13 +118,11 @@ def require_admin(current_user = Depends(get_current_user)):
     return current_user
 
 
-def require_writer(current_user = Depends(get_current_user)):
+def require_writer(current_user = Depends(get_role_principal)):
     """Require user to have writer role"""
-    if not current_user.role or current_user.role.role_name not in ["writer", "admin"]:
+    if current_user.role_name not in ["writer", "admin"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Writer or Admin access required"
         )
     return current_user
-
-
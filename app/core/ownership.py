@@ -0,0 +1,78 @@
+"""Ownership-scoped loading for user-owned resources.
+
+Each resource is registered with the path to its owning user (CartItem ->
+Cart.user_id, OrderDetail -> Order.user_id, ...). get_owned() loads the row
+together with its owner id in a single joined statement and keeps the
+routers' 404 / 403 split; owned_select() scopes list queries to one user
+with the same join instead of looking the parent up first.
+"""
+from dataclasses import dataclass
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from app import models
+
+
+@dataclass(frozen=True)
+class OwnerPath:
+    label: str
+    user_column: object
+    parent: type | None = None
+    onclause: object = None
+
+
+_PATHS: dict[type, OwnerPath] = {}
+
+
+def register(model: type, path: OwnerPath) -> None:
+    _PATHS[model] = path
+
+
+register(models.cart.Cart, OwnerPath("Cart", models.cart.Cart.user_id))
+register(models.order.Order, OwnerPath("Order", models.order.Order.user_id))
+register(
+    models.cart_item.CartItem,
+    OwnerPath(
+        "Cart item",
+        models.cart.Cart.user_id,
+        parent=models.cart.Cart,
+        onclause=models.cart_item.CartItem.cart_id == models.cart.Cart.id,
+    ),
+)
+register(
+    models.order_detail.OrderDetail,
+    OwnerPath(
+        "Order detail",
+        models.order.Order.user_id,
+        parent=models.order.Order,
+        onclause=models.order_detail.OrderDetail.order_id == models.order.Order.id,
+    ),
+)
+
+
+def _joined(stmt: Select, path: OwnerPath) -> Select:
+    return stmt.join(path.parent, path.onclause) if path.parent is not None else stmt
+
+
+def owned_select(model: type, user_id: int) -> Select:
+    """select(model) restricted to rows owned by user_id"""
+    path = _PATHS[model]
+    return _joined(select(model), path).where(path.user_column == user_id)
+
+
+def get_owned(db: Session, model: type, ident: int, user_id: int, action: str = "access"):
+    """Load `model` by id with its owner in one query; 404 if missing, 403 if owned by someone else"""
+    path = _PATHS[model]
+    stmt = _joined(select(model, path.user_column), path).where(model.id == ident)
+    row = db.execute(stmt).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"{path.label} not found")
+    item, owner_id = row
+    if owner_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Not authorized to {action} this {path.label.lower()}",
+        )
+    return item
@@ -0,0 +1,148 @@
+"""Keyset (cursor) pagination shared by the list endpoints.
+
+Pages are ordered by (sort key, id) and the next page starts strictly after
+the last row of the previous one, so page N costs the same as page 1. The
+cursor is an opaque urlsafe-base64 token of that (sort key, id) pair.
+Responses keep their list body; the cursor and optional total estimate are
+returned in the X-Next-Cursor / X-Total-Count headers.
+"""
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import and_, func, or_, select, text
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+def _encode_value(value: Any) -> list:
+    if isinstance(value, datetime):
+        return ["dt", value.isoformat()]
+    if isinstance(value, date):
+        return ["d", value.isoformat()]
+    if isinstance(value, Decimal):
+        return ["dec", str(value)]
+    return ["v", value]
+
+
+def _decode_value(tagged: list) -> Any:
+    tag, raw = tagged
+    if tag == "dt":
+        return datetime.fromisoformat(raw)
+    if tag == "d":
+        return date.fromisoformat(raw)
+    if tag == "dec":
+        return Decimal(raw)
+    return raw
+
+
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    raw = json.dumps([_encode_value(sort_value), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[Any, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        tagged, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return _decode_value(tagged), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@dataclass
+class Keyset:
+    """Sort spec: optional `sort` column with the primary key `id` as tie-breaker"""
+    id: Any
+    sort: Any = None
+    descending: bool = False
+
+    def order_by(self):
+        columns = [self.id] if self.sort is None else [self.sort, self.id]
+        return [c.desc() if self.descending else c.asc() for c in columns]
+
+    def after(self, sort_value: Any, row_id: int):
+        if self.sort is None:
+            return self.id < row_id if self.descending else self.id > row_id
+        if self.descending:
+            return or_(self.sort < sort_value, and_(self.sort == sort_value, self.id < row_id))
+        return or_(self.sort > sort_value, and_(self.sort == sort_value, self.id > row_id))
+
+    def cursor_for(self, item) -> str:
+        row_id = getattr(item, self.id.key)
+        sort_value = row_id if self.sort is None else getattr(item, self.sort.key)
+        return encode_cursor(sort_value, row_id)
+
+
+class PageParams:
+    """Common query parameters for keyset-paginated list endpoints"""
+
+    def __init__(
+        self,
+        cursor: str | None = Query(None, description=f"Opaque cursor from the {NEXT_CURSOR_HEADER} header"),
+        limit: int = Query(50, ge=1, le=200, description="Page size"),
+        include_total: bool = Query(False, description=f"Return a total-count estimate in {TOTAL_COUNT_HEADER}"),
+    ):
+        self.cursor = cursor
+        self.limit = limit
+        self.include_total = include_total
+
+
+@dataclass
+class Page:
+    items: list
+    next_cursor: str | None = None
+    total: int | None = None
+
+    def apply_headers(self, response: Response) -> list:
+        if self.next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = self.next_cursor
+        if self.total is not None:
+            response.headers[TOTAL_COUNT_HEADER] = str(self.total)
+        return self.items
+
+
+def keyset_statement(stmt, key: Keyset, cursor: str | None, limit: int):
+    if cursor:
+        stmt = stmt.where(key.after(*decode_cursor(cursor)))
+    # Lấy thừa 1 dòng để biết còn trang sau hay không
+    return stmt.order_by(*key.order_by()).limit(limit + 1)
+
+
+def _make_page(rows: list, key: Keyset, limit: int) -> Page:
+    items = rows[:limit]
+    next_cursor = key.cursor_for(items[-1]) if len(rows) > limit else None
+    return Page(items=items, next_cursor=next_cursor)
+
+
+def total_statement(stmt, dialect_name: str):
+    """Cheap total estimate: MySQL table statistics when unfiltered, else COUNT(*)"""
+    froms = stmt.get_final_froms()
+    if dialect_name == "mysql" and stmt.whereclause is None and len(froms) == 1 and hasattr(froms[0], "name"):
+        return text(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :name"
+        ).bindparams(name=froms[0].name)
+    return select(func.count()).select_from(stmt.order_by(None).subquery())
+
+
+def paginate(db, stmt, key: Keyset, params: PageParams) -> Page:
+    rows = list(db.execute(keyset_statement(stmt, key, params.cursor, params.limit)).scalars())
+    page = _make_page(rows, key, params.limit)
+    if params.include_total:
+        page.total = db.execute(total_statement(stmt, db.get_bind().dialect.name)).scalar() or 0
+    return page
+
+
+async def paginate_async(db, stmt, key: Keyset, params: PageParams) -> Page:
+    result = await db.execute(keyset_statement(stmt, key, params.cursor, params.limit))
+    page = _make_page(list(result.scalars()), key, params.limit)
+    if params.include_total:
+        total = await db.execute(total_statement(stmt, db.bind.dialect.name))
+        page.total = total.scalar() or 0
+    return page
@@ -0,0 +1,84 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from fastapi import HTTPException, status
+
+from app.config import PASSWORD_HASH_MAX_QUEUE, PASSWORD_HASH_WORKERS
+from app.core import security
+
+
+class PasswordHasherPool:
+    """Runs bcrypt hashing/verification on a dedicated, size-limited process pool.
+
+    At most `workers + max_queue` jobs may be in flight; beyond that callers
+    get a 503 instead of queueing behind a login burst.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_queue: int = PASSWORD_HASH_MAX_QUEUE) -> None:
+        self.workers = max(workers, 1)
+        self.max_queue = max(max_queue, 0)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: không fork process đang chạy event loop + threadpool
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _release(self, _future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _submit(self, fn, *args) -> Future:
+        executor = self._get_executor()
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many password operations in progress, please retry",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+        try:
+            future = executor.submit(fn, *args)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await asyncio.wrap_future(self._submit(security.verify_password, plain_password, hashed_password))
+
+    async def hash(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(security.get_password_hash, password))
+
+    def hash_blocking(self, password: str) -> str:
+        """For sync handlers: the threadpool thread waits while the pool burns the CPU"""
+        return self._submit(security.get_password_hash, password).result()
+
+    def resize(self, workers: int) -> None:
+        self.shutdown()
+        self.workers = max(workers, 1)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+password_pool = PasswordHasherPool()
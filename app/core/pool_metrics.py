@@ -0,0 +1,129 @@
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
+
+# ASGI scope của request hiện tại, do PoolMetricsMiddleware đặt; route được đọc lúc checkout
+# (lúc đó router đã gắn scope["route"])
+_current_scope: ContextVar[dict | None] = ContextVar("current_scope", default=None)
+
+
+@dataclass
+class RouteStats:
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_total_ms: float = 0.0
+    wait_max_ms: float = 0.0
+    in_use_max: int = 0
+    overflow_max: int = 0
+
+
+class PoolMetrics:
+    """Per-route connection pool checkout metrics fed by pool event listeners"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._routes: dict[str, RouteStats] = {}
+        self._pools: dict[str, object] = {}
+
+    def attach(self, name: str, pool) -> None:
+        self._pools[name] = pool
+        connect = pool.connect
+
+        # Pool không có event trước checkout: bọc connect() để đo thời gian chờ khi
+        # session thực sự cần connection (checkout vẫn lazy)
+        def timed_connect():
+            route = current_route()
+            start = time.perf_counter()
+            try:
+                connection = connect()
+            except sa_exc.TimeoutError:
+                self.record_timeout(route)
+                raise
+            self.record_wait(route, time.perf_counter() - start)
+            return connection
+
+        pool.connect = timed_connect
+
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            in_use = pool.checkedout() if hasattr(pool, "checkedout") else 0
+            overflow = max(pool.overflow(), 0) if hasattr(pool, "overflow") else 0
+            with self._lock:
+                stats = self._stats(current_route())
+                stats.in_use_max = max(stats.in_use_max, in_use)
+                stats.overflow_max = max(stats.overflow_max, overflow)
+
+        event.listen(pool, "checkout", on_checkout)
+
+    def _stats(self, route: str) -> RouteStats:
+        stats = self._routes.get(route)
+        if stats is None:
+            stats = self._routes[route] = RouteStats()
+        return stats
+
+    def record_wait(self, route: str, seconds: float) -> None:
+        ms = seconds * 1000
+        with self._lock:
+            stats = self._stats(route)
+            stats.checkouts += 1
+            stats.wait_total_ms += ms
+            stats.wait_max_ms = max(stats.wait_max_ms, ms)
+
+    def record_timeout(self, route: str) -> None:
+        with self._lock:
+            self._stats(route).timeouts += 1
+
+    def snapshot(self) -> dict:
+        pools = {}
+        for name, pool in self._pools.items():
+            pools[name] = {
+                "size": pool.size() if hasattr(pool, "size") else None,
+                "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+                "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+                "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+            }
+        with self._lock:
+            routes = {}
+            for route, stats in self._routes.items():
+                data = asdict(stats)
+                data["wait_avg_ms"] = stats.wait_total_ms / stats.checkouts if stats.checkouts else 0.0
+                routes[route] = data
+        return {"pools": pools, "routes": routes}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+pool_metrics = PoolMetrics()
+
+
+def route_label(scope: dict) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", scope.get("path", ""))
+    return f"{scope.get('method', '-')} {path}"
+
+
+def current_route() -> str:
+    scope = _current_scope.get()
+    return "-" if scope is None else route_label(scope)
+
+
+class PoolMetricsMiddleware:
+    """ASGI middleware exposing the request scope to the pool listeners"""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = _current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current_scope.reset(token)
@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app.config import PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL, TOKEN_VERSION_TTL
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Immutable snapshot of the authenticated user and its role name"""
+    id: int
+    username: str
+    email: str
+    phone: str | None
+    role_id: int | None
+    role_name: str | None
+    profile_image: str | None
+    bio: str | None
+    is_active: bool | None
+    token_version: int = 0
+
+    @classmethod
+    def from_user(cls, user) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            phone=user.phone,
+            role_id=user.role_id,
+            role_name=user.role.role_name if user.role else None,
+            profile_image=user.profile_image,
+            bio=user.bio,
+            is_active=user.is_active,
+            token_version=user.token_version or 0,
+        )
+
+
+@dataclass(frozen=True)
+class ClaimsPrincipal:
+    """Principal built from verified token claims only (no database access)"""
+    id: int
+    role_name: str | None
+
+
+class PrincipalCache:
+    """In-process TTL + LRU cache of principals keyed by (user_id, token).
+
+    Each worker process has its own cache, so changes made through another
+    worker are only seen after the TTL expires.
+    """
+
+    def __init__(self, maxsize: int = PRINCIPAL_CACHE_SIZE, ttl: float = PRINCIPAL_CACHE_TTL) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[int, str], tuple[float, Principal]] = OrderedDict()
+
+    def get(self, user_id: int, token: str) -> Principal | None:
+        key = (user_id, token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return principal
+
+    def set(self, token: str, principal: Principal) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        key = (principal.id, token)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache()
+
+
+class TokenVersionTable:
+    """Small in-process table of user_id -> current token_version.
+
+    Entries expire after a TTL so a version bumped by another worker is
+    picked up from the database within that window.
+    """
+
+    def __init__(self, maxsize: int = PRINCIPAL_CACHE_SIZE, ttl: float = TOKEN_VERSION_TTL) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._versions: OrderedDict[int, tuple[float, int]] = OrderedDict()
+
+    def matches(self, user_id: int, version: int) -> bool:
+        with self._lock:
+            entry = self._versions.get(user_id)
+            if entry is None:
+                return False
+            expires_at, current = entry
+            if expires_at < time.monotonic():
+                del self._versions[user_id]
+                return False
+            return current == version
+
+    def set(self, user_id: int, version: int) -> None:
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._versions[user_id] = (time.monotonic() + self.ttl, version)
+            self._versions.move_to_end(user_id)
+            while len(self._versions) > self.maxsize:
+                self._versions.popitem(last=False)
+
+    def discard(self, user_id: int) -> None:
+        with self._lock:
+            self._versions.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._versions.clear()
+
+
+token_versions = TokenVersionTable()
@@ -0,0 +1,211 @@
+"""Coalescing buffer for reading progress heartbeats.
+
+Heartbeats are merged in memory per (user_id, summary_id): time_spent is
+summed, progress_percent keeps the maximum and the latest position wins.
+A background thread flushes the merged rows every PROGRESS_FLUSH_INTERVAL
+seconds as batched upserts (app.core.upsert) against the unique
+(user_id, summary_id) key, with last_read_date taken from the database
+clock.
+
+Each batch commits on its own. A batch rejected by a constraint (e.g. a
+user deleted since the heartbeat) is retried row by row and only the
+offending rows are dropped and counted; any other error puts the unwritten
+rows back into the buffer for the next cycle.
+"""
+import threading
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import func
+from sqlalchemy import exc as sa_exc
+
+from app.config import PROGRESS_FLUSH_BATCH, PROGRESS_FLUSH_INTERVAL
+from app.core.upsert import greatest, upsert
+from app.models.interaction_event import InteractionSource
+from app.models.reading_history import ReadingHistory
+from app.services import interaction_log
+
+
+@dataclass
+class PendingProgress:
+    user_id: int
+    summary_id: int
+    last_section_id: int | None
+    progress_percent: float
+    time_spent: int
+    device_type: str | None
+
+    def merge(self, other: "PendingProgress") -> None:
+        # Heartbeat đến sau quyết định vị trí đọc hiện tại
+        self.time_spent += other.time_spent
+        self.progress_percent = max(self.progress_percent, other.progress_percent)
+        if other.last_section_id is not None:
+            self.last_section_id = other.last_section_id
+        self.device_type = other.device_type or self.device_type
+
+    def as_row(self) -> dict:
+        return {
+            "user_id": self.user_id,
+            "summary_id": self.summary_id,
+            "last_section_id": self.last_section_id,
+            "progress_percent": self.progress_percent,
+            "time_spent": self.time_spent,
+            "device_type": self.device_type,
+        }
+
+
+def _merge_progress(existing, new) -> dict:
+    # Cộng dồn time_spent, giữ progress_percent lớn nhất, vị trí mới nhất (nếu có)
+    return {
+        "time_spent": func.coalesce(existing.time_spent, 0) + new.time_spent,
+        "progress_percent": greatest(func.coalesce(existing.progress_percent, 0), new.progress_percent),
+        "last_section_id": func.coalesce(new.last_section_id, existing.last_section_id),
+        "device_type": func.coalesce(new.device_type, existing.device_type),
+        "last_read_date": func.now(),
+    }
+
+
+def upsert_progress(conn, rows: list[dict]) -> None:
+    """Upsert that adds time_spent and keeps the highest progress_percent (Connection or Session)"""
+    upsert(conn, ReadingHistory.__table__, rows, ["user_id", "summary_id"], _merge_progress)
+
+
+class ProgressBuffer:
+    def __init__(self, interval: float, batch_size: int) -> None:
+        self._interval = interval
+        self._batch_size = batch_size
+        self._lock = threading.Lock()
+        self._pending: dict[tuple[int, int], PendingProgress] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._engine = None
+        self._oldest_pending: float | None = None
+        self._received = 0
+        self._flushes = 0
+        self._failures = 0
+        self._flushed_rows = 0
+        self._dropped_rows = 0
+        self._last_dropped_error: str | None = None
+        self._last_flush_at: float | None = None
+        self._last_flush_ms = 0.0
+        self._last_error: str | None = None
+
+    def add(self, items: list[PendingProgress]) -> int:
+        with self._lock:
+            self._merge(items)
+            self._received += len(items)
+            if self._oldest_pending is None and self._pending:
+                self._oldest_pending = time.time()
+            return len(self._pending)
+
+    def _merge(self, items) -> None:
+        for item in items:
+            key = (item.user_id, item.summary_id)
+            current = self._pending.get(key)
+            if current is None:
+                self._pending[key] = item
+            else:
+                current.merge(item)
+
+    def _write(self, engine, rows: list[dict]) -> None:
+        with engine.begin() as conn:
+            upsert_progress(conn, rows)
+            interaction_log.record_many(conn, [
+                interaction_log.event_row(row["user_id"], InteractionSource.READING, summary_id=row["summary_id"])
+                for row in rows
+            ])
+
+    def _drop(self, exc: Exception) -> None:
+        with self._lock:
+            self._dropped_rows += 1
+            self._last_dropped_error = repr(exc)
+
+    def flush(self, engine=None) -> int:
+        """Upsert every coalesced (user, summary) row; returns the number of rows written"""
+        engine = engine or self._engine
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            oldest, self._oldest_pending = self._oldest_pending, None
+        if not pending:
+            return 0
+        started = time.perf_counter()
+        items = [item for _key, item in sorted(pending.items())]
+        written = 0
+        done = 0  # số item đầu danh sách đã ghi hoặc đã bỏ
+        try:
+            while done < len(items):
+                batch = items[done:done + self._batch_size]
+                try:
+                    self._write(engine, [item.as_row() for item in batch])
+                    written += len(batch)
+                    done += len(batch)
+                except sa_exc.IntegrityError:
+                    # Một dòng hỏng không được chặn cả buffer: thử từng dòng, bỏ dòng lỗi
+                    for item in batch:
+                        try:
+                            self._write(engine, [item.as_row()])
+                            written += 1
+                        except sa_exc.IntegrityError as exc:
+                            self._drop(exc)
+                        done += 1
+        except Exception as exc:
+            with self._lock:
+                # Chỉ trả lại các dòng chưa ghi; heartbeat mới đến trong lúc flush được gộp vào
+                newer, self._pending = self._pending, {}
+                self._merge(items[done:])
+                self._merge(newer.values())
+                self._oldest_pending = oldest
+                self._failures += 1
+                self._flushed_rows += written
+                self._last_error = repr(exc)
+            raise
+        with self._lock:
+            self._flushes += 1
+            self._flushed_rows += written
+            self._last_flush_at = time.time()
+            self._last_flush_ms = (time.perf_counter() - started) * 1000
+            self._last_error = None
+        return written
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                self.flush()
+            except Exception:
+                pass  # đã ghi vào metrics, thử lại ở chu kỳ sau
+
+    def start(self, engine) -> None:
+        self._engine = engine
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="progress-flush", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flush thread and write out whatever is still buffered"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._engine is not None:
+            self.flush()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "pending_rows": len(self._pending),
+                "lag_seconds": time.time() - self._oldest_pending if self._oldest_pending else 0.0,
+                "flush_interval_seconds": self._interval,
+                "heartbeats_received": self._received,
+                "flushes": self._flushes,
+                "failures": self._failures,
+                "flushed_rows": self._flushed_rows,
+                "dropped_rows": self._dropped_rows,
+                "last_dropped_error": self._last_dropped_error,
+                "last_flush_at": self._last_flush_at,
+                "last_flush_ms": self._last_flush_ms,
+                "last_error": self._last_error,
+            }
+
+
+progress_buffer = ProgressBuffer(interval=PROGRESS_FLUSH_INTERVAL, batch_size=PROGRESS_FLUSH_BATCH)
@@ -0,0 +1,234 @@
+"""Write-behind buffer for summaries.read_count.
+
+Reads call read_counter.increment(summary_id); a background thread drains
+the buffered deltas every READ_COUNT_FLUSH_INTERVAL seconds and applies
+them with one UPDATE ... SET read_count = read_count + CASE id ... END per
+chunk, so hot summaries never queue on a per-view row lock. The buffer is
+in memory by default; READ_COUNT_JOURNAL points it at a local SQLite file
+so unflushed increments survive a crash and are applied on next start.
+increment() never touches that file (it runs on the event loop): the
+journal store stages increments in memory and the flush thread writes them
+to the file every JOURNAL_SYNC_INTERVAL seconds, so a crash loses at most
+that window.
+"""
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy import case, func, update
+
+from app.config import READ_COUNT_FLUSH_BATCH, READ_COUNT_FLUSH_INTERVAL, READ_COUNT_JOURNAL
+from app.models.summary import Summary
+
+JOURNAL_SYNC_INTERVAL = 1.0
+
+
+class MemoryCounterStore:
+    def __init__(self) -> None:
+        self._counts: Counter = Counter()
+
+    def add(self, key: int, n: int) -> None:
+        self._counts[key] += n
+
+    def drain(self) -> dict[int, int]:
+        counts, self._counts = self._counts, Counter()
+        return dict(counts)
+
+    def restore(self, counts: dict[int, int]) -> None:
+        self._counts.update(counts)
+
+    def sync(self) -> None:
+        pass
+
+    def pending(self) -> tuple[int, int]:
+        return len(self._counts), sum(self._counts.values())
+
+
+class SqliteCounterStore:
+    """Same interface, journaled to a local SQLite file by sync() (called from the flush thread)"""
+
+    def __init__(self, path: str) -> None:
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pending_reads (summary_id INTEGER PRIMARY KEY, delta INTEGER NOT NULL)"
+        )
+        # add() chỉ cộng vào RAM; mọi thao tác trên file nằm dưới _io_lock
+        self._staged: Counter = Counter()
+        self._staged_lock = threading.Lock()
+        self._io_lock = threading.Lock()
+
+    def add(self, key: int, n: int) -> None:
+        with self._staged_lock:
+            self._staged[key] += n
+
+    def _take_staged(self) -> Counter:
+        with self._staged_lock:
+            staged, self._staged = self._staged, Counter()
+        return staged
+
+    def sync(self) -> None:
+        """Write staged increments to the journal file in one transaction"""
+        with self._io_lock:
+            staged = self._take_staged()
+            if not staged:
+                return
+            try:
+                with self._conn:
+                    self._conn.execute("BEGIN IMMEDIATE")
+                    self._conn.executemany(
+                        "INSERT INTO pending_reads (summary_id, delta) VALUES (?, ?) "
+                        "ON CONFLICT(summary_id) DO UPDATE SET delta = delta + excluded.delta",
+                        staged.items(),
+                    )
+            except Exception:
+                self.restore(staged)
+                raise
+
+    def drain(self) -> dict[int, int]:
+        with self._io_lock:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                counts = Counter(dict(self._conn.execute("SELECT summary_id, delta FROM pending_reads")))
+                self._conn.execute("DELETE FROM pending_reads")
+            counts.update(self._take_staged())
+        return dict(counts)
+
+    def restore(self, counts: dict[int, int]) -> None:
+        # Trả về RAM, lần sync() sau ghi lại vào file
+        with self._staged_lock:
+            self._staged.update(counts)
+
+    def pending(self) -> tuple[int, int]:
+        with self._io_lock:
+            counts = Counter(dict(self._conn.execute("SELECT summary_id, delta FROM pending_reads")))
+        with self._staged_lock:
+            counts.update(self._staged)
+        return len(counts), sum(counts.values())
+
+
+class ReadCounterBuffer:
+    def __init__(self, store, interval: float, batch_size: int) -> None:
+        self._store = store
+        self._interval = interval
+        self._batch_size = batch_size
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._engine = None
+        # Thời điểm của increment cũ nhất chưa được flush
+        self._oldest_pending: float | None = time.time() if store.pending()[0] else None
+        self._flushes = 0
+        self._failures = 0
+        self._flushed_increments = 0
+        self._last_flush_at: float | None = None
+        self._last_flush_ms = 0.0
+        self._last_error: str | None = None
+
+    def increment(self, summary_id: int, n: int = 1) -> None:
+        with self._lock:
+            self._store.add(summary_id, n)
+            if self._oldest_pending is None:
+                self._oldest_pending = time.time()
+
+    def flush(self, engine=None) -> int:
+        """Apply buffered deltas to the database; returns the number of summaries touched"""
+        engine = engine or self._engine
+        with self._lock:
+            counts = self._store.drain()
+            oldest = self._oldest_pending
+            self._oldest_pending = None
+        if not counts:
+            return 0
+        started = time.perf_counter()
+        items = sorted(counts.items())
+        try:
+            with engine.begin() as conn:
+                for i in range(0, len(items), self._batch_size):
+                    chunk = dict(items[i:i + self._batch_size])
+                    conn.execute(
+                        update(Summary.__table__)
+                        .where(Summary.id.in_(list(chunk)))
+                        .values(read_count=func.coalesce(Summary.read_count, 0) + case(chunk, value=Summary.id, else_=0))
+                    )
+        except Exception as exc:
+            # Trả lại buffer để lần flush sau thử lại
+            with self._lock:
+                self._store.restore(counts)
+                if self._oldest_pending is None or (oldest and oldest < self._oldest_pending):
+                    self._oldest_pending = oldest
+                self._failures += 1
+                self._last_error = repr(exc)
+            raise
+        with self._lock:
+            self._flushes += 1
+            self._flushed_increments += sum(counts.values())
+            self._last_flush_at = time.time()
+            self._last_flush_ms = (time.perf_counter() - started) * 1000
+            self._last_error = None
+        return len(counts)
+
+    def _sync(self) -> None:
+        try:
+            self._store.sync()
+        except Exception as exc:
+            with self._lock:
+                self._failures += 1
+                self._last_error = repr(exc)
+
+    def _run(self) -> None:
+        next_flush = time.monotonic() + self._interval
+        while not self._stop.wait(min(self._interval, JOURNAL_SYNC_INTERVAL)):
+            self._sync()
+            if time.monotonic() < next_flush:
+                continue
+            next_flush = time.monotonic() + self._interval
+            try:
+                self.flush()
+            except Exception:
+                pass  # đã ghi vào metrics, thử lại ở chu kỳ sau
+
+    def start(self, engine) -> None:
+        self._engine = engine
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="read-counter-flush", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the flush thread and write out whatever is still buffered"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        try:
+            if self._engine is not None:
+                self.flush()
+        finally:
+            # Phần flush không được (hoặc chưa có engine) vẫn nằm lại trong journal
+            self._sync()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            summaries, increments = self._store.pending()
+            now = time.time()
+            return {
+                "pending_summaries": summaries,
+                "pending_increments": increments,
+                "lag_seconds": now - self._oldest_pending if self._oldest_pending else 0.0,
+                "flush_interval_seconds": self._interval,
+                "flushes": self._flushes,
+                "failures": self._failures,
+                "flushed_increments": self._flushed_increments,
+                "last_flush_at": self._last_flush_at,
+                "last_flush_ms": self._last_flush_ms,
+                "last_error": self._last_error,
+            }
+
+
+read_counter = ReadCounterBuffer(
+    SqliteCounterStore(READ_COUNT_JOURNAL) if READ_COUNT_JOURNAL else MemoryCounterStore(),
+    interval=READ_COUNT_FLUSH_INTERVAL,
+    batch_size=READ_COUNT_FLUSH_BATCH,
+)
@@ -0,0 +1,273 @@
+"""Cache of serialized JSON responses for public read endpoints.
+
+Entries hold the response body bytes, a strong ETag and the headers that
+belong to the body (e.g. X-Next-Cursor). Each entry carries tags such as
+"summary:12" or "book:3"; write handlers call invalidate() with the tags
+they touched after committing. Backends:
+
+- "memory": per-process LRU with TTL (default)
+- "redis": any redis-py compatible client, shared by all workers
+- "fakeredis": in-process stand-in for the Redis backend (tests/dev)
+- "none": caching disabled
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from app.config import REDIS_URL, RESPONSE_CACHE_BACKEND, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL
+
+# Mọi list summary (search, theo writer) phụ thuộc vào summary/book/author/publisher bất kỳ
+SUMMARY_LISTS_TAG = "summaries:lists"
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    etag: str
+    headers: dict = field(default_factory=dict)
+
+    def to_bytes(self) -> bytes:
+        meta = json.dumps({"etag": self.etag, "headers": self.headers}).encode()
+        return meta + b"\n" + self.body
+
+    @classmethod
+    def from_bytes(cls, raw: bytes) -> "CachedResponse":
+        meta, body = raw.split(b"\n", 1)
+        data = json.loads(meta)
+        return cls(body=body, etag=data["etag"], headers=data["headers"])
+
+    def to_response(self, request: Request) -> Response:
+        headers = {**self.headers, "ETag": self.etag}
+        if request.headers.get("if-none-match") == self.etag:
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+
+class MemoryBackend:
+    """Thread-safe LRU + TTL store with a tag -> keys index"""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, bytes, tuple[str, ...]]] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ttl: float, tags: tuple[str, ...]) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, tags) -> None:
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    self._drop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class RedisBackend:
+    """Uses get/set/delete/sadd/smembers/expire of a redis-py compatible client"""
+
+    prefix = "resp:"
+
+    def __init__(self, client) -> None:
+        self.client = client
+
+    def get(self, key: str) -> bytes | None:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: float, tags: tuple[str, ...]) -> None:
+        seconds = max(int(ttl), 1)
+        self.client.set(self.prefix + key, value, ex=seconds)
+        for tag in tags:
+            tag_key = self.prefix + "tag:" + tag
+            self.client.sadd(tag_key, self.prefix + key)
+            self.client.expire(tag_key, seconds)
+
+    def invalidate(self, tags) -> None:
+        for tag in tags:
+            tag_key = self.prefix + "tag:" + tag
+            keys = [k.decode() if isinstance(k, bytes) else k for k in self.client.smembers(tag_key)]
+            self.client.delete(tag_key, *keys)
+
+    def clear(self) -> None:
+        for key in self.client.keys(self.prefix + "*"):
+            self.client.delete(key)
+
+
+class FakeRedis:
+    """Minimal in-process implementation of the Redis commands RedisBackend uses"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._data: dict[str, tuple[float | None, object]] = {}
+
+    def _live(self, name: str):
+        entry = self._data.get(name)
+        if entry is None:
+            return None
+        if entry[0] is not None and entry[0] < time.monotonic():
+            del self._data[name]
+            return None
+        return entry[1]
+
+    def get(self, name: str):
+        with self._lock:
+            value = self._live(name)
+            return value if isinstance(value, bytes) else None
+
+    def set(self, name: str, value: bytes, ex: int | None = None) -> bool:
+        with self._lock:
+            self._data[name] = (time.monotonic() + ex if ex else None, bytes(value))
+        return True
+
+    def delete(self, *names: str) -> int:
+        with self._lock:
+            return sum(self._data.pop(name, None) is not None for name in names)
+
+    def sadd(self, name: str, *values: str) -> int:
+        with self._lock:
+            members = self._live(name)
+            if not isinstance(members, set):
+                members = set()
+                self._data[name] = (None, members)
+            before = len(members)
+            members.update(v.encode() if isinstance(v, str) else v for v in values)
+            return len(members) - before
+
+    def smembers(self, name: str) -> set:
+        with self._lock:
+            members = self._live(name)
+            return set(members) if isinstance(members, set) else set()
+
+    def expire(self, name: str, seconds: int) -> bool:
+        with self._lock:
+            value = self._live(name)
+            if value is None:
+                return False
+            self._data[name] = (time.monotonic() + seconds, value)
+            return True
+
+    def keys(self, pattern: str = "*") -> list[str]:
+        prefix = pattern.rstrip("*")
+        with self._lock:
+            return [name for name in list(self._data) if name.startswith(prefix) and self._live(name) is not None]
+
+
+class ResponseCache:
+    def __init__(self, backend, ttl: float) -> None:
+        self.backend = backend
+        self.ttl = ttl
+
+    @staticmethod
+    def key_for(request: Request) -> str:
+        query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        return f"{request.url.path}?{query}"
+
+    def get(self, request: Request) -> CachedResponse | None:
+        return self.lookup(self.key_for(request))
+
+    def lookup(self, key: str) -> CachedResponse | None:
+        if self.backend is None:
+            return None
+        raw = self.backend.get(key)
+        return CachedResponse.from_bytes(raw) if raw is not None else None
+
+    def put(self, key: str, body: bytes, tags, headers: dict | None = None) -> CachedResponse:
+        entry = CachedResponse(
+            body=body,
+            etag='"' + hashlib.sha1(body).hexdigest() + '"',
+            headers=headers or {},
+        )
+        if self.backend is not None:
+            self.backend.set(key, entry.to_bytes(), self.ttl, tuple(sorted(set(tags))))
+        return entry
+
+    def store(
+        self,
+        request: Request,
+        adapter: TypeAdapter,
+        data,
+        tags,
+        headers: dict | None = None,
+    ) -> Response:
+        """Serialize data through the response schema, cache it and return the response"""
+        body = adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+        return self.put(self.key_for(request), body, tags, headers=headers).to_response(request)
+
+    def invalidate(self, *tags: str) -> None:
+        if self.backend is not None:
+            self.backend.invalidate(tags)
+
+    def clear(self) -> None:
+        if self.backend is not None:
+            self.backend.clear()
+
+
+def summary_tags(summary) -> list[str]:
+    """Tags for a cached summary: itself, its writer (and their user object) and its nested book"""
+    tags = [f"summary:{summary.id}", f"writer:{summary.user_id}", f"user:{summary.user_id}"]
+    if summary.book is not None:
+        tags += book_tags(summary.book)
+    return tags
+
+
+def book_tags(book) -> list[str]:
+    return [
+        f"book:{book.id}",
+        f"category:{book.category_id}",
+        f"author:{book.author_id}",
+        f"publisher:{book.publisher_id}",
+    ]
+
+
+def _make_backend():
+    if RESPONSE_CACHE_BACKEND == "none" or RESPONSE_CACHE_TTL <= 0:
+        return None
+    if RESPONSE_CACHE_BACKEND == "redis":
+        import redis  # optional dependency, only needed for the shared backend
+
+        return RedisBackend(redis.Redis.from_url(REDIS_URL))
+    if RESPONSE_CACHE_BACKEND == "fakeredis":
+        return RedisBackend(FakeRedis())
+    return MemoryBackend(RESPONSE_CACHE_SIZE)
+
+
+response_cache = ResponseCache(_make_backend(), RESPONSE_CACHE_TTL)
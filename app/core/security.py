@@ -4,9 +4,13 @@ from typing import Any, Optional
 from jose import jwt
 from passlib.context import CryptContext
 
-from app.config import SECRET_KEY
+from app.config import SECRET_KEY, BCRYPT_ROUNDS
 
-pwd_context = CryptContext(schemes=["bcrypt_sha256"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt_sha256"],
+    deprecated="auto",
+    bcrypt_sha256__rounds=BCRYPT_ROUNDS,
+)
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
@@ -0,0 +1,283 @@
+"""Time-decayed trending leaderboard for summaries.
+
+Read, rating and comment events add weight to a summary's score with
+forward decay: an event at time t adds w * exp(λ (t - epoch)), where
+λ = ln 2 / TRENDING_HALF_LIFE_HOURS, and the current value is
+score * exp(-λ (now - epoch)). Scores therefore only grow between
+compactions and their order never needs a time sweep. Each board (all
+summaries, plus one per book category) keeps its top TRENDING_TOP_K as a
+sorted list; since an event can only raise its own summary, the boards
+stay exact with O(K) work per event and a read is O(k).
+
+A background thread compacts every TRENDING_COMPACT_INTERVAL seconds. Raw
+weights are upserted additively into trending_buckets (one row per summary
+and time bucket), expired buckets are deleted and the scores are reloaded
+with one SUM(weight * CASE bucket ...) query joined to the book category,
+so every worker converges on the same leaderboard. Scores are re-based to
+the current time, entries below TRENDING_MIN_SCORE are dropped and the
+boards are rebuilt. With TRENDING_PERSIST off, compaction does the same in
+memory and only queries categories of newly seen summaries.
+"""
+import bisect
+import heapq
+import math
+import threading
+import time
+from collections import Counter, defaultdict
+
+from sqlalchemy import case, delete, func, select
+
+from app.config import (
+    TRENDING_BUCKET_SECONDS,
+    TRENDING_COMPACT_INTERVAL,
+    TRENDING_HALF_LIFE_HOURS,
+    TRENDING_MIN_SCORE,
+    TRENDING_PERSIST,
+    TRENDING_TOP_K,
+)
+from app.core.upsert import upsert
+from app.models.book import Book
+from app.models.summary import Summary
+from app.models.trending import TrendingBucket
+
+# Trọng số theo loại sự kiện
+EVENT_WEIGHTS = {"read": 1.0, "rating": 3.0, "comment": 2.0}
+
+# Bucket cũ hơn chừng này half-life chỉ còn < 0.1% trọng số, compaction xoá đi
+WINDOW_HALF_LIVES = 10
+
+_UNKNOWN = object()
+
+
+def _add_weight(existing, new) -> dict:
+    return {"weight": existing.weight + new.weight}
+
+
+class TrendingLeaderboard:
+    def __init__(
+        self,
+        half_life_hours: float,
+        top_k: int,
+        min_score: float,
+        bucket_seconds: int,
+        interval: float,
+        persist: bool,
+        batch_size: int = 500,
+    ) -> None:
+        self._rate = math.log(2) / (half_life_hours * 3600)
+        self._top_k = top_k
+        self._min_score = min_score
+        self._bucket_seconds = bucket_seconds
+        self._window_buckets = math.ceil(WINDOW_HALF_LIVES * half_life_hours * 3600 / bucket_seconds)
+        self._interval = interval
+        self._persist = persist
+        self._batch_size = batch_size
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._engine = None
+        self._epoch = time.time()
+        self._scores: dict[int, float] = {}  # forward-decayed, tương đối với _epoch
+        self._category_of: dict[int, int | None] = {}
+        self._boards: dict[int | None, list[tuple[float, int]]] = {}  # (-score, summary_id) tăng dần; None = tất cả
+        self._pending: Counter = Counter()  # (summary_id, bucket) -> trọng số chưa ghi xuống DB
+        self._unresolved: set[int] = set()  # summary chưa biết category
+        self._events = 0
+        self._compactions = 0
+        self._failures = 0
+        self._last_compaction_at: float | None = None
+        self._last_compaction_ms = 0.0
+        self._last_error: str | None = None
+
+    def record(self, summary_id: int, event: str, n: int = 1, at: float | None = None) -> None:
+        """Add an event; `at` (unix time) is only for backfilling past events"""
+        now = time.time() if at is None else at
+        weight = EVENT_WEIGHTS[event] * n
+        with self._lock:
+            score = self._scores.get(summary_id, 0.0) + weight * math.exp(self._rate * (now - self._epoch))
+            self._scores[summary_id] = score
+            self._bump(None, summary_id, score)
+            category_id = self._category_of.get(summary_id, _UNKNOWN)
+            if category_id is _UNKNOWN:
+                self._unresolved.add(summary_id)
+            elif category_id is not None:
+                self._bump(category_id, summary_id, score)
+            if self._persist:
+                self._pending[(summary_id, int(now // self._bucket_seconds))] += weight
+            self._events += n
+
+    def _bump(self, key, summary_id: int, score: float) -> None:
+        # Điểm chỉ tăng: chỉ chính summary này có thể vào hoặc leo hạng trên board
+        board = self._boards.setdefault(key, [])
+        for i, (_neg, member) in enumerate(board):
+            if member == summary_id:
+                del board[i]
+                break
+        entry = (-score, summary_id)
+        if len(board) < self._top_k or entry < board[-1]:
+            bisect.insort(board, entry)
+            del board[self._top_k:]
+
+    def top(self, k: int, category_id: int | None = None) -> list[tuple[int, float]]:
+        """Top-k (summary_id, current score) overall or within a category"""
+        with self._lock:
+            decay = math.exp(-self._rate * (time.time() - self._epoch))
+            board = self._boards.get(category_id, [])[:k]
+        return [(summary_id, -neg * decay) for neg, summary_id in board]
+
+    def _rebuild(self) -> None:
+        self._boards = {None: heapq.nsmallest(self._top_k, ((-s, i) for i, s in self._scores.items()))}
+        groups = defaultdict(list)
+        for summary_id, score in self._scores.items():
+            category_id = self._category_of.get(summary_id)
+            if category_id is not None:
+                groups[category_id].append((-score, summary_id))
+        for category_id, entries in groups.items():
+            self._boards[category_id] = heapq.nsmallest(self._top_k, entries)
+
+    def _categories(self, conn, summary_ids) -> dict[int, int | None]:
+        ids = sorted(summary_ids)
+        categories = dict.fromkeys(ids)  # summary đã bị xoá: không thuộc category nào
+        for i in range(0, len(ids), self._batch_size):
+            rows = conn.execute(
+                select(Summary.id, Book.category_id)
+                .outerjoin(Book, Book.id == Summary.book_id)
+                .where(Summary.id.in_(ids[i:i + self._batch_size]))
+            )
+            categories.update({summary_id: category_id for summary_id, category_id in rows})
+        return categories
+
+    def _bucket_factor(self, bucket: int, now: float) -> float:
+        # Sự kiện trong bucket coi như xảy ra ở giữa bucket
+        return math.exp(-self._rate * (now - (bucket + 0.5) * self._bucket_seconds))
+
+    def _reload(self, engine, pending: Counter, now: float) -> tuple[dict[int, float], dict[int, int | None]]:
+        current = int(now // self._bucket_seconds)
+        oldest = current - self._window_buckets
+        factors = {b: self._bucket_factor(b, now) for b in range(oldest, current + 1)}
+        rows = [
+            {"summary_id": summary_id, "bucket": bucket, "weight": weight}
+            for (summary_id, bucket), weight in sorted(pending.items())
+        ]
+        with engine.begin() as conn:
+            upsert(conn, TrendingBucket.__table__, rows, ["summary_id", "bucket"], _add_weight)
+            conn.execute(delete(TrendingBucket).where(TrendingBucket.bucket < oldest))
+            result = conn.execute(
+                select(
+                    TrendingBucket.summary_id,
+                    Book.category_id,
+                    func.sum(TrendingBucket.weight * case(factors, value=TrendingBucket.bucket, else_=0)),
+                )
+                .join(Summary, Summary.id == TrendingBucket.summary_id)
+                .outerjoin(Book, Book.id == Summary.book_id)
+                .group_by(TrendingBucket.summary_id, Book.category_id)
+            ).all()
+        scores = {summary_id: score for summary_id, _category_id, score in result}
+        categories = {summary_id: category_id for summary_id, category_id, _score in result}
+        return scores, categories
+
+    def compact(self, engine=None) -> int:
+        """Persist, expire and re-base scores, then rebuild the boards; returns the summaries kept"""
+        engine = engine or self._engine
+        started = time.perf_counter()
+        now = time.time()
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            unresolved, self._unresolved = self._unresolved, set()
+        try:
+            if self._persist and engine is not None:
+                scores, categories = self._reload(engine, pending, now)
+            else:
+                scores = None
+                categories = {}
+                if engine is not None and unresolved:
+                    with engine.connect() as conn:
+                        categories = self._categories(conn, unresolved)
+        except Exception as exc:
+            with self._lock:
+                self._pending.update(pending)
+                self._unresolved |= unresolved
+                self._failures += 1
+                self._last_error = repr(exc)
+            raise
+
+        with self._lock:
+            if scores is None:
+                decay = math.exp(-self._rate * (now - self._epoch))
+                scores = {summary_id: score * decay for summary_id, score in self._scores.items()}
+                categories = {**self._category_of, **categories}
+            else:
+                # Sự kiện đến trong lúc compaction: vẫn nằm trong _pending, cộng tạm theo bucket của chúng
+                for (summary_id, bucket), weight in self._pending.items():
+                    scores[summary_id] = scores.get(summary_id, 0.0) + weight * self._bucket_factor(bucket, now)
+                    if summary_id not in categories:
+                        category_id = self._category_of.get(summary_id, _UNKNOWN)
+                        if category_id is _UNKNOWN:
+                            self._unresolved.add(summary_id)
+                        else:
+                            categories[summary_id] = category_id
+            self._epoch = now
+            self._scores = {i: s for i, s in scores.items() if s >= self._min_score}
+            self._category_of = {i: categories[i] for i in self._scores if i in categories}
+            self._unresolved = {i for i in self._unresolved | unresolved if i in self._scores and i not in categories}
+            self._rebuild()
+            self._compactions += 1
+            self._last_compaction_at = time.time()
+            self._last_compaction_ms = (time.perf_counter() - started) * 1000
+            self._last_error = None
+            return len(self._scores)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            try:
+                self.compact()
+            except Exception:
+                pass  # đã ghi vào metrics, thử lại ở chu kỳ sau
+
+    def start(self, engine) -> None:
+        """Load persisted scores and start the compaction thread"""
+        self._engine = engine
+        try:
+            self.compact()
+        except Exception:
+            pass
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="trending-compact", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the compaction thread and persist whatever is still buffered"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._engine is not None:
+            self.compact()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "summaries": len(self._scores),
+                "boards": len(self._boards),
+                "pending_buckets": len(self._pending),
+                "unresolved_categories": len(self._unresolved),
+                "events": self._events,
+                "persist": self._persist,
+                "compact_interval_seconds": self._interval,
+                "compactions": self._compactions,
+                "failures": self._failures,
+                "last_compaction_at": self._last_compaction_at,
+                "last_compaction_ms": self._last_compaction_ms,
+                "last_error": self._last_error,
+            }
+
+
+trending = TrendingLeaderboard(
+    half_life_hours=TRENDING_HALF_LIFE_HOURS,
+    top_k=TRENDING_TOP_K,
+    min_score=TRENDING_MIN_SCORE,
+    bucket_seconds=TRENDING_BUCKET_SECONDS,
+    interval=TRENDING_COMPACT_INTERVAL,
+    persist=TRENDING_PERSIST,
+)
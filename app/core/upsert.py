@@ -0,0 +1,94 @@
+"""Dialect-aware INSERT ... ON CONFLICT helper shared by the write buffers.
+
+MySQL/MariaDB use INSERT ... ON DUPLICATE KEY UPDATE, SQLite and PostgreSQL
+use INSERT ... ON CONFLICT (key) DO UPDATE; both run as one executemany.
+Any other dialect falls back to a savepoint INSERT per row followed by an
+UPDATE on the key when that insert hits an IntegrityError.
+
+The update clause is given as a callable `set_(existing, new)` returning
+{column name: expression}: `existing` is the table's columns and `new` the
+incoming row (inserted/excluded on the native paths, bound literals in the
+fallback), so one definition serves every dialect.
+"""
+from sqlalchemy import and_, case, insert, literal, update
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import ReturnTypeFromArgs
+
+
+class greatest(ReturnTypeFromArgs):
+    """GREATEST(a, b, ...) on every dialect (MAX() with several arguments on SQLite)"""
+
+    inherit_cache = True
+
+
+@compiles(greatest)
+def _greatest_default(element, compiler, **kw):
+    args = list(element.clauses)
+    expr = args[0]
+    for arg in args[1:]:
+        expr = case((arg > expr, arg), else_=expr)
+    return compiler.process(expr, **kw)
+
+
+@compiles(greatest, "mysql")
+@compiles(greatest, "mariadb")
+@compiles(greatest, "postgresql")
+def _greatest_native(element, compiler, **kw):
+    return f"GREATEST({compiler.process(element.clauses, **kw)})"
+
+
+@compiles(greatest, "sqlite")
+def _greatest_sqlite(element, compiler, **kw):
+    return f"max({compiler.process(element.clauses, **kw)})"
+
+
+class _RowValues:
+    """Incoming row as bound literals, standing in for inserted/excluded in the fallback"""
+
+    def __init__(self, table, row: dict) -> None:
+        self._table = table
+        self._row = row
+
+    def __getattr__(self, name: str):
+        return literal(self._row.get(name), type_=self._table.c[name].type)
+
+
+def _dialect_name(conn) -> str:
+    # Connection có .dialect, Session thì lấy qua bind
+    dialect = conn.dialect if hasattr(conn, "dialect") else conn.get_bind().dialect
+    return dialect.name
+
+
+def upsert(conn, table, rows: list[dict], key: list[str], set_) -> None:
+    """Insert rows, updating the existing row with the same `key` columns instead (Connection or Session)"""
+    if not rows:
+        return
+    dialect_name = _dialect_name(conn)
+    if dialect_name in ("mysql", "mariadb"):
+        stmt = mysql.insert(table)
+        conn.execute(stmt.on_duplicate_key_update(set_(table.c, stmt.inserted)), rows)
+        return
+    if dialect_name in ("sqlite", "postgresql"):
+        stmt = (sqlite if dialect_name == "sqlite" else postgresql).insert(table)
+        conn.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[table.c[name] for name in key],
+                set_=set_(table.c, stmt.excluded),
+            ),
+            rows,
+        )
+        return
+    for row in rows:
+        try:
+            with conn.begin_nested():
+                conn.execute(insert(table), row)
+        except sa_exc.IntegrityError:
+            result = conn.execute(
+                update(table)
+                .where(and_(*(table.c[name] == row[name] for name in key)))
+                .values(set_(table.c, _RowValues(table, row)))
+            )
+            if result.rowcount == 0:
+                raise  # không phải trùng key (FK, NOT NULL...): để caller xử lý
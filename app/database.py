@@ -1,21 +1,80 @@
 # 🧩 8️⃣ app/database.py
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from app.config import DATABASE_URL
+from app.config import (
+    DATABASE_URL,
+    ASYNC_DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+)
+from app.core.pool_metrics import pool_metrics
+
+
+def _pool_options(url: str) -> dict:
+    options = {"pool_pre_ping": DB_POOL_PRE_PING, "pool_recycle": DB_POOL_RECYCLE}
+    # SQLite in-memory dùng SingletonThreadPool/StaticPool, không nhận các tham số QueuePool
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":")):
+        return options
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+    return options
+
 
 engine = create_engine(
     DATABASE_URL,
-    pool_pre_ping=True,
     echo=False,
     future=True,
+    **_pool_options(DATABASE_URL),
 )
+pool_metrics.attach("sync", engine.pool)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Async engine được tạo lazily để chế độ sync vẫn chạy khi chưa cài driver async
+_async_engine = None
+_AsyncSessionLocal = None
+
+
+def get_async_engine():
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            ASYNC_DATABASE_URL,
+            echo=False,
+            **_pool_options(ASYNC_DATABASE_URL),
+        )
+        pool_metrics.attach("async", _async_engine.sync_engine.pool)
+        _AsyncSessionLocal = async_sessionmaker(
+            bind=_async_engine,
+            class_=AsyncSession,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return _async_engine
+
+
+def async_session() -> AsyncSession:
+    get_async_engine()
+    return _AsyncSessionLocal()
+
+
 def get_db():
+    # Checkout lazy: connection chỉ được lấy khi handler chạy query đầu tiên
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with async_session() as db:
+        yield db
@@ -1,12 +1,31 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import exc as sa_exc
 from app.database import engine, Base
+from app.core.pool_metrics import PoolMetricsMiddleware
 from app.routers import user as user_router
 from app.routers import user_role as role_router
 from app.routers import category as category_router
 from app.routers import summary as summary_router
 from app.routers import comment as comment_router
+from app.routers import admin_comment as admin_comment_router
 from app.routers import auth as auth_router
 from app.routers import content_section as sections_router
+from app.routers import author as author_router
+from app.routers import publisher as publisher_router
+from app.routers import book as book_router
+from app.routers import order as order_router
+from app.routers import order_detail as order_detail_router
+from app.routers import cart as cart_router
+from app.routers import cart_item as cart_item_router
+from app.routers import content_section as content_section_router
+from app.routers import note as note_router
+from app.routers import reading_history as reading_history_router
+from app.routers import vocabulary as vocabulary_router
+from app.routers import recommendation as recommendation_router
+from app.routers import rating as rating_router
+from app.routers import metrics as metrics_router
+from app.routers import export as export_router
 from fastapi.middleware.cors import CORSMiddleware
 
 # Tự động import tất cả modules trong app.models để đăng ký models vào Base.metadata
@@ -41,6 +60,16 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(PoolMetricsMiddleware)
+
+
+@app.exception_handler(sa_exc.TimeoutError)
+def pool_exhausted_handler(request, exc):
+    # Hết connection trong pool (quá DB_POOL_TIMEOUT): 503 thay vì 500
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Database connection pool exhausted"},
+    )
 
 
 @app.on_event("startup")
@@ -56,6 +85,54 @@ def on_startup_create_tables():
         pass
 
 
+@app.on_event("startup")
+def on_startup_read_counter():
+    from app.core.read_counter import read_counter
+    read_counter.start(engine)
+
+
+@app.on_event("shutdown")
+def on_shutdown_read_counter():
+    from app.core.read_counter import read_counter
+    read_counter.stop()
+
+
+@app.on_event("startup")
+def on_startup_progress_buffer():
+    from app.core.progress_buffer import progress_buffer
+    progress_buffer.start(engine)
+
+
+@app.on_event("shutdown")
+def on_shutdown_progress_buffer():
+    from app.core.progress_buffer import progress_buffer
+    progress_buffer.stop()
+
+
+@app.on_event("startup")
+def on_startup_trending():
+    from app.core.trending import trending
+    trending.start(engine)
+
+
+@app.on_event("shutdown")
+def on_shutdown_trending():
+    from app.core.trending import trending
+    trending.stop()
+
+
+@app.on_event("startup")
+def on_startup_similar_index():
+    from app.services.similar import similar_index
+    similar_index.load()
+
+
+@app.on_event("shutdown")
+def on_shutdown_password_pool():
+    from app.core.password_pool import password_pool
+    password_pool.shutdown()
+
+
 @app.get("/")
 def root():
     return {"message": "🚀 Database tables created!"}
@@ -75,6 +152,7 @@ app.include_router(cart_item_router.router)
 app.include_router(summary_router.router)
 app.include_router(content_section_router.router)
 app.include_router(comment_router.router)
+app.include_router(admin_comment_router.router)
 app.include_router(note_router.router)
 app.include_router(reading_history_router.router)
 app.include_router(vocabulary_router.router)
@@ -82,3 +160,5 @@ app.include_router(recommendation_router.router)
 app.include_router(rating_router.router)
 app.include_router(auth_router.router)
 app.include_router(sections_router.router)
+app.include_router(metrics_router.router)
+app.include_router(export_router.router)
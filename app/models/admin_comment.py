@@ -1,15 +1,23 @@
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, String, Index
 from sqlalchemy.sql import func
 from app.database import Base
+from sqlalchemy.orm import relationship
 
 
 class AdminComment(Base):
     __tablename__ = "admin_comments"
+    __table_args__ = (
+        Index("ix_admin_comments_path", "path"),
+    )
 
     comment_id = Column(Integer, primary_key=True, index=True)
-    summary_id = Column(Integer, ForeignKey("summaries.summary_id"), nullable=False)
+    summary_id = Column(Integer, ForeignKey("summaries.id"), nullable=False)
     text_content = Column(Text, nullable=False)
     parent_comment_id = Column(Integer, ForeignKey("admin_comments.comment_id"), nullable=True)
+    # Materialized path, cùng định dạng với comments.path
+    path = Column(String(512), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    summary = relationship("Summary", back_populates="admin_comments")
+
 
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, Date, Text
+from sqlalchemy import Column, Integer, String, Date, Text, Index
 from app.database import Base
 from sqlalchemy.orm import relationship
 
 
 class Author(Base):
     __tablename__ = "authors"
+    __table_args__ = (
+        # FULLTEXT chỉ có trên MySQL (search_approved_summaries), SQLite dùng inverted index
+        Index("ft_authors_name", "name", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(255), nullable=False)
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, Date, ForeignKey, Numeric, Text
+from sqlalchemy import Column, Integer, String, Date, ForeignKey, Numeric, Text, Index
 from app.database import Base
 from sqlalchemy.orm import relationship
 
 
 class Book(Base):
     __tablename__ = "books"
+    __table_args__ = (
+        # FULLTEXT chỉ có trên MySQL (search_approved_summaries), SQLite dùng inverted index
+        Index("ft_books_title", "title", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, ForeignKey, Numeric
+from sqlalchemy import Column, Integer, ForeignKey, Numeric, UniqueConstraint
 from app.database import Base
 from sqlalchemy.orm import relationship
 
 
 class CartItem(Base):
     __tablename__ = "cart_items"
+    __table_args__ = (
+        # Mỗi sách chỉ xuất hiện một lần trong giỏ (thêm lại thì cộng quantity)
+        UniqueConstraint("cart_id", "book_id", name="uq_cart_items_cart_book"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     cart_id = Column(Integer, ForeignKey("carts.id"), nullable=False)
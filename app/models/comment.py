@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, String, Enum
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, String, Enum, Index
 from sqlalchemy.sql import func
 from app.database import Base
 from sqlalchemy.orm import relationship
@@ -12,12 +12,20 @@ class CommentAccess(str, enum.Enum):
 
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (
+        Index("ix_comments_summary_id", "summary_id", "id"),
+        # Bước đệ quy của cây comment join theo parent_comment_id
+        Index("ix_comments_parent_comment_id", "parent_comment_id"),
+        Index("ix_comments_path", "path"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     summary_id = Column(Integer, ForeignKey("summaries.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     content = Column(Text, nullable=False)
     parent_comment_id = Column(Integer, ForeignKey("comments.id"), nullable=True)
+    # Materialized path "0000000012/0000000034/": id của tổ tiên + chính nó, gán khi tạo comment
+    path = Column(String(512), nullable=True)
     access = Column(Enum(CommentAccess), default=CommentAccess.PUBLIC)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -1,18 +1,35 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, event
 from sqlalchemy.sql import func
 from app.database import Base
+from sqlalchemy.orm import object_session, relationship
 
 
 class ContentSection(Base):
     __tablename__ = "content_sections"
+    __table_args__ = (
+        # /sections/by-summary: lọc theo summary, keyset theo (section_order, section_id)
+        Index("ix_content_sections_summary_order", "summary_id", "section_order", "section_id"),
+    )
 
     section_id = Column(Integer, primary_key=True, index=True)
-    summary_id = Column(Integer, ForeignKey("summaries.summary_id"), nullable=False)
+    summary_id = Column(Integer, ForeignKey("summaries.id"), nullable=False)
     section_order = Column(Integer, nullable=False)
     title = Column(String(255), nullable=False)
     content = Column(Text, nullable=False)
     audio_segment_url = Column(String(500), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Tăng mỗi lần UPDATE qua ORM; dùng trong ETag của /sections/by-summary (updated_at chỉ chính xác tới giây)
+    version = Column(Integer, nullable=False, server_default="1")
+
+    summary = relationship("Summary", back_populates="content_sections")
+
+
+@event.listens_for(ContentSection, "before_update")
+def _bump_version(mapper, connection, target):
+    # Tăng version ngay trong câu UPDATE, không dùng version_id_col: ghi đồng thời
+    # không bị chặn bởi optimistic locking (StaleDataError)
+    if object_session(target).is_modified(target, include_collections=False):
+        target.version = ContentSection.version + 1
 
 
@@ -0,0 +1,32 @@
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String
+from sqlalchemy.sql import func
+from app.database import Base
+import enum
+
+
+class InteractionSource(str, enum.Enum):
+    RATING = "rating"
+    READING = "reading"
+    PURCHASE = "purchase"
+
+
+class InteractionEvent(Base):
+    """Append-only log of user/summary interactions consumed by the incremental recommender"""
+    __tablename__ = "interaction_events"
+
+    # BIGINT trên MySQL; SQLite chỉ autoincrement với INTEGER PRIMARY KEY
+    event_id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    user_id = Column(Integer, nullable=False)
+    summary_id = Column(Integer, nullable=True)
+    book_id = Column(Integer, nullable=True)  # purchase: áp dụng cho mọi summary của sách
+    source = Column(String(20), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class RecommenderWatermark(Base):
+    """Last interaction event folded into the recommendations, per algorithm"""
+    __tablename__ = "recommender_watermarks"
+
+    algorithm_type = Column(String(100), primary_key=True)
+    last_event_id = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from app.database import Base
 
 class NoteHighlight(Base):
     __tablename__ = "notes_highlights"
+    __table_args__ = (
+        Index("ix_notes_highlights_user_summary", "user_id", "summary_id"),
+    )
 
     note_id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -1,10 +1,16 @@
-from sqlalchemy import Column, Integer, ForeignKey, Numeric
+from sqlalchemy import Column, Integer, ForeignKey, Numeric, Index
 from app.database import Base
 from sqlalchemy.orm import relationship
 
 
 class OrderDetail(Base):
     __tablename__ = "order_details"
+    __table_args__ = (
+        # Dòng của một order (checkout, /order-details/ lọc theo owner qua orders)
+        Index("ix_order_details_order_id", "order_id", "id"),
+        # Recommender cập nhật tăng dần: ai đã mua sách của một summary
+        Index("ix_order_details_book_id", "book_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
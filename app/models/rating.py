@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Float, UniqueConstraint
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class Rating(Base):
+    __tablename__ = "ratings"
+    __table_args__ = (
+        # Mỗi user chỉ có một rating cho mỗi summary (POST /ratings là upsert)
+        UniqueConstraint("user_id", "summary_id", name="uq_ratings_user_summary"),
+    )
+
+    rating_id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    summary_id = Column(Integer, ForeignKey("summaries.id"), nullable=False, index=True)
+    score = Column(Float, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,9 +1,15 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Float, String
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Float, String, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from app.database import Base
 
 class ReadingHistory(Base):
     __tablename__ = "reading_history"
+    __table_args__ = (
+        # Một dòng cho mỗi (user, summary); heartbeat tiến độ được upsert vào đây
+        UniqueConstraint("user_id", "summary_id", name="uq_reading_history_user_summary"),
+        # Recommender cập nhật tăng dần: ai đã đọc một summary
+        Index("ix_reading_history_summary_id", "summary_id"),
+    )
 
     reading_id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
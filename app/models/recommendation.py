@@ -1,9 +1,20 @@
-from sqlalchemy import Column, Integer, Float, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Float, String, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from app.database import Base
+import enum
+
+
+class AlgorithmType(str, enum.Enum):
+    MANUAL = "manual"
+    ITEM_CF = "item_cf"
+
 
 class Recommendation(Base):
     __tablename__ = "recommendations"
+    __table_args__ = (
+        # GET /recommendations/me: top-N của một user theo thuật toán, đọc thẳng theo thứ tự score
+        Index("ix_recommendations_user_algorithm_score", "user_id", "algorithm_type", "score"),
+    )
 
     recommendation_id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
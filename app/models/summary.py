@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, Index
 from sqlalchemy.sql import func
 from app.database import Base
 from sqlalchemy.orm import relationship
@@ -6,12 +6,23 @@ from sqlalchemy.orm import relationship
 
 class Summary(Base):
     __tablename__ = "summaries"
+    __table_args__ = (
+        # FULLTEXT chỉ có trên MySQL (search_approved_summaries), SQLite dùng inverted index
+        Index("ft_summaries_title", "title", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+        # status='approved' + keyset id DESC; summary theo writer (+ status); join theo book
+        Index("ix_summaries_status_id", "status", "id"),
+        Index("ix_summaries_user_status", "user_id", "status"),
+        Index("ix_summaries_book_id", "book_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
     book_id = Column(Integer, ForeignKey("books.id"), nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     status = Column(String(50), nullable=True)
+    # Aggregate denormalized, maintained bởi app.services.ratings trong cùng transaction
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_sum = Column(Float, nullable=False, default=0, server_default="0")
     avg_rating = Column(Float, default=0)
     read_count = Column(Integer, default=0)
     audio_url = Column(String(500), nullable=True)
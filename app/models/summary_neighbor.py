@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Float, ForeignKey, Index, Integer
+from app.database import Base
+
+
+class SummaryNeighbor(Base):
+    """Top-k cosine neighbours of a summary, kept by the item-item recommender"""
+    __tablename__ = "summary_neighbors"
+    __table_args__ = (
+        # Cập nhật tăng dần: tìm các summary đang coi một summary vừa đổi là láng giềng
+        Index("ix_summary_neighbors_neighbor_id", "neighbor_id"),
+    )
+
+    summary_id = Column(Integer, ForeignKey("summaries.id"), primary_key=True)
+    neighbor_id = Column(Integer, ForeignKey("summaries.id"), primary_key=True)
+    similarity = Column(Float, nullable=False)
+
+
+class SummaryNorm(Base):
+    """L2 norm of a summary's interaction column (cosine denominator for incremental updates)"""
+    __tablename__ = "summary_norms"
+
+    summary_id = Column(Integer, ForeignKey("summaries.id"), primary_key=True)
+    norm = Column(Float, nullable=False)
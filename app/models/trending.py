@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Float, Index, Integer
+from app.database import Base
+
+
+class TrendingBucket(Base):
+    """Raw event weight per summary per time bucket; the trending leaderboard decays and sums these"""
+    __tablename__ = "trending_buckets"
+    __table_args__ = (
+        # Compaction xoá các bucket đã hết hạn và nạp lại theo khoảng bucket
+        Index("ix_trending_buckets_bucket", "bucket"),
+    )
+
+    # Không FK: buffer trong RAM có thể còn event của summary vừa bị xoá, lúc nạp lại sẽ JOIN với summaries
+    summary_id = Column(Integer, primary_key=True)
+    bucket = Column(Integer, primary_key=True)  # unix time // TRENDING_BUCKET_SECONDS
+    weight = Column(Float, nullable=False, default=0)
@@ -17,6 +17,7 @@ class User(Base):
     bio = Column(Text, nullable=True)
     date_joined = Column(DateTime(timezone=True), server_default=func.now())
     is_active = Column(Boolean, default=True)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
 
     role = relationship("UserRole", back_populates="users")
     orders = relationship("Order", back_populates="user")
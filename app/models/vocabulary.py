@@ -1,9 +1,22 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, Index
 from sqlalchemy.sql import func
 from app.database import Base
 
+
+def utcnow() -> datetime:
+    # Naive UTC: due_at luôn được ghi và so sánh bằng giờ UTC tính trong Python,
+    # không dùng CURRENT_TIMESTAMP (theo time zone của session trên MySQL)
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class VocabularyFlashcard(Base):
     __tablename__ = "vocabulary_flashcards"
+    __table_args__ = (
+        # /flashcards/due: range scan theo (user_id, due_at), khoá chính là tie-breaker có sẵn trong index
+        Index("ix_vocabulary_flashcards_user_due", "user_id", "due_at"),
+    )
 
     flashcard_id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
@@ -12,3 +25,8 @@ class VocabularyFlashcard(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     last_reviewed = Column(DateTime(timezone=True), nullable=True)
     review_count = Column(Integer, default=0)
+    # Trạng thái SM-2, do app.services.spaced_repetition cập nhật
+    ease = Column(Float, nullable=False, default=2.5, server_default="2.5")
+    interval_days = Column(Integer, nullable=False, default=0, server_default="0")
+    repetitions = Column(Integer, nullable=False, default=0, server_default="0")  # số lần nhớ liên tiếp
+    due_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app import models
+from app.core.pagination import Keyset, PageParams, paginate
 from app.schemas import admin_comment as schema
 from app.core.deps import require_admin
+from app.services import comments as comment_service
 
 router = APIRouter(prefix="/admin-comments", tags=["Admin Comments"])
 
@@ -15,21 +18,29 @@ def create_admin_comment(
     db: Session = Depends(get_db)
 ):
     """Create an admin comment (Admin only)"""
-    item = models.admin_comment.AdminComment(
+    AdminComment = models.admin_comment.AdminComment
+    parent = comment_service.load_parent(db, AdminComment, payload.parent_comment_id, payload.summary_id)
+    item = AdminComment(
         summary_id=payload.summary_id,
         text_content=payload.text_content,
         parent_comment_id=payload.parent_comment_id,
     )
     db.add(item)
+    comment_service.assign_path(db, item, parent)
     db.commit()
     db.refresh(item)
     return item
 
 
 @router.get("/", response_model=list[schema.AdminCommentResponse])
-def list_admin_comments(db: Session = Depends(get_db)):
+def list_admin_comments(
+    response: Response,
+    params: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
     """Get all admin comments (Public access)"""
-    return db.query(models.admin_comment.AdminComment).all()
+    page = paginate(db, select(models.admin_comment.AdminComment), Keyset(models.admin_comment.AdminComment.comment_id), params)
+    return page.apply_headers(response)
 
 
 @router.get("/{admin_comment_id}", response_model=schema.AdminCommentResponse)
@@ -41,6 +52,42 @@ def get_admin_comment(admin_comment_id: int, db: Session = Depends(get_db)):
     return item
 
 
+def _get_admin_comment_or_404(db: Session, admin_comment_id: int):
+    item = db.get(models.admin_comment.AdminComment, admin_comment_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Admin comment not found")
+    return item
+
+
+@router.get("/{admin_comment_id}/subtree", response_model=list[schema.AdminCommentResponse])
+def get_admin_comment_subtree(
+    admin_comment_id: int,
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+):
+    """An admin comment and all its replies, depth-first (Public access)"""
+    node = _get_admin_comment_or_404(db, admin_comment_id)
+    return comment_service.subtree(db, models.admin_comment.AdminComment, node, limit)
+
+
+@router.get("/{admin_comment_id}/ancestors", response_model=list[schema.AdminCommentResponse])
+def get_admin_comment_ancestors(admin_comment_id: int, db: Session = Depends(get_db)):
+    """Parent chain of an admin comment, root first (Public access)"""
+    node = _get_admin_comment_or_404(db, admin_comment_id)
+    return comment_service.ancestors(db, models.admin_comment.AdminComment, node)
+
+
+@router.get("/{admin_comment_id}/replies/latest", response_model=list[schema.AdminCommentResponse])
+def get_latest_admin_replies(
+    admin_comment_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """Newest replies at any depth below an admin comment (Public access)"""
+    node = _get_admin_comment_or_404(db, admin_comment_id)
+    return comment_service.latest_replies(db, models.admin_comment.AdminComment, node, limit)
+
+
 @router.put("/{admin_comment_id}", response_model=schema.AdminCommentResponse)
 def update_admin_comment(
     admin_comment_id: int,
@@ -1,29 +1,45 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
-from app.database import get_db
+from app.database import get_async_db
 from app.schemas import auth as schema
-from app.core.security import verify_password, create_access_token
-from app.core.deps import get_current_user
+from app.core.security import create_access_token
+from app.core.password_pool import password_pool
+from app.core.deps import get_current_user_async
+from app.core.principal_cache import token_versions
 from app import models
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
 @router.post("/login")
-def login(payload: schema.LoginRequest, db: Session = Depends(get_db)):
+async def login(payload: schema.LoginRequest, db: AsyncSession = Depends(get_async_db)):
     # 1️⃣ Find user by email
-    user = db.query(models.user.User).filter(models.user.User.email == payload.email).first()
+    result = await db.execute(
+        select(models.user.User)
+        .options(joinedload(models.user.User.role))
+        .filter(models.user.User.email == payload.email)
+    )
+    user = result.scalars().first()
     
-    # 2️⃣ Verify user and password
-    if not user or not verify_password(payload.password, user.password_hash):
+    # 2️⃣ Verify user and password (bcrypt runs on the password process pool)
+    if not user or not await password_pool.verify(payload.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
         )
     
-    # 3️⃣ Create JWT token
-    token = create_access_token(subject=user.id)
+    # 3️⃣ Create JWT token (signed role + token version claims for the require_* fast path)
+    token = create_access_token(
+        subject=user.id,
+        extra_claims={
+            "role": user.role.role_name if user.role else None,
+            "ver": user.token_version or 0,
+        },
+    )
+    token_versions.set(user.id, user.token_version or 0)
     
     # 4️⃣ Prepare user data to return
     user_data = {
@@ -44,7 +60,7 @@ def login(payload: schema.LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/me")
-def me(current_user = Depends(get_current_user)):
+async def me(current_user = Depends(get_current_user_async)):
     return {
         "id": current_user.id,
         "username": current_user.username,
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app import models
+from app.core.pagination import Keyset, PageParams, paginate
 from app.schemas import author as schema
 from app.core.deps import require_admin
+from app.core.response_cache import SUMMARY_LISTS_TAG, response_cache
+from app.services.search import search_service
 
 router = APIRouter(prefix="/authors", tags=["Authors"])
 
@@ -28,9 +32,14 @@ def create_author(
 
 
 @router.get("/", response_model=list[schema.AuthorResponse])
-def list_authors(db: Session = Depends(get_db)):
+def list_authors(
+    response: Response,
+    params: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
     """Get all authors (Public access)"""
-    return db.query(models.author.Author).all()
+    page = paginate(db, select(models.author.Author), Keyset(models.author.Author.id), params)
+    return page.apply_headers(response)
 
 
 @router.get("/{author_id}", response_model=schema.AuthorResponse)
@@ -57,6 +66,8 @@ def update_author(
         setattr(item, field, value)
     db.commit()
     db.refresh(item)
+    search_service.refresh_summaries(db, search_service.summary_ids_for_author(db, author_id))
+    response_cache.invalidate(SUMMARY_LISTS_TAG, f"author:{author_id}")
     return item
 
 
@@ -70,7 +81,10 @@ def delete_author(
     item = db.get(models.author.Author, author_id)
     if not item:
         raise HTTPException(status_code=404, detail="Author not found")
+    summary_ids = search_service.summary_ids_for_author(db, author_id)
     db.delete(item)
     db.commit()
+    search_service.refresh_summaries(db, summary_ids)
+    response_cache.invalidate(SUMMARY_LISTS_TAG, f"author:{author_id}")
     return {"deleted": True}
 
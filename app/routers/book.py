@@ -1,12 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app import models
+from app.core.pagination import Keyset, PageParams, paginate_async
 from app.schemas import book as schema
 from sqlalchemy.orm import selectinload
+from app.core.response_cache import SUMMARY_LISTS_TAG, book_tags, response_cache
+from app.services.search import search_service
 
 router = APIRouter(prefix="/books", tags=["Books"])
 
+BOOK_ADAPTER = TypeAdapter(schema.BookResponse)
+
 
 @router.post("/", response_model=schema.BookResponse)
 def create_book(payload: schema.BookCreate, db: Session = Depends(get_db)):
@@ -27,20 +35,29 @@ def create_book(payload: schema.BookCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=list[schema.BookResponse])
-def list_books(db: Session = Depends(get_db)):
-    return db.query(models.book.Book).all()
+async def list_books(
+    response: Response,
+    params: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
+):
+    page = await paginate_async(db, select(models.book.Book), Keyset(models.book.Book.id), params)
+    return page.apply_headers(response)
 
 
 @router.get("/{book_id}", response_model=schema.BookResponse)
-def get_book(book_id: int, db: Session = Depends(get_db)):
-    item = db.query(models.book.Book).options(
+async def get_book(book_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
+    cached = response_cache.get(request)
+    if cached is not None:
+        return cached.to_response(request)
+    result = await db.execute(select(models.book.Book).options(
         selectinload(models.book.Book.category),
         selectinload(models.book.Book.author),
         selectinload(models.book.Book.publisher),
-    ).filter(models.book.Book.id == book_id).first()
+    ).filter(models.book.Book.id == book_id))
+    item = result.scalars().first()
     if not item:
         raise HTTPException(status_code=404, detail="Book not found")
-    return item
+    return response_cache.store(request, BOOK_ADAPTER, item, book_tags(item))
 
 
 
@@ -53,6 +70,8 @@ def update_book(book_id: int, payload: schema.BookUpdate, db: Session = Depends(
         setattr(item, field, value)
     db.commit()
     db.refresh(item)
+    search_service.refresh_summaries(db, search_service.summary_ids_for_book(db, book_id))
+    response_cache.invalidate(SUMMARY_LISTS_TAG, f"book:{book_id}")
     return item
 
 
@@ -61,7 +80,10 @@ def delete_book(book_id: int, db: Session = Depends(get_db)):
     item = db.get(models.book.Book, book_id)
     if not item:
         raise HTTPException(status_code=404, detail="Book not found")
+    summary_ids = search_service.summary_ids_for_book(db, book_id)
     db.delete(item)
     db.commit()
+    search_service.refresh_summaries(db, summary_ids)
+    response_cache.invalidate(SUMMARY_LISTS_TAG, f"book:{book_id}")
     return {"deleted": True}
 
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app import models
 from app.schemas import cart as schema
+from app.core.ownership import get_owned
 from app.core.deps import get_current_user
 
 router = APIRouter(prefix="/carts", tags=["Carts"])
@@ -49,18 +50,7 @@ def get_cart(
     db: Session = Depends(get_db)
 ):
     """Get a specific cart by ID (only if it belongs to current user)"""
-    item = db.get(models.cart.Cart, cart_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Cart not found")
-    
-    # Check if cart belongs to current user
-    if item.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this cart"
-        )
-    
-    return item
+    return get_owned(db, models.cart.Cart, cart_id, current_user.id)
 
 
 @router.delete("/{cart_id}")
@@ -70,17 +60,7 @@ def delete_cart(
     db: Session = Depends(get_db)
 ):
     """Delete a cart (only if it belongs to current user)"""
-    item = db.get(models.cart.Cart, cart_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Cart not found")
-    
-    # Check if cart belongs to current user
-    if item.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this cart"
-        )
-    
+    item = get_owned(db, models.cart.Cart, cart_id, current_user.id, action="delete")
     db.delete(item)
     db.commit()
     return {"deleted": True}
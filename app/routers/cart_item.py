@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app import models
 from app.schemas import cart_item as schema
+from app.core.ownership import get_owned, owned_select
 from app.core.deps import get_current_user
+from app.services import cart as cart_service
 
 router = APIRouter(prefix="/cart-items", tags=["Cart Items"])
 
@@ -58,22 +60,24 @@ def create_cart_item(
     return item
 
 
+@router.post("/bulk", response_model=list[schema.CartItemResponse])
+def bulk_update_cart_items(
+    payload: schema.CartBulkRequest,
+    current_user = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Apply add/set/remove operations to the current user's cart in one transaction; returns the whole cart"""
+    return cart_service.apply_operations(db, current_user.id, payload.operations)
+
+
 @router.get("/me", response_model=list[schema.CartItemResponse])
 def get_my_cart_items(
     current_user = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get all cart items for the current user"""
-    cart = db.query(models.cart.Cart).filter(
-        models.cart.Cart.user_id == current_user.id
-    ).first()
-    
-    if not cart:
-        return []
-    
-    return db.query(models.cart_item.CartItem).filter(
-        models.cart_item.CartItem.cart_id == cart.id
-    ).all()
+    stmt = owned_select(models.cart_item.CartItem, current_user.id).order_by(models.cart_item.CartItem.id)
+    return db.execute(stmt).scalars().all()
 
 
 @router.get("/{cart_item_id}", response_model=schema.CartItemResponse)
@@ -83,19 +87,7 @@ def get_cart_item(
     db: Session = Depends(get_db)
 ):
     """Get a specific cart item (only if it belongs to current user's cart)"""
-    item = db.get(models.cart_item.CartItem, cart_item_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Cart item not found")
-    
-    # Check if cart item belongs to current user's cart
-    cart = db.get(models.cart.Cart, item.cart_id)
-    if not cart or cart.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this cart item"
-        )
-    
-    return item
+    return get_owned(db, models.cart_item.CartItem, cart_item_id, current_user.id)
 
 
 @router.put("/{cart_item_id}", response_model=schema.CartItemResponse)
@@ -106,18 +98,7 @@ def update_cart_item(
     db: Session = Depends(get_db)
 ):
     """Update a cart item (only if it belongs to current user's cart)"""
-    item = db.get(models.cart_item.CartItem, cart_item_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Cart item not found")
-    
-    # Check if cart item belongs to current user's cart
-    cart = db.get(models.cart.Cart, item.cart_id)
-    if not cart or cart.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this cart item"
-        )
-    
+    item = get_owned(db, models.cart_item.CartItem, cart_item_id, current_user.id, action="update")
     for field, value in payload.model_dump(exclude_unset=True).items():
         setattr(item, field, value)
     db.commit()
@@ -132,18 +113,7 @@ def delete_cart_item(
     db: Session = Depends(get_db)
 ):
     """Delete a cart item (only if it belongs to current user's cart)"""
-    item = db.get(models.cart_item.CartItem, cart_item_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Cart item not found")
-    
-    # Check if cart item belongs to current user's cart
-    cart = db.get(models.cart.Cart, item.cart_id)
-    if not cart or cart.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this cart item"
-        )
-    
+    item = get_owned(db, models.cart_item.CartItem, cart_item_id, current_user.id, action="delete")
     db.delete(item)
     db.commit()
     return {"deleted": True}
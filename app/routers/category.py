@@ -4,6 +4,7 @@ from app.database import get_db
 from app import models
 from app.schemas import category as schema
 from app.core.deps import require_admin
+from app.core.response_cache import SUMMARY_LISTS_TAG, response_cache
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
 
@@ -55,6 +56,7 @@ def update_category(
         item.category_name = payload.category_name
     db.commit()
     db.refresh(item)
+    response_cache.invalidate(SUMMARY_LISTS_TAG, f"category:{category_id}")
     return item
 
 
@@ -70,6 +72,7 @@ def delete_category(
         raise HTTPException(status_code=404, detail="Category not found")
     db.delete(item)
     db.commit()
+    response_cache.invalidate(SUMMARY_LISTS_TAG, f"category:{category_id}")
     return {"deleted": True}
 
 
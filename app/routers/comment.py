@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app import models
+from app.core.pagination import Keyset, PageParams, paginate
 from app.schemas import comment as schema
 from app.core.deps import get_current_user
+from app.core.trending import trending
+from app.services import comments as comment_service
 
 router = APIRouter(prefix="/comments", tags=["Comments"])
 
@@ -15,6 +21,7 @@ def create_comment(
     db: Session = Depends(get_db)
 ):
     """Create a new comment (Authenticated users only)"""
+    parent = comment_service.load_parent(db, models.comment.Comment, payload.parent_comment_id, payload.summary_id)
     item = models.comment.Comment(
         summary_id=payload.summary_id,
         user_id=current_user.id,
@@ -23,15 +30,26 @@ def create_comment(
         access=payload.access,
     )
     db.add(item)
+    comment_service.assign_path(db, item, parent)
     db.commit()
+    trending.record(payload.summary_id, "comment")
     db.refresh(item)
     return item
 
 
 @router.get("/", response_model=list[schema.CommentResponse])
-def list_comments(db: Session = Depends(get_db)):
+def list_comments(
+    response: Response,
+    params: PageParams = Depends(),
+    summary_id: Optional[int] = Query(None, description="Only comments of this summary (threads: /summaries/{id}/comments/tree)"),
+    db: Session = Depends(get_db),
+):
     """Get all comments (Public access)"""
-    return db.query(models.comment.Comment).all()
+    stmt = select(models.comment.Comment)
+    if summary_id is not None:
+        stmt = stmt.filter(models.comment.Comment.summary_id == summary_id)
+    page = paginate(db, stmt, Keyset(models.comment.Comment.id), params)
+    return page.apply_headers(response)
 
 
 @router.get("/{comment_id}", response_model=schema.CommentResponse)
@@ -43,6 +61,45 @@ def get_comment(comment_id: int, db: Session = Depends(get_db)):
     return item
 
 
+def _get_comment_or_404(db: Session, comment_id: int):
+    item = db.get(models.comment.Comment, comment_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Comment not found")
+    return item
+
+
+@router.get("/{comment_id}/subtree", response_model=list[schema.CommentResponse])
+def get_comment_subtree(
+    comment_id: int,
+    limit: int = Query(500, ge=1, le=5000),
+    db: Session = Depends(get_db),
+):
+    """A comment and all its replies, depth-first, via one path-prefix query (Public access)"""
+    node = _get_comment_or_404(db, comment_id)
+    comment_service.ensure_public(db, models.comment.Comment, node)
+    return comment_service.subtree(db, models.comment.Comment, node, limit)
+
+
+@router.get("/{comment_id}/ancestors", response_model=list[schema.CommentResponse])
+def get_comment_ancestors(comment_id: int, db: Session = Depends(get_db)):
+    """Parent chain of a comment, root first (Public access)"""
+    node = _get_comment_or_404(db, comment_id)
+    comment_service.ensure_public(db, models.comment.Comment, node)
+    return comment_service.ancestors(db, models.comment.Comment, node)
+
+
+@router.get("/{comment_id}/replies/latest", response_model=list[schema.CommentResponse])
+def get_latest_replies(
+    comment_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    """Newest replies at any depth below a comment (Public access)"""
+    node = _get_comment_or_404(db, comment_id)
+    comment_service.ensure_public(db, models.comment.Comment, node)
+    return comment_service.latest_replies(db, models.comment.Comment, node, limit)
+
+
 @router.put("/{comment_id}", response_model=schema.CommentResponse)
 def update_comment(
     comment_id: int,
@@ -1,32 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import asc
-from app.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from app.database import get_async_db
 from app import models
+from app.core.conditional import is_not_modified, not_modified_response, validator_headers, weak_etag
+from app.core.pagination import Keyset, PageParams, paginate_async
 from app.schemas import content_section as schema
+from app.services.reading import section_state
 
 router = APIRouter(prefix="/sections", tags=["Sections"])
 
 
 @router.get("/by-summary/{summary_id}", response_model=list[schema.SectionResponse])
-def list_sections_by_summary(
+async def list_sections_by_summary(
     summary_id: int,
-    page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    params: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
 ):
+    """List sections of a summary; supports If-None-Match / If-Modified-Since (Public access)"""
+    ContentSection = models.content_section.ContentSection
+    # Validator rẻ: chỉ aggregate trên summary_id, không đọc cột content (Text)
+    state = await section_state(db, summary_id)
+    last_modified = state.last_modified
+    etag = weak_etag(state.token, request.url.query)
+    headers = validator_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified_response(headers)
+    response.headers.update(headers)
+
     q = (
-        db.query(models.content_section.ContentSection)
-        .filter(models.content_section.ContentSection.summary_id == summary_id)
-        .order_by(asc(models.content_section.ContentSection.section_order))
+        select(ContentSection)
+        .filter(ContentSection.summary_id == summary_id)
     )
-    items = q.offset((page - 1) * page_size).limit(page_size).all()
-    return items
+    key = Keyset(ContentSection.section_id, sort=ContentSection.section_order)
+    page = await paginate_async(db, q, key, params)
+    return page.apply_headers(response)
 
 
 @router.get("/{section_id}", response_model=schema.SectionResponse)
-def get_section(section_id: int, db: Session = Depends(get_db)):
-    item = db.get(models.content_section.ContentSection, section_id)
+async def get_section(section_id: int, db: AsyncSession = Depends(get_async_db)):
+    item = await db.get(models.content_section.ContentSection, section_id)
     if not item:
         raise HTTPException(status_code=404, detail="Section not found")
     return item
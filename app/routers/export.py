@@ -0,0 +1,105 @@
+import csv
+import enum
+import io
+import json
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from app import models
+from app.core.deps import require_admin
+from app.database import engine
+
+router = APIRouter(prefix="/export", tags=["Export"])
+
+# Dataset -> model; resolved lazily so a model added later is picked up by name
+DATASETS = {
+    "books": lambda: models.book.Book,
+    "orders": lambda: models.order.Order,
+    "ratings": lambda: models.rating.Rating,
+    "reading-history": lambda: models.reading_history.ReadingHistory,
+}
+YIELD_PER = 1000
+
+
+def _jsonable(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _select_columns(dataset: str, fields: Optional[str]):
+    if dataset not in DATASETS:
+        raise HTTPException(status_code=404, detail="Unknown export dataset")
+    table = DATASETS[dataset]().__table__
+    if not fields:
+        return list(table.columns)
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in table.columns]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return [table.columns[name] for name in names]
+
+
+def _stream_rows(columns, fmt: str, compress: bool):
+    """Yield encoded chunks, one per server-side cursor partition"""
+    gzipper = zlib.compressobj(wbits=31) if compress else None
+    names = [column.name for column in columns]
+
+    def emit(text: str) -> bytes:
+        data = text.encode("utf-8")
+        return gzipper.compress(data) if gzipper else data
+
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(names)
+        yield emit(buffer.getvalue())
+
+    # Connection riêng (không qua get_db): stream vẫn chạy sau khi dependency đã đóng
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=YIELD_PER).execute(
+            select(*columns).order_by(*columns[0].table.primary_key.columns)
+        )
+        for partition in result.partitions():
+            if fmt == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerows([_jsonable(value) for value in row] for row in partition)
+                chunk = buffer.getvalue()
+            else:
+                chunk = "".join(
+                    json.dumps({name: _jsonable(value) for name, value in zip(names, row)}, ensure_ascii=False) + "\n"
+                    for row in partition
+                )
+            data = emit(chunk)
+            if data:
+                yield data
+    if gzipper:
+        yield gzipper.flush()
+
+
+@router.get("/{dataset}")
+def export_dataset(
+    dataset: str,
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="ndjson or csv"),
+    fields: Optional[str] = Query(None, description="Comma-separated column names (default: all)"),
+    gzip: bool = Query(False, description="gzip-compress the stream"),
+    current_user = Depends(require_admin),
+):
+    """Stream a whole table as NDJSON/CSV with flat memory use (Admin only)"""
+    columns = _select_columns(dataset, fields)
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    headers = {"Content-Disposition": f'attachment; filename="{dataset}.{format}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(_stream_rows(columns, format, gzip), media_type=media_type, headers=headers)
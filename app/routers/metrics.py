@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends
+from app.core.deps import require_admin
+from app.core.pool_metrics import pool_metrics
+from app.core.progress_buffer import progress_buffer
+from app.core.read_counter import read_counter
+from app.core.trending import trending
+
+router = APIRouter(prefix="/internal/metrics", tags=["Metrics"])
+
+
+@router.get("/db-pool")
+def get_db_pool_metrics(current_user = Depends(require_admin)):
+    """Connection pool status and per-route checkout metrics (Admin only)"""
+    return pool_metrics.snapshot()
+
+
+@router.delete("/db-pool")
+def reset_db_pool_metrics(current_user = Depends(require_admin)):
+    """Reset per-route checkout metrics (Admin only)"""
+    pool_metrics.reset()
+    return {"reset": True}
+
+
+@router.get("/read-counter")
+def get_read_counter_metrics(current_user = Depends(require_admin)):
+    """Pending read_count increments and how far the write-behind buffer lags (Admin only)"""
+    return read_counter.snapshot()
+
+
+@router.get("/progress-buffer")
+def get_progress_buffer_metrics(current_user = Depends(require_admin)):
+    """Coalesced reading heartbeats waiting to be upserted (Admin only)"""
+    return progress_buffer.snapshot()
+
+
+@router.get("/trending")
+def get_trending_metrics(current_user = Depends(require_admin)):
+    """Trending leaderboard size, buffered event weights and compaction status (Admin only)"""
+    return trending.snapshot()
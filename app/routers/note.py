@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app import models
+from app.core.pagination import Keyset, PageParams, paginate
 from app.schemas import note as schema
 
 router = APIRouter(prefix="/notes", tags=["Notes"])
@@ -23,8 +25,13 @@ def create_note(payload: schema.NoteCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=list[schema.NoteResponse])
-def list_notes(db: Session = Depends(get_db)):
-    return db.query(models.note.NoteHighlight).all()
+def list_notes(
+    response: Response,
+    params: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    page = paginate(db, select(models.note.NoteHighlight), Keyset(models.note.NoteHighlight.note_id), params)
+    return page.apply_headers(response)
 
 
 @router.get("/{note_id}", response_model=schema.NoteResponse)
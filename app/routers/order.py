@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app import models
+from app.core.pagination import Keyset, PageParams, paginate
 from app.schemas import order as schema
+from app.core.ownership import get_owned
 from app.core.deps import get_current_user, require_admin
+from app.services import checkout as checkout_service
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
@@ -33,15 +37,29 @@ def create_order(
     return item
 
 
+@router.post("/checkout", response_model=schema.CheckoutResponse, status_code=status.HTTP_201_CREATED)
+def checkout(
+    payload: schema.CheckoutRequest,
+    current_user = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Place an order from the current user's cart (prices and stock checked server-side)"""
+    return checkout_service.checkout(db, current_user.id, payload.model_dump())
+
+
 @router.get("/", response_model=list[schema.OrderResponse])
 def list_orders(
+    response: Response,
+    params: PageParams = Depends(),
     current_user = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Get all orders for the current user"""
-    return db.query(models.order.Order).filter(
+    stmt = select(models.order.Order).filter(
         models.order.Order.user_id == current_user.id
-    ).all()
+    )
+    page = paginate(db, stmt, Keyset(models.order.Order.id, descending=True), params)
+    return page.apply_headers(response)
 
 
 @router.get("/{order_id}", response_model=schema.OrderResponse)
@@ -51,18 +69,7 @@ def get_order(
     db: Session = Depends(get_db)
 ):
     """Get a specific order by ID (only if it belongs to current user)"""
-    item = db.get(models.order.Order, order_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Order not found")
-    
-    # Check if order belongs to current user
-    if item.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this order"
-        )
-    
-    return item
+    return get_owned(db, models.order.Order, order_id, current_user.id)
 
 
 @router.put("/{order_id}", response_model=schema.OrderResponse)
@@ -73,17 +80,7 @@ def update_order(
     db: Session = Depends(get_db)
 ):
     """Update an order (only if it belongs to current user)"""
-    item = db.get(models.order.Order, order_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Order not found")
-    
-    # Check if order belongs to current user
-    if item.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this order"
-        )
-    
+    item = get_owned(db, models.order.Order, order_id, current_user.id, action="update")
     for field, value in payload.model_dump(exclude_unset=True).items():
         setattr(item, field, value)
     db.commit()
@@ -98,17 +95,7 @@ def delete_order(
     db: Session = Depends(get_db)
 ):
     """Delete an order (only if it belongs to current user)"""
-    item = db.get(models.order.Order, order_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Order not found")
-    
-    # Check if order belongs to current user
-    if item.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this order"
-        )
-    
+    item = get_owned(db, models.order.Order, order_id, current_user.id, action="delete")
     db.delete(item)
     db.commit()
     return {"deleted": True}
@@ -1,14 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app import models
+from app.core.pagination import Keyset, PageParams, paginate
+from app.core.ownership import get_owned, owned_select
+from app.core.deps import get_current_user
 from app.schemas import order_detail as schema
+from app.services import interaction_log
+from app.models.interaction_event import InteractionSource
 
 router = APIRouter(prefix="/order-details", tags=["Order Details"])
 
 
 @router.post("/", response_model=schema.OrderDetailResponse)
-def create_order_detail(payload: schema.OrderDetailCreate, db: Session = Depends(get_db)):
+def create_order_detail(
+    payload: schema.OrderDetailCreate,
+    current_user = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Add a line to one of the current user's orders"""
+    get_owned(db, models.order.Order, payload.order_id, current_user.id, action="update")
     item = models.order_detail.OrderDetail(
         order_id=payload.order_id,
         book_id=payload.book_id,
@@ -16,42 +27,61 @@ def create_order_detail(payload: schema.OrderDetailCreate, db: Session = Depends
         price=payload.price,
     )
     db.add(item)
+    interaction_log.record(db, current_user.id, InteractionSource.PURCHASE, book_id=payload.book_id)
     db.commit()
     db.refresh(item)
     return item
 
 
 @router.get("/", response_model=list[schema.OrderDetailResponse])
-def list_order_details(db: Session = Depends(get_db)):
-    return db.query(models.order_detail.OrderDetail).all()
+def list_order_details(
+    response: Response,
+    params: PageParams = Depends(),
+    current_user = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Get the order lines of the current user's orders"""
+    stmt = owned_select(models.order_detail.OrderDetail, current_user.id)
+    page = paginate(db, stmt, Keyset(models.order_detail.OrderDetail.id), params)
+    return page.apply_headers(response)
 
 
 @router.get("/{order_detail_id}", response_model=schema.OrderDetailResponse)
-def get_order_detail(order_detail_id: int, db: Session = Depends(get_db)):
-    item = db.get(models.order_detail.OrderDetail, order_detail_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Order detail not found")
-    return item
+def get_order_detail(
+    order_detail_id: int,
+    current_user = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get an order line (only if its order belongs to current user)"""
+    return get_owned(db, models.order_detail.OrderDetail, order_detail_id, current_user.id)
 
 
 @router.put("/{order_detail_id}", response_model=schema.OrderDetailResponse)
-def update_order_detail(order_detail_id: int, payload: schema.OrderDetailUpdate, db: Session = Depends(get_db)):
-    item = db.get(models.order_detail.OrderDetail, order_detail_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Order detail not found")
+def update_order_detail(
+    order_detail_id: int,
+    payload: schema.OrderDetailUpdate,
+    current_user = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Update an order line (only if its order belongs to current user)"""
+    item = get_owned(db, models.order_detail.OrderDetail, order_detail_id, current_user.id, action="update")
     for field, value in payload.model_dump(exclude_unset=True).items():
         setattr(item, field, value)
+    interaction_log.record(db, current_user.id, InteractionSource.PURCHASE, book_id=item.book_id)
     db.commit()
     db.refresh(item)
     return item
 
 
 @router.delete("/{order_detail_id}")
-def delete_order_detail(order_detail_id: int, db: Session = Depends(get_db)):
-    item = db.get(models.order_detail.OrderDetail, order_detail_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Order detail not found")
+def delete_order_detail(
+    order_detail_id: int,
+    current_user = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Delete an order line (only if its order belongs to current user)"""
+    item = get_owned(db, models.order_detail.OrderDetail, order_detail_id, current_user.id, action="delete")
+    interaction_log.record(db, current_user.id, InteractionSource.PURCHASE, book_id=item.book_id)
     db.delete(item)
     db.commit()
     return {"deleted": True}
-
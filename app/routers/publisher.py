@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app import models
+from app.core.pagination import Keyset, PageParams, paginate
 from app.schemas import publisher as schema
 from app.core.deps import require_admin
+from app.core.response_cache import SUMMARY_LISTS_TAG, response_cache
 
 router = APIRouter(prefix="/publishers", tags=["Publishers"])
 
@@ -23,9 +26,14 @@ def create_publisher(
 
 
 @router.get("/", response_model=list[schema.PublisherResponse])
-def list_publishers(db: Session = Depends(get_db)):
+def list_publishers(
+    response: Response,
+    params: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
     """Get all publishers (Public access)"""
-    return db.query(models.publisher.Publisher).all()
+    page = paginate(db, select(models.publisher.Publisher), Keyset(models.publisher.Publisher.id), params)
+    return page.apply_headers(response)
 
 
 @router.get("/{publisher_id}", response_model=schema.PublisherResponse)
@@ -52,6 +60,7 @@ def update_publisher(
         item.name = payload.name
     db.commit()
     db.refresh(item)
+    response_cache.invalidate(SUMMARY_LISTS_TAG, f"publisher:{publisher_id}")
     return item
 
 
@@ -67,5 +76,6 @@ def delete_publisher(
         raise HTTPException(status_code=404, detail="Publisher not found")
     db.delete(item)
     db.commit()
+    response_cache.invalidate(SUMMARY_LISTS_TAG, f"publisher:{publisher_id}")
     return {"deleted": True}
 
@@ -1,28 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app import models
+from app.core.deps import require_admin
+from app.core.pagination import Keyset, PageParams, paginate
+from app.core.response_cache import response_cache
+from app.core.trending import trending
 from app.schemas import rating as schema
+from app.services import ratings as rating_service
+from app.services import interaction_log
+from app.models.interaction_event import InteractionSource
 
 router = APIRouter(prefix="/ratings", tags=["Ratings"])
 
 
 @router.post("/", response_model=schema.RatingResponse)
 def create_rating(payload: schema.RatingCreate, db: Session = Depends(get_db)):
-    item = models.rating.Rating(
-        user_id=payload.user_id,
-        summary_id=payload.summary_id,
-        score=payload.score,
-    )
-    db.add(item)
+    """Create or replace the user's rating for a summary (upsert on user_id + summary_id)"""
+    if not db.get(models.summary.Summary, payload.summary_id):
+        raise HTTPException(status_code=404, detail="Summary not found")
+    item = rating_service.upsert_rating(db, payload.user_id, payload.summary_id, payload.score)
+    interaction_log.record(db, payload.user_id, InteractionSource.RATING, summary_id=payload.summary_id)
     db.commit()
+    # avg_rating nằm trong SummaryResponse đã cache
+    response_cache.invalidate(f"summary:{payload.summary_id}")
+    trending.record(payload.summary_id, "rating")
     db.refresh(item)
     return item
 
 
 @router.get("/", response_model=list[schema.RatingResponse])
-def list_ratings(db: Session = Depends(get_db)):
-    return db.query(models.rating.Rating).all()
+def list_ratings(
+    response: Response,
+    params: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    page = paginate(db, select(models.rating.Rating), Keyset(models.rating.Rating.rating_id), params)
+    return page.apply_headers(response)
+
+
+@router.get("/aggregates/drift")
+def check_rating_drift(
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_admin),
+):
+    """List summaries whose rating aggregates disagree with the ratings table (Admin only)"""
+    drift = rating_service.find_drift(db, limit=limit)
+    return {"drifted": len(drift), "items": drift}
+
+
+@router.post("/aggregates/reconcile")
+def reconcile_rating_aggregates(
+    chunk_size: int = 500,
+    db: Session = Depends(get_db),
+    current_user = Depends(require_admin),
+):
+    """Recompute rating_count/rating_sum/avg_rating for all summaries in chunks (Admin only)"""
+    corrected = rating_service.reconcile(db, chunk_size=chunk_size)
+    if corrected:
+        response_cache.clear()
+    return {"corrected": corrected}
 
 
 @router.get("/{rating_id}", response_model=schema.RatingResponse)
@@ -35,23 +74,30 @@ def get_rating(rating_id: int, db: Session = Depends(get_db)):
 
 @router.put("/{rating_id}", response_model=schema.RatingResponse)
 def update_rating(rating_id: int, payload: schema.RatingUpdate, db: Session = Depends(get_db)):
-    item = db.get(models.rating.Rating, rating_id)
+    item = db.get(models.rating.Rating, rating_id, with_for_update=True)
     if not item:
         raise HTTPException(status_code=404, detail="Rating not found")
-    for field, value in payload.model_dump(exclude_unset=True).items():
-        setattr(item, field, value)
+    if payload.score is not None:
+        rating_service.set_score(db, item, payload.score)
+        interaction_log.record(db, item.user_id, InteractionSource.RATING, summary_id=item.summary_id)
     db.commit()
+    if payload.score is not None:
+        response_cache.invalidate(f"summary:{item.summary_id}")
+        trending.record(item.summary_id, "rating")
     db.refresh(item)
     return item
 
 
 @router.delete("/{rating_id}")
 def delete_rating(rating_id: int, db: Session = Depends(get_db)):
-    item = db.get(models.rating.Rating, rating_id)
+    item = db.get(models.rating.Rating, rating_id, with_for_update=True)
     if not item:
         raise HTTPException(status_code=404, detail="Rating not found")
-    db.delete(item)
+    summary_id = item.summary_id
+    interaction_log.record(db, item.user_id, InteractionSource.RATING, summary_id=summary_id)
+    rating_service.remove_rating(db, item)
     db.commit()
+    response_cache.invalidate(f"summary:{summary_id}")
     return {"deleted": True}
 
 
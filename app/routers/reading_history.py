@@ -1,31 +1,96 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_async_db, get_db
 from app import models
+from app.core.deps import get_current_user_async
+from app.core.pagination import Keyset, PageParams, paginate
+from app.core.progress_buffer import PendingProgress, progress_buffer, upsert_progress
 from app.schemas import reading_history as schema
+from app.services import interaction_log
+from app.models.interaction_event import InteractionSource
 
 router = APIRouter(prefix="/reading-history", tags=["ReadingHistory"])
 
 
 @router.post("/", response_model=schema.ReadingHistoryResponse)
 def create_reading_history(payload: schema.ReadingHistoryCreate, db: Session = Depends(get_db)):
-    item = models.reading_history.ReadingHistory(
+    """Record progress for (user, summary): adds time_spent and keeps the highest progress_percent"""
+    ReadingHistory = models.reading_history.ReadingHistory
+    row = PendingProgress(
         user_id=payload.user_id,
         summary_id=payload.summary_id,
         last_section_id=payload.last_section_id,
         progress_percent=payload.progress_percent or 0,
         time_spent=payload.time_spent or 0,
         device_type=payload.device_type,
-    )
-    db.add(item)
+    ).as_row()
+    upsert_progress(db, [row])
+    interaction_log.record(db, payload.user_id, InteractionSource.READING, summary_id=payload.summary_id)
     db.commit()
-    db.refresh(item)
-    return item
+    return db.scalars(
+        select(ReadingHistory).filter(
+            ReadingHistory.user_id == payload.user_id,
+            ReadingHistory.summary_id == payload.summary_id,
+        )
+    ).one()
+
+
+@router.post("/progress", response_model=schema.ProgressAccepted, status_code=202)
+async def track_progress(
+    payload: schema.ProgressBatch,
+    current_user = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Accept a batch of reading heartbeats; they are coalesced and written in the background (Authenticated users only)"""
+    # Kiểm tra id trước khi vào buffer: một id sai sẽ làm lỗi cả lô upsert khi flush
+    summary_ids = {beat.summary_id for beat in payload.heartbeats}
+    result = await db.execute(select(models.summary.Summary.id).where(models.summary.Summary.id.in_(summary_ids)))
+    missing = sorted(summary_ids - set(result.scalars()))
+    if missing:
+        raise HTTPException(status_code=404, detail={"message": "Summary not found", "summary_ids": missing})
+    section_ids = {beat.last_section_id for beat in payload.heartbeats if beat.last_section_id is not None}
+    if section_ids:
+        ContentSection = models.content_section.ContentSection
+        result = await db.execute(
+            select(ContentSection.section_id, ContentSection.summary_id)
+            .where(ContentSection.section_id.in_(section_ids))
+        )
+        owners = dict(result.all())
+        invalid = sorted({
+            beat.last_section_id for beat in payload.heartbeats
+            if beat.last_section_id is not None and owners.get(beat.last_section_id) != beat.summary_id
+        })
+        if invalid:
+            raise HTTPException(
+                status_code=404,
+                detail={"message": "Section not found in summary", "section_ids": invalid},
+            )
+    pending = progress_buffer.add([
+        PendingProgress(
+            user_id=current_user.id,
+            summary_id=beat.summary_id,
+            last_section_id=beat.last_section_id,
+            progress_percent=beat.progress_percent,
+            time_spent=beat.time_spent,
+            device_type=beat.device_type,
+        )
+        for beat in payload.heartbeats
+    ])
+    return {"accepted": len(payload.heartbeats), "pending": pending}
 
 
 @router.get("/", response_model=list[schema.ReadingHistoryResponse])
-def list_reading_history(db: Session = Depends(get_db)):
-    return db.query(models.reading_history.ReadingHistory).all()
+def list_reading_history(
+    response: Response,
+    params: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    ReadingHistory = models.reading_history.ReadingHistory
+    key = Keyset(ReadingHistory.reading_id, sort=ReadingHistory.last_read_date, descending=True)
+    page = paginate(db, select(ReadingHistory), key, params)
+    return page.apply_headers(response)
 
 
 @router.get("/{reading_id}", response_model=schema.ReadingHistoryResponse)
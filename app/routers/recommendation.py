@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app import models
+from app.core.pagination import Keyset, PageParams, paginate
 from app.schemas import recommendation as schema
+from app.core.deps import get_current_user
+from app.models.recommendation import AlgorithmType
 
 router = APIRouter(prefix="/recommendations", tags=["Recommendations"])
 
@@ -13,7 +17,7 @@ def create_recommendation(payload: schema.RecommendationCreate, db: Session = De
         user_id=payload.user_id,
         recommended_summary_id=payload.recommended_summary_id,
         score=payload.score or 0,
-        algorithm_type=payload.algorithm_type,
+        algorithm_type=payload.algorithm_type.value,
     )
     db.add(item)
     db.commit()
@@ -22,8 +26,33 @@ def create_recommendation(payload: schema.RecommendationCreate, db: Session = De
 
 
 @router.get("/", response_model=list[schema.RecommendationResponse])
-def list_recommendations(db: Session = Depends(get_db)):
-    return db.query(models.recommendation.Recommendation).all()
+def list_recommendations(
+    response: Response,
+    params: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
+    page = paginate(db, select(models.recommendation.Recommendation), Keyset(models.recommendation.Recommendation.recommendation_id), params)
+    return page.apply_headers(response)
+
+
+@router.get("/me", response_model=list[schema.RecommendationResponse])
+def my_recommendations(
+    limit: int = Query(20, ge=1, le=100),
+    current_user = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Precomputed collaborative-filtering recommendations for the current user, best first"""
+    Recommendation = models.recommendation.Recommendation
+    stmt = (
+        select(Recommendation)
+        .where(
+            Recommendation.user_id == current_user.id,
+            Recommendation.algorithm_type == AlgorithmType.ITEM_CF.value,
+        )
+        .order_by(Recommendation.score.desc())
+        .limit(limit)
+    )
+    return db.execute(stmt).scalars().all()
 
 
 @router.get("/{recommendation_id}", response_model=schema.RecommendationResponse)
@@ -39,7 +68,7 @@ def update_recommendation(recommendation_id: int, payload: schema.Recommendation
     item = db.get(models.recommendation.Recommendation, recommendation_id)
     if not item:
         raise HTTPException(status_code=404, detail="Recommendation not found")
-    for field, value in payload.model_dump(exclude_unset=True).items():
+    for field, value in payload.model_dump(exclude_unset=True, mode="json").items():
         setattr(item, field, value)
     db.commit()
     db.refresh(item)
@@ -1,13 +1,80 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from app.database import get_db
+import hashlib
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import and_, or_, select
+from app.database import get_db, get_async_db
 from app import models
 from app.schemas import summary as schema
-from app.core.deps import get_current_user
+from app.schemas import comment as comment_schema
+from app.core.pagination import (
+    NEXT_CURSOR_HEADER,
+    TOTAL_COUNT_HEADER,
+    Keyset,
+    PageParams,
+    decode_cursor,
+    encode_cursor,
+    paginate_async,
+)
+from app.core.conditional import is_not_modified
+from app.core.deps import get_current_user, get_current_user_async, require_writer
+from app.core.read_counter import read_counter
+from app.core.trending import trending
+from app.core.response_cache import SUMMARY_LISTS_TAG, response_cache, summary_tags
+from app.services import comments, reading
+from app.services.search import search_service
+from app.services.similar import similar_index
 
 router = APIRouter(prefix="/summaries", tags=["Summaries"])
 
+Summary = models.summary.Summary
+Book = models.book.Book
+
+# Newest summaries first
+SUMMARY_KEY = Keyset(Summary.id, descending=True)
+
+SUMMARY_ADAPTER = TypeAdapter(schema.SummaryResponse)
+SUMMARY_LIST_ADAPTER = TypeAdapter(list[schema.SummaryResponse])
+
+
+def _cached_list(request: Request, response: Response, items, extra_tags=()) -> Response:
+    # Cache list response cùng với header phân trang của nó
+    tags = [SUMMARY_LISTS_TAG, *extra_tags]
+    for item in items:
+        tags += summary_tags(item)
+    paging = {NEXT_CURSOR_HEADER.lower(), TOTAL_COUNT_HEADER.lower()}
+    headers = {k: v for k, v in response.headers.items() if k.lower() in paging}
+    return response_cache.store(request, SUMMARY_LIST_ADAPTER, items, tags, headers=headers)
+
+
+def _with_relations(stmt):
+    # Eager load book (category, author, publisher) and user for SummaryResponse
+    return stmt.options(
+        selectinload(Summary.book).selectinload(Book.category),
+        selectinload(Summary.book).selectinload(Book.author),
+        selectinload(Summary.book).selectinload(Book.publisher),
+        selectinload(Summary.user)
+    )
+
+
+async def _approved_ranked(db: AsyncSession, hits, response_model, score_field: str, limit: int):
+    # Nạp các summary approved trong một query, giữ nguyên thứ tự xếp hạng
+    if not hits:
+        return []
+    result = await db.execute(
+        _with_relations(select(Summary)).where(
+            Summary.id.in_([hit_id for hit_id, _ in hits]), Summary.status == "approved"
+        )
+    )
+    items = {item.id: item for item in result.scalars()}
+    return [
+        response_model.model_validate(items[hit_id]).model_copy(update={score_field: score})
+        for hit_id, score in hits if hit_id in items
+    ][:limit]
+
 
 @router.post("/", response_model=schema.SummaryResponse)
 def create_summary(
@@ -15,59 +82,165 @@ def create_summary(
     db: Session = Depends(get_db),
     current_user = Depends(get_current_user),
 ):
-    # Only writers can create summaries; writer_id is derived from token
+    """Create a summary (Writers only); content is added as sections"""
+    # Only writers can create summaries; user_id is derived from token
     role = db.get(models.user_role.UserRole, current_user.role_id) if current_user.role_id else None
-    if not role or role.name.lower() != "writer":
+    if not role or role.role_name.lower() != "writer":
         raise HTTPException(status_code=403, detail="User is not a writer")
+    if payload.book_id is not None and db.get(models.book.Book, payload.book_id) is None:
+        raise HTTPException(status_code=404, detail="Book not found")
     item = models.summary.Summary(
         title=payload.title,
-        content=payload.content,
-        category_id=payload.category_id,
-        writer_id=current_user.user_id,
+        book_id=payload.book_id,
+        audio_url=payload.audio_url,
+        user_id=current_user.id,
     )
     db.add(item)
     db.commit()
     db.refresh(item)
+    search_service.refresh_summaries(db, [item.id])
+    similar_index.refresh_summaries(db, [item.id])
+    response_cache.invalidate(SUMMARY_LISTS_TAG, f"writer:{item.user_id}")
     # Load book and user with relations using selectinload
     db.refresh(item)
     # Eager load book and user relationships
-    item = db.query(models.summary.Summary).options(
-        selectinload(Summary.book).selectinload(Book.category),
-        selectinload(Summary.book).selectinload(Book.author),
-        selectinload(Summary.book).selectinload(Book.publisher),
-        selectinload(Summary.user)
-    ).filter(models.summary.Summary.id == item.id).first()
+    item = _with_relations(db.query(models.summary.Summary)).filter(
+        models.summary.Summary.id == item.id
+    ).first()
     return item
 
 
 @router.get("/", response_model=list[schema.SummaryResponse])
-def list_summaries(
-    db: Session = Depends(get_db),
+async def list_summaries(
+    response: Response,
+    params: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db),
     only_writer: bool = Query(True, description="Only summaries created by users with role 'writer'"),
 ):
-    q = db.query(models.summary.Summary)
+    stmt = _with_relations(select(Summary))
     if only_writer:
-        q = (
-            q.join(models.user.User, models.summary.Summary.writer_id == models.user.User.user_id)
-             .join(models.user_role.UserRole, models.user.User.role_id == models.user_role.UserRole.role_id)
-             .filter(models.user_role.UserRole.name.ilike("writer"))
+        stmt = (
+            stmt.join(models.user.User, Summary.user_id == models.user.User.id)
+                .join(models.user_role.UserRole, models.user.User.role_id == models.user_role.UserRole.id)
+                .filter(models.user_role.UserRole.role_name.ilike("writer"))
         )
-    return q.all()
+    page = await paginate_async(db, stmt, SUMMARY_KEY, params)
+    return page.apply_headers(response)
+
+
+@router.get("/trending", response_model=list[schema.TrendingSummaryResponse])
+async def get_trending_summaries(
+    category_id: Optional[int] = Query(None),
+    limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Trending approved summaries by time-decayed activity, overall or in a category (Public access)"""
+    hits = trending.top(limit * 2, category_id)
+    return await _approved_ranked(db, hits, schema.TrendingSummaryResponse, "trending_score", limit)
 
 
 @router.get("/{summary_id}", response_model=schema.SummaryResponse)
-def get_summary(summary_id: int, db: Session = Depends(get_db)):
+async def get_summary(summary_id: int, request: Request, db: AsyncSession = Depends(get_async_db)):
     """Get a specific summary (Public access)"""
-    item = db.query(models.summary.Summary).options(
-        selectinload(Summary.book).selectinload(Book.category),
-        selectinload(Summary.book).selectinload(Book.author),
-        selectinload(Summary.book).selectinload(Book.publisher),
-        selectinload(Summary.user)
-    ).filter(models.summary.Summary.id == summary_id).first()
+    cached = response_cache.get(request)
+    if cached is not None:
+        read_counter.increment(summary_id)
+        trending.record(summary_id, "read")
+        return cached.to_response(request)
+    result = await db.execute(
+        _with_relations(select(Summary)).filter(Summary.id == summary_id)
+    )
+    item = result.scalars().first()
     
     if not item:
         raise HTTPException(status_code=404, detail="Summary not found")
-    return item
+    read_counter.increment(summary_id)
+    trending.record(summary_id, "read")
+    return response_cache.store(request, SUMMARY_ADAPTER, item, summary_tags(item))
+
+
+@router.get("/{summary_id}/similar", response_model=list[schema.SimilarSummaryResponse])
+async def get_similar_summaries(
+    summary_id: int,
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Approved summaries with the most similar content (Public access)"""
+    if not similar_index.load():
+        raise HTTPException(status_code=503, detail="Similar-summaries index is not built")
+    # Lấy dư vì summary chưa approved bị lọc ở bước sau
+    hits = similar_index.similar(summary_id, limit * 2)
+    if hits is None:
+        if await db.get(Summary, summary_id) is None:
+            raise HTTPException(status_code=404, detail="Summary not found")
+        return []
+    return await _approved_ranked(db, hits, schema.SimilarSummaryResponse, "similarity", limit)
+
+
+@router.get("/{summary_id}/bundle", response_model=schema.ReadingBundleResponse)
+async def get_reading_bundle(
+    summary_id: int,
+    request: Request,
+    include_user: bool = Query(True, description="Include the caller's reading position and notes"),
+    current_user = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Summary, all ordered sections, reading position and notes in one response (Authenticated users only)"""
+    # Phần chung (summary + sections) được cache theo validator của sections
+    state = await reading.section_state(db, summary_id)
+    key = reading.bundle_key(state)
+    shared = response_cache.lookup(key)
+    if shared is None:
+        result = await db.execute(_with_relations(select(Summary)).filter(Summary.id == summary_id))
+        summary = result.scalars().first()
+        if not summary:
+            raise HTTPException(status_code=404, detail="Summary not found")
+        sections = await reading.load_sections(db, summary_id)
+        shared = response_cache.put(key, reading.shared_prefix(summary, sections), summary_tags(summary))
+    read_counter.increment(summary_id)
+    trending.record(summary_id, "read")
+
+    if include_user:
+        history, notes = await reading.load_user_state(db, current_user.id, summary_id)
+        body = reading.bundle_body(shared.body, history, notes)
+    else:
+        body = reading.bundle_body(shared.body)
+    gzipped = "gzip" in request.headers.get("accept-encoding", "")
+    # ETag strong phải khác nhau theo representation: bản gzip có hậu tố riêng
+    etag = '"' + hashlib.sha1(body).hexdigest() + ("-gzip" if gzipped else "") + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization, Accept-Encoding"}
+    if is_not_modified(request, etag, None):
+        return Response(status_code=304, headers=headers)
+
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+        if include_user:
+            body = reading.compress(body)
+        else:
+            # Không có phần riêng của user: dùng bản nén sẵn trong cache
+            gz_key = f"{key}:gz:{shared.etag}"
+            compressed = response_cache.lookup(gz_key)
+            if compressed is None:
+                compressed = response_cache.put(gz_key, reading.compress(body), [f"summary:{summary_id}"])
+            body = compressed.body
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/{summary_id}/comments/tree", response_model=list[comment_schema.CommentTreeNode])
+async def get_comment_tree(
+    summary_id: int,
+    response: Response,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    limit: int = Query(20, ge=1, le=100, description="Root comments per page"),
+    depth: int = Query(5, ge=0, le=50, description="Reply levels to load below each root"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Threaded public comments of a summary, newest threads first, in one query (Public access)"""
+    result = await db.execute(comments.thread_statement(summary_id, cursor, limit, depth))
+    roots, next_root = comments.assemble(result.all(), limit, depth)
+    if next_root is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(next_root, next_root)
+    return roots
 
 
 @router.put("/{summary_id}", response_model=schema.SummaryResponse)
@@ -83,23 +256,26 @@ def update_summary(
         raise HTTPException(status_code=404, detail="Summary not found")
     
     # Check if user owns the summary or is admin
-    if item.user_id != current_user.id and current_user.role.role_name != "admin":
+    if item.user_id != current_user.id and current_user.role_name != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update this summary"
         )
     
+    previous_user_id = item.user_id
     for field, value in payload.model_dump(exclude_unset=True).items():
         setattr(item, field, value)
     db.commit()
     db.refresh(item)
+    search_service.refresh_summaries(db, [item.id])
+    similar_index.refresh_summaries(db, [item.id])
+    response_cache.invalidate(
+        SUMMARY_LISTS_TAG, f"summary:{item.id}", f"writer:{previous_user_id}", f"writer:{item.user_id}"
+    )
     # Reload with book and user relationships
-    item = db.query(models.summary.Summary).options(
-        selectinload(Summary.book).selectinload(Book.category),
-        selectinload(Summary.book).selectinload(Book.author),
-        selectinload(Summary.book).selectinload(Book.publisher),
-        selectinload(Summary.user)
-    ).filter(models.summary.Summary.id == item.id).first()
+    item = _with_relations(db.query(models.summary.Summary)).filter(
+        models.summary.Summary.id == item.id
+    ).first()
     return item
 
 
@@ -115,7 +291,7 @@ def delete_summary(
         raise HTTPException(status_code=404, detail="Summary not found")
     
     # Check if user owns the summary or is admin
-    if item.user_id != current_user.id and current_user.role.role_name != "admin":
+    if item.user_id != current_user.id and current_user.role_name != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to delete this summary"
@@ -123,90 +299,124 @@ def delete_summary(
     
     db.delete(item)
     db.commit()
+    search_service.refresh_summaries(db, [summary_id])
+    similar_index.refresh_summaries(db, [summary_id])
+    response_cache.invalidate(SUMMARY_LISTS_TAG, f"summary:{summary_id}", f"writer:{item.user_id}")
     return {"deleted": True}
 
 
 @router.get("/search/approved", response_model=list[schema.SummaryResponse])
-def search_approved_summaries(
+async def search_approved_summaries(
+    request: Request,
+    response: Response,
     q: Optional[str] = Query(None, description="Search query for title or book title/author"),
     category_id: Optional[int] = Query(None, description="Filter by category ID"),
     limit: int = Query(20, ge=1, le=100, description="Limit number of results"),
-    offset: int = Query(0, ge=0, description="Offset for pagination"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Search approved summaries (Public access)"""
-    query = db.query(models.summary.Summary).options(
-        selectinload(Summary.book).selectinload(Book.category),
-        selectinload(Summary.book).selectinload(Book.author),
-        selectinload(Summary.book).selectinload(Book.publisher),
-        selectinload(Summary.user)
-    ).filter(
-        models.summary.Summary.status == "approved"
+    """Search approved summaries, relevance-ranked (Public access)"""
+    cached = response_cache.get(request)
+    if cached is not None:
+        return cached.to_response(request)
+    stmt = _with_relations(select(Summary)).filter(
+        Summary.status == "approved"
     )
     
-    # Search by title or book title/author if query provided
-    if q:
-        search_term = f"%{q}%"
-        query = query.outerjoin(Book).outerjoin(models.author.Author).filter(
-            or_(
-                models.summary.Summary.title.ilike(search_term),
-                Book.title.ilike(search_term),
-                models.author.Author.name.ilike(search_term)
-            )
-        )
+    # MySQL: FULLTEXT MATCH ... AGAINST over summary title, book title and author name
+    if q and search_service.uses_fulltext(db.bind.dialect.name):
+        score = search_service.fulltext_score(q)
+        stmt = stmt.add_columns(score.label("score"))
+        stmt = stmt.outerjoin(Book).outerjoin(models.author.Author).filter(score > 0)
+        if category_id:
+            stmt = stmt.filter(Book.category_id == category_id)
+        if cursor:
+            last_score, last_id = decode_cursor(cursor)
+            stmt = stmt.filter(or_(score < last_score, and_(score == last_score, Summary.id < last_id)))
+        result = await db.execute(stmt.order_by(score.desc(), Summary.id.desc()).limit(limit + 1))
+        rows = result.all()
+        if len(rows) > limit:
+            item, last_score = rows[limit - 1]
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last_score, item.id)
+        return _cached_list(request, response, [item for item, _score in rows[:limit]])
     
     # Filter by category if provided (through book)
     if category_id:
-        query = query.join(Book).filter(
-            Book.category_id == category_id
-        )
+        stmt = stmt.join(Book).filter(Book.category_id == category_id)
     
-    # Apply pagination
-    query = query.offset(offset).limit(limit)
+    if not q:
+        page = await paginate_async(db, stmt, SUMMARY_KEY, PageParams(cursor=cursor, limit=limit, include_total=False))
+        return _cached_list(request, response, page.apply_headers(response))
     
-    return query.all()
+    # Other databases: in-process inverted index gives ranked (id, score) pairs
+    await search_service.ensure_built(db)
+    ranked = search_service.index.search(q)
+    if ranked and category_id:
+        result = await db.execute(
+            select(Summary.id).join(Book).filter(
+                Summary.id.in_([summary_id for summary_id, _ in ranked]),
+                Book.category_id == category_id,
+            )
+        )
+        allowed = set(result.scalars())
+        ranked = [pair for pair in ranked if pair[0] in allowed]
+    if cursor:
+        last_score, last_id = decode_cursor(cursor)
+        ranked = [
+            (summary_id, score) for summary_id, score in ranked
+            if score < last_score or (score == last_score and summary_id < last_id)
+        ]
+    page = ranked[:limit]
+    if len(ranked) > limit:
+        last_id, last_score = page[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last_score, last_id)
+    items = []
+    if page:
+        result = await db.execute(_with_relations(select(Summary)).filter(Summary.id.in_([i for i, _ in page])))
+        by_id = {item.id: item for item in result.scalars()}
+        items = [by_id[summary_id] for summary_id, _ in page if summary_id in by_id]
+    return _cached_list(request, response, items)
 
 
 @router.get("/writer/me", response_model=list[schema.SummaryResponse])
-def get_my_summaries(
+async def get_my_summaries(
+    response: Response,
+    params: PageParams = Depends(),
     status_filter: Optional[str] = Query(None, description="Filter by status: editing, waiting_for_approval, approved, rejected"),
-    current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get summaries written by current user (Authenticated users only)"""
-    query = db.query(models.summary.Summary).options(
-        selectinload(Summary.book).selectinload(Book.category),
-        selectinload(Summary.book).selectinload(Book.author),
-        selectinload(Summary.book).selectinload(Book.publisher),
-        selectinload(Summary.user)
-    ).filter(
-        models.summary.Summary.user_id == current_user.id
+    stmt = _with_relations(select(Summary)).filter(
+        Summary.user_id == current_user.id
     )
     
     if status_filter:
-        query = query.filter(models.summary.Summary.status == status_filter)
+        stmt = stmt.filter(Summary.status == status_filter)
     
-    return query.all()
+    page = await paginate_async(db, stmt, SUMMARY_KEY, params)
+    return page.apply_headers(response)
 
 
 @router.get("/writer/{user_id}", response_model=list[schema.SummaryResponse])
-def get_writer_summaries(
+async def get_writer_summaries(
     user_id: int,
+    request: Request,
+    response: Response,
+    params: PageParams = Depends(),
     status_filter: Optional[str] = Query(None, description="Filter by status: editing, waiting_for_approval, approved, rejected"),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get summaries written by a specific writer (Public access)"""
-    query = db.query(models.summary.Summary).options(
-        selectinload(Summary.book).selectinload(Book.category),
-        selectinload(Summary.book).selectinload(Book.author),
-        selectinload(Summary.book).selectinload(Book.publisher),
-        selectinload(Summary.user)
-    ).filter(
-        models.summary.Summary.user_id == user_id
+    cached = response_cache.get(request)
+    if cached is not None:
+        return cached.to_response(request)
+    stmt = _with_relations(select(Summary)).filter(
+        Summary.user_id == user_id
     )
     
     if status_filter:
-        query = query.filter(models.summary.Summary.status == status_filter)
+        stmt = stmt.filter(Summary.status == status_filter)
     
-    return query.all()
-
+    page = await paginate_async(db, stmt, SUMMARY_KEY, params)
+    return _cached_list(request, response, page.apply_headers(response), extra_tags=[f"writer:{user_id}"])
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app import models
+from app.core.pagination import Keyset, PageParams, paginate
 from app.schemas import user as schema
 from app.database import get_db
-from app.core.security import get_password_hash
-from app.core.deps import require_admin
+from app.core.password_pool import password_pool
+from app.core.deps import require_admin, bump_token_versions, forget_principals
+from app.core.response_cache import SUMMARY_LISTS_TAG, response_cache
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -22,7 +25,7 @@ def create_user(
     db_user = models.user.User(
         username=payload.username,
         email=payload.email,
-        password_hash=get_password_hash(payload.password),
+        password_hash=password_pool.hash_blocking(payload.password),
     )
     db.add(db_user)
     db.commit()
@@ -31,9 +34,14 @@ def create_user(
 
 
 @router.get("/", response_model=list[schema.UserResponse])
-def list_users(db: Session = Depends(get_db)):
+def list_users(
+    response: Response,
+    params: PageParams = Depends(),
+    db: Session = Depends(get_db),
+):
     """Get all users (Public access)"""
-    return db.query(models.user.User).all()
+    page = paginate(db, select(models.user.User), Keyset(models.user.User.id), params)
+    return page.apply_headers(response)
 
 
 @router.get("/{user_id}", response_model=schema.UserResponse)
@@ -58,8 +66,11 @@ def update_user(
         raise HTTPException(status_code=404, detail="User not found")
     for field, value in payload.model_dump(exclude_unset=True).items():
         setattr(user, field, value)
+    bump_token_versions(db, [user_id])
     db.commit()
     db.refresh(user)
+    forget_principals([user_id])
+    response_cache.invalidate(SUMMARY_LISTS_TAG, f"user:{user_id}")
     return user
 
 
@@ -75,4 +86,6 @@ def delete_user(
         raise HTTPException(status_code=404, detail="User not found")
     db.delete(user)
     db.commit()
+    forget_principals([user_id])
+    response_cache.invalidate(SUMMARY_LISTS_TAG, f"user:{user_id}")
     return {"deleted": True}
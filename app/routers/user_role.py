@@ -3,11 +3,17 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app import models
 from app.schemas import user_role as schema
-from app.core.deps import require_admin
+from app.core.deps import require_admin, bump_token_versions, forget_principals
 
 router = APIRouter(prefix="/roles", tags=["UserRoles"])
 
 
+def _role_user_ids(db: Session, role_id: int) -> list[int]:
+    return [
+        user_id for (user_id,) in db.query(models.user.User.id).filter(models.user.User.role_id == role_id)
+    ]
+
+
 @router.post("/", response_model=schema.UserRoleResponse)
 def create_role(
     payload: schema.UserRoleCreate,
@@ -53,8 +59,11 @@ def update_role(
         raise HTTPException(status_code=404, detail="Role not found")
     for field, value in payload.model_dump(exclude_unset=True).items():
         setattr(item, field, value)
+    user_ids = _role_user_ids(db, role_id)
+    bump_token_versions(db, user_ids)
     db.commit()
     db.refresh(item)
+    forget_principals(user_ids)
     return item
 
 
@@ -68,8 +77,11 @@ def delete_role(
     item = db.get(models.user_role.UserRole, role_id)
     if not item:
         raise HTTPException(status_code=404, detail="Role not found")
+    user_ids = _role_user_ids(db, role_id)
+    bump_token_versions(db, user_ids)
     db.delete(item)
     db.commit()
+    forget_principals(user_ids)
     return {"deleted": True}
 
 
@@ -1,15 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app import models
+from app.core.deps import get_current_user
+from app.core.pagination import Keyset, PageParams, paginate
 from app.schemas import vocabulary as schema
+from app.services import spaced_repetition
 
 router = APIRouter(prefix="/flashcards", tags=["Vocabulary"])
 
+Flashcard = models.vocabulary.VocabularyFlashcard
+
+
+def _get_own_flashcard(db: Session, flashcard_id: int, user_id: int):
+    # Thẻ của user khác trả 404 như /flashcards/reviews, không lộ là thẻ tồn tại
+    item = db.get(Flashcard, flashcard_id)
+    if not item or item.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Flashcard not found")
+    return item
+
 
 @router.post("/", response_model=schema.FlashcardResponse)
 def create_flashcard(payload: schema.FlashcardCreate, db: Session = Depends(get_db)):
-    item = models.vocabulary.VocabularyFlashcard(
+    item = Flashcard(
         user_id=payload.user_id,
         word=payload.word,
         meaning=payload.meaning,
@@ -21,23 +35,58 @@ def create_flashcard(payload: schema.FlashcardCreate, db: Session = Depends(get_
 
 
 @router.get("/", response_model=list[schema.FlashcardResponse])
-def list_flashcards(db: Session = Depends(get_db)):
-    return db.query(models.vocabulary.VocabularyFlashcard).all()
+def list_flashcards(
+    response: Response,
+    params: PageParams = Depends(),
+    current_user = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """The current user's flashcards (Authenticated users only)"""
+    # Lọc theo user_id dùng index (user_id, due_at)
+    stmt = select(Flashcard).where(Flashcard.user_id == current_user.id)
+    page = paginate(db, stmt, Keyset(Flashcard.flashcard_id), params)
+    return page.apply_headers(response)
+
+
+@router.get("/due", response_model=list[schema.FlashcardResponse])
+def get_due_flashcards(
+    limit: int = Query(20, ge=1, le=100),
+    current_user = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Next flashcards due for review, oldest due first (Authenticated users only)"""
+    return spaced_repetition.due_cards(db, current_user.id, limit)
+
+
+@router.post("/reviews", response_model=list[schema.FlashcardResponse])
+def submit_flashcard_reviews(
+    payload: schema.FlashcardReviewBatch,
+    current_user = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Grade many flashcards in one transaction and reschedule them with SM-2 (Authenticated users only)"""
+    return spaced_repetition.submit_reviews(db, current_user.id, payload.reviews)
 
 
 @router.get("/{flashcard_id}", response_model=schema.FlashcardResponse)
-def get_flashcard(flashcard_id: int, db: Session = Depends(get_db)):
-    item = db.get(models.vocabulary.VocabularyFlashcard, flashcard_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Flashcard not found")
-    return item
+def get_flashcard(
+    flashcard_id: int,
+    current_user = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Get one of the current user's flashcards (Authenticated users only)"""
+    return _get_own_flashcard(db, flashcard_id, current_user.id)
 
 
 @router.put("/{flashcard_id}", response_model=schema.FlashcardResponse)
-def update_flashcard(flashcard_id: int, payload: schema.FlashcardUpdate, db: Session = Depends(get_db)):
-    item = db.get(models.vocabulary.VocabularyFlashcard, flashcard_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Flashcard not found")
+def update_flashcard(
+    flashcard_id: int,
+    payload: schema.FlashcardUpdate,
+    current_user = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Update one of the current user's flashcards (Only owner can update)"""
+    item = _get_own_flashcard(db, flashcard_id, current_user.id)
     for field, value in payload.model_dump(exclude_unset=True).items():
         setattr(item, field, value)
     db.commit()
@@ -46,10 +95,13 @@ def update_flashcard(flashcard_id: int, payload: schema.FlashcardUpdate, db: Ses
 
 
 @router.delete("/{flashcard_id}")
-def delete_flashcard(flashcard_id: int, db: Session = Depends(get_db)):
-    item = db.get(models.vocabulary.VocabularyFlashcard, flashcard_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Flashcard not found")
+def delete_flashcard(
+    flashcard_id: int,
+    current_user = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """Delete one of the current user's flashcards (Only owner can delete)"""
+    item = _get_own_flashcard(db, flashcard_id, current_user.id)
     db.delete(item)
     db.commit()
     return {"deleted": True}
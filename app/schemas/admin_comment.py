@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 from datetime import datetime
 
 
@@ -13,7 +13,7 @@ class AdminCommentUpdate(BaseModel):
 
 
 class AdminCommentResponse(BaseModel):
-    id: int
+    id: int = Field(validation_alias=AliasChoices("id", "comment_id"))
     summary_id: int
     text_content: str
     parent_comment_id: int | None
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from decimal import Decimal
+from typing import Literal
 
 
 class CartItemCreate(BaseModel):
@@ -22,3 +23,14 @@ class CartItemResponse(BaseModel):
 
     model_config = ConfigDict(from_attributes=True)
 
+
+
+class CartOperation(BaseModel):
+    """add: increase quantity, set: replace it (0 removes), remove: drop the line"""
+    op: Literal["add", "set", "remove"]
+    book_id: int
+    quantity: int = Field(1, ge=0)
+
+
+class CartBulkRequest(BaseModel):
+    operations: list[CartOperation] = Field(..., min_length=1, max_length=200)
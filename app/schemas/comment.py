@@ -27,3 +27,7 @@ class CommentResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class CommentTreeNode(CommentResponse):
+    depth: int
+    has_more_replies: bool = False
+    replies: list["CommentTreeNode"] = []
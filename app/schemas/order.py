@@ -2,6 +2,7 @@ from pydantic import BaseModel, ConfigDict
 from datetime import datetime
 from decimal import Decimal
 from app.models.order import PaymentStatus, ShipmentStatus
+from app.schemas.order_detail import OrderDetailResponse
 
 
 class OrderCreate(BaseModel):
@@ -45,6 +46,19 @@ class OrderResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class CheckoutRequest(BaseModel):
+    """Shipping info only: items and prices come from the cart and the books"""
+    payment_method: str | None = None
+    recipient_name: str | None = None
+    address: str | None = None
+    phone: str | None = None
+    shipping_method: str | None = None
+
+
+class CheckoutResponse(OrderResponse):
+    order_details: list[OrderDetailResponse] = []
+
+
 class PaymentStatusUpdate(BaseModel):
     payment_status: PaymentStatus
 
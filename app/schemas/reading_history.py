@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 
 
@@ -31,3 +31,18 @@ class ReadingHistoryResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ProgressHeartbeat(BaseModel):
+    summary_id: int
+    last_section_id: int | None = None
+    progress_percent: float = Field(0, ge=0, le=100)
+    time_spent: int = Field(0, ge=0, description="Seconds read since the previous heartbeat")
+    device_type: str | None = None
+
+
+class ProgressBatch(BaseModel):
+    heartbeats: list[ProgressHeartbeat] = Field(..., min_length=1, max_length=500)
+
+
+class ProgressAccepted(BaseModel):
+    accepted: int
+    pending: int
@@ -1,17 +1,18 @@
 from pydantic import BaseModel, ConfigDict
 from datetime import datetime
+from app.models.recommendation import AlgorithmType
 
 
 class RecommendationCreate(BaseModel):
     user_id: int
     recommended_summary_id: int
     score: float | None = None
-    algorithm_type: str | None = None
+    algorithm_type: AlgorithmType = AlgorithmType.MANUAL
 
 
 class RecommendationUpdate(BaseModel):
     score: float | None = None
-    algorithm_type: str | None = None
+    algorithm_type: AlgorithmType | None = None
 
 
 class RecommendationResponse(BaseModel):
@@ -6,12 +6,15 @@ from app.schemas.category import CategoryResponse
 from app.schemas.author import AuthorResponse
 from app.schemas.publisher import PublisherResponse
 from app.schemas.user import UserResponse
+from app.schemas.content_section import SectionResponse
+from app.schemas.reading_history import ReadingHistoryResponse
+from app.schemas.note import NoteResponse
 
 
 class SummaryCreate(BaseModel):
     title: str
-    content: str
-    category_id: int
+    book_id: int | None = None
+    audio_url: str | None = None
 
 
 class SummaryUpdate(BaseModel):
@@ -54,3 +57,16 @@ class SummaryResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class SimilarSummaryResponse(SummaryResponse):
+    similarity: float = 0
+
+
+class TrendingSummaryResponse(SummaryResponse):
+    trending_score: float = 0
+
+
+class ReadingBundleResponse(BaseModel):
+    summary: SummaryResponse
+    sections: list[SectionResponse]
+    reading_history: ReadingHistoryResponse | None = None
+    notes: list[NoteResponse] = []
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 
 
@@ -23,7 +23,19 @@ class FlashcardResponse(BaseModel):
     created_at: datetime
     last_reviewed: datetime | None
     review_count: int
+    ease: float
+    interval_days: int
+    repetitions: int
+    due_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class FlashcardReview(BaseModel):
+    """SM-2 grade: 5 perfect, 3 correct with effort, 0-2 forgotten"""
+    flashcard_id: int
+    grade: int = Field(..., ge=0, le=5)
+
+
+class FlashcardReviewBatch(BaseModel):
+    reviews: list[FlashcardReview] = Field(..., min_length=1, max_length=500)
@@ -0,0 +1,81 @@
+"""Bulk cart mutations.
+
+A list of add/set/remove operations is folded in memory into one final
+quantity per book, then applied with a fixed number of statements no matter
+how many items are sent: one IN query to validate books, one to read the
+current lines, one batched upsert on (cart_id, book_id) and one DELETE.
+Line prices are taken from the books, not from the client.
+"""
+from fastapi import HTTPException
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.upsert import upsert
+
+Book = models.book.Book
+Cart = models.cart.Cart
+CartItem = models.cart_item.CartItem
+
+
+def fold_operations(operations, current: dict[int, int]) -> dict[int, int]:
+    """Final quantity per touched book after applying operations in order (0 = remove)"""
+    result: dict[int, int] = {}
+    for op in operations:
+        quantity = result.get(op.book_id, current.get(op.book_id, 0))
+        if op.op == "add":
+            quantity += op.quantity
+        elif op.op == "set":
+            quantity = op.quantity
+        else:
+            quantity = 0
+        result[op.book_id] = quantity
+    return result
+
+
+def _overwrite_line(existing, new) -> dict:
+    return {"quantity": new.quantity, "price": new.price}
+
+
+def _locked_cart(db: Session, user_id: int) -> Cart:
+    cart = db.execute(select(Cart).where(Cart.user_id == user_id).with_for_update()).scalar_one_or_none()
+    if cart is None:
+        cart = Cart(user_id=user_id)
+        db.add(cart)
+        db.flush()
+    return cart
+
+
+def apply_operations(db: Session, user_id: int, operations) -> list[CartItem]:
+    """Apply add/set/remove operations to the user's cart in one transaction and commit"""
+    book_ids = sorted({op.book_id for op in operations})
+    prices = dict(db.execute(select(Book.id, Book.price).where(Book.id.in_(book_ids))).all())
+    missing = [book_id for book_id in book_ids if book_id not in prices]
+    if missing:
+        raise HTTPException(status_code=404, detail={"message": "Book not found", "book_ids": missing})
+
+    cart = _locked_cart(db, user_id)
+    current = dict(db.execute(
+        select(CartItem.book_id, CartItem.quantity)
+        .where(CartItem.cart_id == cart.id, CartItem.book_id.in_(book_ids))
+        .with_for_update()
+    ).all())
+    final = fold_operations(operations, current)
+
+    rows = [
+        {"cart_id": cart.id, "book_id": book_id, "quantity": quantity, "price": prices[book_id]}
+        for book_id, quantity in final.items()
+        if quantity > 0
+    ]
+    removed = [book_id for book_id, quantity in final.items() if quantity <= 0 and book_id in current]
+    upsert(db, CartItem.__table__, rows, ["cart_id", "book_id"], _overwrite_line)
+    if removed:
+        db.execute(
+            delete(CartItem)
+            .where(CartItem.cart_id == cart.id, CartItem.book_id.in_(removed))
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+    return db.execute(
+        select(CartItem).where(CartItem.cart_id == cart.id).order_by(CartItem.id)
+    ).scalars().all()
@@ -0,0 +1,119 @@
+"""Server-side checkout: turn the current user's cart into an order.
+
+Everything happens in one transaction: the cart row and the affected books
+are locked (books in id order so two checkouts sharing titles always lock
+in the same sequence and cannot deadlock), totals are computed from current
+book prices, order details are bulk-inserted, stock is decremented and the
+cart is emptied. A guarded UPDATE (`stock_quantity >= quantity`) backs the
+row locks so stock can never go negative even where FOR UPDATE is a no-op.
+After the commit, cached responses embedding the purchased books (and so
+their stock_quantity) are invalidated.
+"""
+from decimal import Decimal
+
+from fastapi import HTTPException, status
+from sqlalchemy import case, delete, func, insert, select, text, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.response_cache import SUMMARY_LISTS_TAG, response_cache
+from app.models.interaction_event import InteractionSource
+from app.services import interaction_log
+
+Book = models.book.Book
+Cart = models.cart.Cart
+CartItem = models.cart_item.CartItem
+Order = models.order.Order
+OrderDetail = models.order_detail.OrderDetail
+
+
+def _begin_write(db: Session) -> None:
+    # SQLite bỏ qua FOR UPDATE: lấy write lock của database ngay từ đầu transaction
+    # để các checkout song song xếp hàng thay vì cùng đọc stock cũ
+    if db.get_bind().dialect.name == "sqlite":
+        db.execute(text("BEGIN IMMEDIATE"))
+
+
+def _locked_cart(db: Session, user_id: int) -> tuple[Cart, list[CartItem]]:
+    cart = db.execute(
+        select(Cart).where(Cart.user_id == user_id).with_for_update()
+    ).scalar_one_or_none()
+    items = []
+    if cart is not None:
+        items = db.execute(
+            select(CartItem).where(CartItem.cart_id == cart.id).order_by(CartItem.book_id)
+        ).scalars().all()
+    if not items:
+        raise HTTPException(status_code=400, detail="Cart is empty")
+    return cart, items
+
+
+def _locked_books(db: Session, book_ids: list[int]) -> dict[int, Book]:
+    rows = db.execute(
+        select(Book).where(Book.id.in_(book_ids)).order_by(Book.id).with_for_update()
+    ).scalars().all()
+    return {book.id: book for book in rows}
+
+
+def _shortages(items: list[CartItem], books: dict[int, Book]) -> list[dict]:
+    shortages = []
+    for item in items:
+        book = books.get(item.book_id)
+        available = (book.stock_quantity or 0) if book else 0
+        if item.quantity > available:
+            shortages.append({"book_id": item.book_id, "requested": item.quantity, "available": available})
+    return shortages
+
+
+def _decrement_stock(db: Session, quantities: dict[int, int]) -> bool:
+    """One UPDATE for all lines; False if any book lacks stock"""
+    wanted = case(quantities, value=Book.id)
+    stmt = (
+        update(Book)
+        .where(Book.id.in_(list(quantities)), func.coalesce(Book.stock_quantity, 0) >= wanted)
+        .values(stock_quantity=func.coalesce(Book.stock_quantity, 0) - wanted)
+        .execution_options(synchronize_session=False)
+    )
+    return db.execute(stmt).rowcount == len(quantities)
+
+
+def checkout(db: Session, user_id: int, shipping: dict) -> Order:
+    """Place an order from the user's cart and commit; 400 on an empty cart, 409 on missing stock"""
+    _begin_write(db)
+    try:
+        cart, items = _locked_cart(db, user_id)
+        if any(item.quantity <= 0 for item in items):
+            raise HTTPException(status_code=400, detail="Cart contains a non-positive quantity")
+        books = _locked_books(db, [item.book_id for item in items])
+        shortages = _shortages(items, books)
+        if shortages:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail={"message": "Insufficient stock", "items": shortages},
+            )
+
+        lines = [
+            {"book_id": item.book_id, "quantity": item.quantity, "price": books[item.book_id].price}
+            for item in items
+        ]
+        total = sum((Decimal(line["price"]) * line["quantity"] for line in lines), Decimal("0"))
+
+        if not _decrement_stock(db, {line["book_id"]: line["quantity"] for line in lines}):
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Insufficient stock")
+
+        order = Order(user_id=user_id, total_amount=total, **shipping)
+        db.add(order)
+        db.flush()
+        db.execute(insert(OrderDetail), [{"order_id": order.id, **line} for line in lines])
+        interaction_log.record_many(db, [
+            interaction_log.event_row(user_id, InteractionSource.PURCHASE, book_id=line["book_id"]) for line in lines
+        ])
+        db.execute(delete(CartItem).where(CartItem.cart_id == cart.id).execution_options(synchronize_session=False))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    # Summary (đơn lẻ và list) nhúng book nên cũng mang tag book:{id}
+    response_cache.invalidate(SUMMARY_LISTS_TAG, *(f"book:{line['book_id']}" for line in lines))
+    db.refresh(order)
+    return order
@@ -0,0 +1,223 @@
+"""Threaded comment loading.
+
+Materialized paths: comments and admin_comments carry
+path = "<root id>/<child id>/.../<own id>/", each id zero-padded to
+PATH_WIDTH digits, so a subtree is one indexed range scan over
+[path, path with its trailing "/" bumped to "0") (depth-first when ordered
+by path), and the ancestry chain is an IN over the ids already spelled out
+in the node's own path. Rows without a path (missed by the backfill) fall
+back to a recursive CTE / parent walk; public endpoints hide private
+comments and their subtrees in both cases. Replying to such a row first
+stores its path from the parent_comment_id chain. A path holds at most
+MAX_DEPTH levels; deeper replies are rejected with a 400.
+
+A summary's thread is read with one recursive CTE: the anchor is a keyset
+page of root comments, the recursive member walks parent_comment_id down
+to the depth limit (plus one probe level, used only to flag nodes whose
+replies were cut off). Rows come back ordered by (depth, id) and are
+linked into a tree in a single O(n) pass. Private comments and their
+subtrees are not part of public threads.
+"""
+from fastapi import HTTPException
+from sqlalchemy import and_, inspect, literal_column, select
+from sqlalchemy.orm import Session, aliased
+
+from app.core.pagination import Keyset, decode_cursor
+from app.models.comment import Comment, CommentAccess
+
+ROOT_KEY = Keyset(Comment.id, descending=True)
+
+
+def thread_statement(summary_id: int, cursor: str | None, limit: int, max_depth: int):
+    """Newest-first page of root comments with their replies down to max_depth (+1 probe level)"""
+    roots = select(Comment.id).where(
+        Comment.summary_id == summary_id,
+        Comment.parent_comment_id.is_(None),
+        Comment.access == CommentAccess.PUBLIC,
+    )
+    if cursor:
+        roots = roots.where(ROOT_KEY.after(*decode_cursor(cursor)))
+    # LIMIT nằm trong derived table: MySQL không cho LIMIT trong IN (subquery)
+    roots = roots.order_by(*ROOT_KEY.order_by()).limit(limit + 1).subquery("roots")
+
+    thread = (
+        select(Comment.id, literal_column("0").label("depth"))
+        .join(roots, roots.c.id == Comment.id)
+        .cte("thread", recursive=True)
+    )
+    reply = aliased(Comment)
+    thread = thread.union_all(
+        select(reply.id, thread.c.depth + 1)
+        .join(thread, reply.parent_comment_id == thread.c.id)
+        .where(thread.c.depth <= max_depth, reply.access == CommentAccess.PUBLIC)
+    )
+    return (
+        select(*Comment.__table__.c, thread.c.depth)
+        .join(thread, thread.c.id == Comment.id)
+        .order_by(thread.c.depth, Comment.id)
+    )
+
+
+def assemble(rows, limit: int, max_depth: int) -> tuple[list[dict], int | None]:
+    """Link (depth, id)-ordered rows into trees; returns (roots, last root id if there is a next page)"""
+    nodes: dict[int, dict] = {}
+    roots: list[dict] = []
+    for row in rows:
+        data = dict(row._mapping)
+        depth = data["depth"]
+        if depth > max_depth:
+            # Probe level: chỉ để biết node cha còn reply chưa tải
+            nodes[data["parent_comment_id"]]["has_more_replies"] = True
+            continue
+        data["replies"] = []
+        data["has_more_replies"] = False
+        nodes[data["id"]] = data
+        if depth == 0:
+            roots.append(data)
+        else:
+            nodes[data["parent_comment_id"]]["replies"].append(data)
+    roots.sort(key=lambda node: node["id"], reverse=True)
+    next_root = roots[limit - 1]["id"] if len(roots) > limit else None
+    return roots[:limit], next_root
+
+
+PATH_WIDTH = 10  # đủ cho INT 32-bit
+# path String(512): mỗi cấp PATH_WIDTH + 1 ký tự nên tối đa 46 cấp
+MAX_DEPTH = Comment.path.type.length // (PATH_WIDTH + 1)
+
+
+def path_segment(pk: int) -> str:
+    return f"{pk:0{PATH_WIDTH}d}/"
+
+
+def path_ids(path: str) -> list[int]:
+    return [int(part) for part in path.split("/") if part]
+
+
+def _under(column, path: str):
+    # Tương đương LIKE 'path%' nhưng dùng được index trên mọi dialect ('/' + 1 == '0')
+    return and_(column >= path, column < path[:-1] + "0")
+
+
+def _pk(model):
+    return inspect(model).primary_key[0]
+
+
+def _parent_path(db: Session, model, parent) -> str:
+    """The parent's path; rows without one (and their unpathed ancestors) get it from the parent_comment_id chain"""
+    chain = []
+    node = parent
+    while node is not None and node.path is None:
+        chain.append(node)
+        node = db.get(model, node.parent_comment_id) if node.parent_comment_id is not None else None
+    prefix = node.path if node is not None else ""
+    paths = []
+    for item in reversed(chain):
+        prefix += path_segment(getattr(item, _pk(model).key))
+        paths.append((item, prefix))
+    if len(prefix) // (PATH_WIDTH + 1) >= MAX_DEPTH:
+        raise HTTPException(status_code=400, detail=f"Replies cannot be nested deeper than {MAX_DEPTH} levels")
+    # Lưu luôn path vừa tính (commit cùng comment mới)
+    for item, path in paths:
+        item.path = path
+    return prefix
+
+
+def load_parent(db: Session, model, parent_id: int | None, summary_id: int):
+    """Parent comment for a new reply; it must exist, belong to the same summary and leave room for one more level"""
+    if parent_id is None:
+        return None
+    parent = db.get(model, parent_id)
+    if parent is None:
+        raise HTTPException(status_code=404, detail="Parent comment not found")
+    if parent.summary_id != summary_id:
+        raise HTTPException(status_code=400, detail="Parent comment belongs to another summary")
+    _parent_path(db, model, parent)
+    return parent
+
+
+def assign_path(db: Session, item, parent) -> None:
+    """Give a newly added comment its path; flushes to obtain the id (the caller commits)"""
+    db.flush()
+    pk = getattr(item, _pk(type(item)).key)
+    item.path = (parent.path if parent is not None else "") + path_segment(pk)
+
+
+def _public_filter(model):
+    # Chỉ comments có cột access; admin_comments không có comment riêng tư
+    access = getattr(model, "access", None)
+    return None if access is None else access == CommentAccess.PUBLIC
+
+
+def ensure_public(db: Session, model, node) -> None:
+    """404 unless the node and all its ancestors are public, like the thread endpoint"""
+    if _public_filter(model) is None:
+        return
+    if node.access != CommentAccess.PUBLIC or any(item.access != CommentAccess.PUBLIC for item in ancestors(db, model, node)):
+        raise HTTPException(status_code=404, detail="Comment not found")
+
+
+def _descendants(model, node):
+    """Recursive CTE (id, depth) over parent_comment_id below the node; fallback for rows without a path"""
+    pk = _pk(model)
+    tree = select(pk.label("id"), literal_column("0").label("depth")).where(pk == getattr(node, pk.key))
+    tree = tree.cte("subtree", recursive=True)
+    child = aliased(model)
+    step = select(getattr(child, pk.key), tree.c.depth + 1).join(tree, child.parent_comment_id == tree.c.id)
+    public = _public_filter(child)
+    if public is not None:
+        step = step.where(public)
+    return tree.union_all(step)
+
+
+def _path_subtree(db: Session, model, node):
+    """Conditions selecting the node's public subtree by path (private replies and their subtrees excluded)"""
+    conditions = [_under(model.path, node.path)]
+    public = _public_filter(model)
+    if public is not None:
+        hidden = db.scalars(
+            select(model.path).where(_under(model.path, node.path), model.access.is_distinct_from(CommentAccess.PUBLIC))
+        ).all()
+        conditions.append(public)
+        conditions += [~_under(model.path, path) for path in hidden if path]
+    return conditions
+
+
+def subtree(db: Session, model, node, limit: int) -> list:
+    """The node and its descendants in depth-first order (by depth, id when the node has no path)"""
+    if node.path is None:
+        tree = _descendants(model, node)
+        stmt = select(model).join(tree, tree.c.id == _pk(model)).order_by(tree.c.depth, _pk(model)).limit(limit)
+        return db.scalars(stmt).all()
+    stmt = select(model).where(*_path_subtree(db, model, node)).order_by(model.path).limit(limit)
+    return db.scalars(stmt).all()
+
+
+def ancestors(db: Session, model, node) -> list:
+    """Root-first chain of the node's ancestors"""
+    if node.path is None:
+        chain = []
+        parent_id = node.parent_comment_id
+        while parent_id is not None:
+            parent = db.get(model, parent_id)
+            if parent is None:
+                break
+            chain.append(parent)
+            parent_id = parent.parent_comment_id
+        return chain[::-1]
+    ids = path_ids(node.path)[:-1]
+    if not ids:
+        return []
+    by_id = {getattr(item, _pk(model).key): item for item in db.scalars(select(model).where(_pk(model).in_(ids)))}
+    return [by_id[pk] for pk in ids if pk in by_id]
+
+
+def latest_replies(db: Session, model, node, limit: int) -> list:
+    """Newest descendants (any depth) of the node"""
+    pk = _pk(model)
+    if node.path is None:
+        tree = _descendants(model, node)
+        stmt = select(model).join(tree, tree.c.id == pk).where(tree.c.depth > 0)
+    else:
+        stmt = select(model).where(*_path_subtree(db, model, node), pk != getattr(node, pk.key))
+    return db.scalars(stmt.order_by(pk.desc()).limit(limit)).all()
@@ -0,0 +1,31 @@
+"""Append-only interaction event log.
+
+Every write that changes what a user has rated, read or bought appends an
+InteractionEvent in the same transaction as the write itself, so the
+incremental recommender (app.services.recommender.incremental_update) can
+pick up exactly the users and summaries touched since its watermark.
+Callers commit; `db` may be a Session or a Connection.
+"""
+from sqlalchemy import insert
+
+from app.models.interaction_event import InteractionEvent, InteractionSource
+
+
+def event_row(
+    user_id: int, source: InteractionSource, summary_id: int | None = None, book_id: int | None = None,
+) -> dict:
+    return {"user_id": user_id, "summary_id": summary_id, "book_id": book_id, "source": source.value}
+
+
+def record(
+    db, user_id: int | None, source: InteractionSource, summary_id: int | None = None, book_id: int | None = None,
+) -> None:
+    if user_id is None:
+        return
+    db.execute(insert(InteractionEvent), [event_row(user_id, source, summary_id, book_id)])
+
+
+def record_many(db, rows: list[dict]) -> None:
+    rows = [row for row in rows if row["user_id"] is not None]
+    if rows:
+        db.execute(insert(InteractionEvent), rows)
@@ -0,0 +1,194 @@
+"""Denormalized rating aggregates on summaries.
+
+summaries.rating_count / rating_sum / avg_rating are kept in step with the
+ratings table by applying a delta in the same transaction as every rating
+write, so reads never aggregate ratings. reconcile() recomputes them in
+chunks and find_drift() reports summaries whose aggregates disagree.
+
+    python -m app.services.ratings --check        # report drift only
+    python -m app.services.ratings --chunk-size 1000
+"""
+from sqlalchemy import case, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.rating import Rating
+from app.models.summary import Summary
+
+DRIFT_TOLERANCE = 1e-6
+
+
+def apply_delta(db: Session, summary_id: int, count_delta: int, sum_delta: float) -> None:
+    """Atomically shift a summary's aggregates; the caller commits"""
+    new_count = Summary.rating_count + count_delta
+    new_sum = Summary.rating_sum + sum_delta
+    # MySQL evaluates SET left to right with already-updated values, so
+    # avg/sum go before rating_count and every expression uses old values.
+    stmt = (
+        update(Summary)
+        .where(Summary.id == summary_id)
+        .ordered_values(
+            (Summary.avg_rating, case((new_count > 0, new_sum / new_count), else_=0)),
+            (Summary.rating_sum, case((new_count > 0, new_sum), else_=0)),
+            (Summary.rating_count, new_count),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(stmt)
+
+
+def _locked_rating(db: Session, user_id: int, summary_id: int) -> Rating | None:
+    stmt = (
+        select(Rating)
+        .where(Rating.user_id == user_id, Rating.summary_id == summary_id)
+        .with_for_update()
+    )
+    return db.execute(stmt).scalar_one_or_none()
+
+
+def set_score(db: Session, rating: Rating, score: float) -> None:
+    """Change an existing (row-locked) rating's score and its summary's aggregates"""
+    delta = score - rating.score
+    rating.score = score
+    if delta:
+        apply_delta(db, rating.summary_id, 0, delta)
+
+
+def upsert_rating(db: Session, user_id: int, summary_id: int, score: float) -> Rating:
+    """Insert or update the single (user_id, summary_id) rating; the caller commits"""
+    rating = _locked_rating(db, user_id, summary_id)
+    if rating is None:
+        try:
+            with db.begin_nested():
+                rating = Rating(user_id=user_id, summary_id=summary_id, score=score)
+                db.add(rating)
+                db.flush()
+        except IntegrityError:
+            # Request song song vừa insert cùng cặp: chuyển sang nhánh update
+            rating = _locked_rating(db, user_id, summary_id)
+            if rating is None:
+                raise
+        else:
+            apply_delta(db, summary_id, 1, score)
+            return rating
+    set_score(db, rating, score)
+    return rating
+
+
+def remove_rating(db: Session, rating: Rating) -> None:
+    apply_delta(db, rating.summary_id, -1, -rating.score)
+    db.delete(rating)
+
+
+def _expected(db: Session, summary_ids: list[int]) -> dict[int, tuple[int, float]]:
+    stmt = (
+        select(Rating.summary_id, func.count(), func.sum(Rating.score))
+        .where(Rating.summary_id.in_(summary_ids))
+        .group_by(Rating.summary_id)
+    )
+    return {summary_id: (count, total or 0.0) for summary_id, count, total in db.execute(stmt)}
+
+
+def reconcile(db: Session, chunk_size: int = 500) -> int:
+    """Recompute aggregates for every summary, one committed chunk at a time.
+
+    Each chunk locks its summary rows first, so concurrent rating writes
+    (which update the same rows) either land before the recount or apply
+    their delta on top of it. Returns the number of summaries corrected.
+    """
+    fixed = 0
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(Summary.id, Summary.rating_count, Summary.rating_sum, Summary.avg_rating)
+            .where(Summary.id > last_id)
+            .order_by(Summary.id)
+            .limit(chunk_size)
+            .with_for_update()
+        ).all()
+        if not rows:
+            break
+        expected = _expected(db, [row.id for row in rows])
+        updates = []
+        for row in rows:
+            count, total = expected.get(row.id, (0, 0.0))
+            avg = total / count if count else 0.0
+            if (
+                row.rating_count != count
+                or abs((row.rating_sum or 0.0) - total) > DRIFT_TOLERANCE
+                or abs((row.avg_rating or 0.0) - avg) > DRIFT_TOLERANCE
+            ):
+                updates.append({"id": row.id, "rating_count": count, "rating_sum": total, "avg_rating": avg})
+        if updates:
+            db.execute(update(Summary), updates)
+        db.commit()
+        fixed += len(updates)
+        last_id = rows[-1].id
+    return fixed
+
+
+def find_drift(db: Session, limit: int = 100) -> list[dict]:
+    """Summaries whose stored count/sum/average differ from the ratings table"""
+    totals = (
+        select(
+            Rating.summary_id,
+            func.count().label("count"),
+            func.sum(Rating.score).label("total"),
+        )
+        .group_by(Rating.summary_id)
+        .subquery()
+    )
+    expected_count = func.coalesce(totals.c.count, 0)
+    expected_sum = func.coalesce(totals.c.total, 0)
+    # Cùng quy ước với reconcile(): không có rating thì avg = 0
+    expected_avg = func.coalesce(expected_sum / func.nullif(expected_count, 0), 0)
+    stmt = (
+        select(
+            Summary.id, Summary.rating_count, Summary.rating_sum, Summary.avg_rating,
+            expected_count, expected_sum, expected_avg,
+        )
+        .outerjoin(totals, totals.c.summary_id == Summary.id)
+        .where(
+            or_(
+                Summary.rating_count != expected_count,
+                func.abs(func.coalesce(Summary.rating_sum, 0) - expected_sum) > DRIFT_TOLERANCE,
+                func.abs(func.coalesce(Summary.avg_rating, 0) - expected_avg) > DRIFT_TOLERANCE,
+            )
+        )
+        .order_by(Summary.id)
+        .limit(limit)
+    )
+    return [
+        {
+            "summary_id": summary_id,
+            "rating_count": count,
+            "rating_sum": total,
+            "avg_rating": avg,
+            "expected_count": exp_count,
+            "expected_sum": float(exp_sum),
+            "expected_avg": float(exp_avg),
+        }
+        for summary_id, count, total, avg, exp_count, exp_sum, exp_avg in db.execute(stmt)
+    ]
+
+if __name__ == "__main__":
+    import argparse
+
+    from app.database import SessionLocal
+    from app.main import _import_all_models
+
+    _import_all_models()
+
+    parser = argparse.ArgumentParser(description="Check or rebuild summary rating aggregates")
+    parser.add_argument("--check", action="store_true", help="only report drift")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+
+    with SessionLocal() as session:
+        if args.check:
+            drift = find_drift(session, limit=1000)
+            for item in drift:
+                print(item)
+            print(f"{len(drift)} summaries drifted")
+        else:
+            print(f"{reconcile(session, args.chunk_size)} summaries corrected")
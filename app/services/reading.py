@@ -0,0 +1,112 @@
+"""Reading payloads for a summary.
+
+section_state() is the cheap validator of a summary's sections (one
+aggregate query that never reads the Text bodies). It drives the
+conditional GET on /sections/by-summary and keys the shared part of the
+reading bundle, so a section edit produces a new cache key without any
+explicit invalidation.
+
+The bundle body is assembled from bytes: the shared prefix (summary +
+ordered sections, cached per summary) followed by the per-user part
+(ReadingHistory position + NoteHighlights), serialized per request.
+"""
+import gzip
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+
+from pydantic import TypeAdapter
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.content_section import ContentSection
+from app.models.note import NoteHighlight
+from app.models.reading_history import ReadingHistory
+from app.schemas import content_section as section_schema
+from app.schemas import note as note_schema
+from app.schemas import reading_history as history_schema
+from app.schemas import summary as summary_schema
+
+_SUMMARY = TypeAdapter(summary_schema.SummaryResponse)
+_SECTIONS = TypeAdapter(list[section_schema.SectionResponse])
+_HISTORY = TypeAdapter(history_schema.ReadingHistoryResponse | None)
+_NOTES = TypeAdapter(list[note_schema.NoteResponse])
+
+
+@dataclass(frozen=True)
+class SectionState:
+    summary_id: int
+    count: int
+    last_modified: datetime | None
+    id_sum: int | None
+    version_sum: int | None
+
+    @property
+    def token(self) -> str:
+        raw = f"{self.summary_id}|{self.count}|{self.last_modified}|{self.id_sum}|{self.version_sum}"
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+
+async def section_state(db: AsyncSession, summary_id: int) -> SectionState:
+    changed_at = func.coalesce(ContentSection.updated_at, ContentSection.created_at)
+    result = await db.execute(
+        select(
+            func.count(),
+            func.max(changed_at),
+            func.sum(ContentSection.section_id),
+            func.sum(ContentSection.version),
+        ).filter(ContentSection.summary_id == summary_id)
+    )
+    count, last_modified, id_sum, version_sum = result.one()
+    return SectionState(summary_id, count, last_modified, id_sum, version_sum)
+
+
+def bundle_key(state: SectionState) -> str:
+    return f"bundle:{state.summary_id}:{state.token}"
+
+
+async def load_sections(db: AsyncSession, summary_id: int):
+    result = await db.execute(
+        select(ContentSection)
+        .filter(ContentSection.summary_id == summary_id)
+        .order_by(ContentSection.section_order, ContentSection.section_id)
+    )
+    return result.scalars().all()
+
+
+async def load_user_state(db: AsyncSession, user_id: int, summary_id: int):
+    """Latest reading position and all notes/highlights of a user for a summary"""
+    history = await db.execute(
+        select(ReadingHistory)
+        .filter(ReadingHistory.user_id == user_id, ReadingHistory.summary_id == summary_id)
+        .order_by(ReadingHistory.last_read_date.desc(), ReadingHistory.reading_id.desc())
+        .limit(1)
+    )
+    notes = await db.execute(
+        select(NoteHighlight)
+        .filter(NoteHighlight.user_id == user_id, NoteHighlight.summary_id == summary_id)
+        .order_by(NoteHighlight.section_id, NoteHighlight.note_id)
+    )
+    return history.scalars().first(), notes.scalars().all()
+
+
+def shared_prefix(summary, sections) -> bytes:
+    """Open JSON object holding the summary and its sections, completed by bundle_body()"""
+    return (
+        b'{"summary":' + _SUMMARY.dump_json(_SUMMARY.validate_python(summary, from_attributes=True))
+        + b',"sections":' + _SECTIONS.dump_json(_SECTIONS.validate_python(sections, from_attributes=True))
+    )
+
+
+def bundle_body(prefix: bytes, history=None, notes=()) -> bytes:
+    return (
+        prefix
+        + b',"reading_history":' + _HISTORY.dump_json(_HISTORY.validate_python(history, from_attributes=True))
+        + b',"notes":' + _NOTES.dump_json(_NOTES.validate_python(list(notes), from_attributes=True))
+        + b"}"
+    )
+
+
+def compress(body: bytes) -> bytes:
+    # mtime=0 để cùng nội dung luôn cho cùng bytes nén
+    return gzip.compress(body, compresslevel=6, mtime=0)
@@ -0,0 +1,498 @@
+"""Item-item collaborative filtering for summaries.
+
+Interactions from ratings (score / 5), reading_history (progress, at least
+READ_MIN_WEIGHT) and purchases (order_details -> every approved summary of
+the bought book) are summed into a sparse user x summary matrix. Summaries
+are compared with cosine similarity computed block by block with SciPy
+sparse products, keeping only the strongest `neighbors` per summary. Each
+user's score for a summary is the similarity-weighted sum over what they
+already interacted with; the top N unseen summaries are stored in
+`recommendations` with algorithm_type `item_cf`.
+
+refresh() rebuilds everything and persists the neighbour lists
+(summary_neighbors) and column norms (summary_norms). incremental_update()
+then consumes the interaction event log from the stored watermark: it
+recomputes the neighbourhoods of the summaries that changed (and patches
+those summaries into the lists of their neighbours), rescores only the users
+who touched them, and writes only the recommendation rows that differ.
+event_id is assigned at insert time, not at commit, so both only consume
+events older than RECOMMENDER_EVENT_LAG seconds by the database clock: an
+event whose transaction is still open when a later one is read stays above
+the watermark instead of being skipped (re-applying an event is harmless,
+the affected rows are recomputed from the source tables).
+Between full rebuilds the neighbour lists are approximate: a list that loses
+an entry is not back-filled until the next refresh().
+
+    python -m app.services.recommender --top-n 20 --neighbors 50   # full rebuild
+    python -m app.services.recommender --incremental --watch 60    # apply new events every minute
+"""
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Iterable, Iterator
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import RECOMMENDER_EVENT_LAG
+from app.models.interaction_event import InteractionEvent, RecommenderWatermark
+from app.models.recommendation import AlgorithmType
+from app.models.summary_neighbor import SummaryNeighbor, SummaryNorm
+
+ALGORITHM = AlgorithmType.ITEM_CF.value
+
+PURCHASE_WEIGHT = 1.0
+READ_MIN_WEIGHT = 0.2
+SIMILARITY_BLOCK = 512
+SCORING_BLOCK = 4096
+WRITE_BATCH = 5000
+ID_CHUNK = 5000
+SCORE_TOLERANCE = 1e-6
+
+Summary = models.summary.Summary
+Recommendation = models.recommendation.Recommendation
+
+
+@dataclass
+class InteractionMatrix:
+    matrix: sparse.csr_matrix  # users x summaries, float32
+    user_ids: np.ndarray
+    item_ids: np.ndarray
+
+
+def _chunks(ids: Iterable[int], size: int = ID_CHUNK) -> Iterator[list[int]]:
+    ids = sorted(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def _interaction_sources(users: list[int] | None = None, items: list[int] | None = None) -> list[tuple[str, object]]:
+    """(name, select(user_id, summary_id, raw weight)); approval is checked afterwards in NumPy"""
+    Rating = models.rating.Rating
+    ReadingHistory = models.reading_history.ReadingHistory
+    OrderDetail = models.order_detail.OrderDetail
+    Order = models.order.Order
+    # Không join điều kiện status: planner sẽ duyệt mọi summary approved thay vì đi theo IN (...)
+    sources = [
+        ("ratings", Rating.user_id, Rating.summary_id,
+         select(Rating.user_id, Rating.summary_id, Rating.score)),
+        ("reading", ReadingHistory.user_id, ReadingHistory.summary_id,
+         select(ReadingHistory.user_id, ReadingHistory.summary_id, ReadingHistory.progress_percent)
+         .where(ReadingHistory.user_id.is_not(None), ReadingHistory.summary_id.is_not(None))),
+        ("purchases", Order.user_id, Summary.id,
+         select(Order.user_id, Summary.id, OrderDetail.quantity)
+         .select_from(OrderDetail)
+         .join(Order, Order.id == OrderDetail.order_id)
+         .join(Summary, Summary.book_id == OrderDetail.book_id)
+         .distinct()),
+    ]
+    result = []
+    for name, user_column, item_column, stmt in sources:
+        if users is not None:
+            stmt = stmt.where(user_column.in_(users))
+        if items is not None:
+            stmt = stmt.where(item_column.in_(items))
+        result.append((name, stmt))
+    return result
+
+
+def _weights(source: str, raw: np.ndarray) -> np.ndarray:
+    raw = np.nan_to_num(raw)
+    if source == "ratings":
+        return raw / 5.0
+    if source == "reading":
+        return np.maximum(raw / 100.0, READ_MIN_WEIGHT)
+    return np.full_like(raw, PURCHASE_WEIGHT)
+
+
+def load_interactions(
+    db: Session, users: Iterable[int] | None = None, items: Iterable[int] | None = None, chunk_size: int = 50_000,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Stream interactions into (user_ids, summary_ids, weights), optionally only for some users or summaries"""
+    if users is not None:
+        filters = [{"users": chunk} for chunk in _chunks(users)]
+    elif items is not None:
+        filters = [{"items": chunk} for chunk in _chunks(items)]
+    else:
+        filters = [{}]
+    approved = np.fromiter(db.scalars(select(Summary.id).where(Summary.status == "approved")), dtype=np.int64)
+    user_parts, item_parts, weight_parts = [], [], []
+    for kwargs in filters:
+        for source, stmt in _interaction_sources(**kwargs):
+            result = db.execute(stmt.execution_options(yield_per=chunk_size))
+            for rows in result.partitions():
+                block = np.array(rows, dtype=np.float64).reshape(-1, 3)
+                block = block[np.isin(block[:, 1].astype(np.int64), approved)]
+                user_parts.append(block[:, 0].astype(np.int64))
+                item_parts.append(block[:, 1].astype(np.int64))
+                weight_parts.append(_weights(source, block[:, 2]).astype(np.float32))
+    if not user_parts:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty(0, dtype=np.float32)
+    return np.concatenate(user_parts), np.concatenate(item_parts), np.concatenate(weight_parts)
+
+
+def build_matrix(users: np.ndarray, items: np.ndarray, weights: np.ndarray) -> InteractionMatrix:
+    """Sparse users x summaries matrix; repeated (user, summary) pairs are summed"""
+    user_ids, user_index = np.unique(users, return_inverse=True)
+    item_ids, item_index = np.unique(items, return_inverse=True)
+    matrix = sparse.coo_matrix(
+        (weights.astype(np.float32), (user_index, item_index)),
+        shape=(len(user_ids), len(item_ids)),
+    ).tocsr()
+    matrix.sum_duplicates()
+    return InteractionMatrix(matrix, user_ids, item_ids)
+
+
+def column_norms(matrix: sparse.csr_matrix) -> np.ndarray:
+    return np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=0), dtype=np.float32).ravel())
+
+
+def _inverse(norms: np.ndarray) -> np.ndarray:
+    return np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+
+
+def _top_k_rows(sims: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(row, column, value) of the k largest positive entries of each row"""
+    top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    top_vals = np.take_along_axis(sims, top, axis=1)
+    keep = top_vals > 0
+    return np.repeat(np.arange(sims.shape[0]), k)[keep.ravel()], top[keep], top_vals[keep]
+
+
+def item_neighbors(matrix: sparse.csr_matrix, k: int, block: int = SIMILARITY_BLOCK) -> sparse.csr_matrix:
+    """Top-k cosine neighbours per summary as a sparse summaries x summaries matrix"""
+    n_items = matrix.shape[1]
+    k = min(k, n_items - 1)
+    if k <= 0:
+        return sparse.csr_matrix((n_items, n_items), dtype=np.float32)
+
+    normalized = (matrix @ sparse.diags(_inverse(column_norms(matrix)))).tocsr().astype(np.float32)
+    by_item = normalized.T.tocsr()
+
+    rows, cols, vals = [], [], []
+    for start in range(0, n_items, block):
+        stop = min(start + block, n_items)
+        sims = (by_item[start:stop] @ normalized).toarray()
+        sims[np.arange(stop - start), np.arange(start, stop)] = 0  # bỏ chính nó
+        r, c, v = _top_k_rows(sims, k)
+        rows.append(r + start)
+        cols.append(c)
+        vals.append(v)
+    return sparse.csr_matrix(
+        (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(n_items, n_items),
+        dtype=np.float32,
+    )
+
+
+def top_n(
+    matrix: sparse.csr_matrix, neighbors: sparse.csr_matrix, n: int, block: int = SCORING_BLOCK,
+) -> Iterator[tuple[int, np.ndarray, np.ndarray]]:
+    """Yield (user index, summary indexes, scores) of each user's best unseen summaries"""
+    for start in range(0, matrix.shape[0], block):
+        seen = matrix[start:start + block]
+        scores = (seen @ neighbors).tocsr()
+        scores = (scores - scores.multiply(seen > 0)).tocsr()
+        scores.eliminate_zeros()
+        for row in range(scores.shape[0]):
+            lo, hi = scores.indptr[row], scores.indptr[row + 1]
+            if lo == hi:
+                continue
+            data = scores.data[lo:hi]
+            picked = np.argpartition(-data, n - 1)[:n] if hi - lo > n else np.arange(hi - lo)
+            picked = picked[np.argsort(-data[picked], kind="stable")]
+            yield start + row, scores.indices[lo:hi][picked], data[picked]
+
+
+def _insert_batches(db: Session, model, rows: Iterable[dict], batch: int = WRITE_BATCH) -> int:
+    written = 0
+    pending: list[dict] = []
+    for row in rows:
+        pending.append(row)
+        if len(pending) >= batch:
+            db.execute(insert(model), pending)
+            written += len(pending)
+            pending = []
+    if pending:
+        db.execute(insert(model), pending)
+        written += len(pending)
+    return written
+
+
+def _recommendation_rows(interactions: InteractionMatrix, ranked) -> Iterator[dict]:
+    for user_index, item_indexes, scores in ranked:
+        user_id = int(interactions.user_ids[user_index])
+        for item_id, score in zip(interactions.item_ids[item_indexes], scores):
+            yield {"user_id": user_id, "recommended_summary_id": int(item_id), "score": float(score),
+                   "algorithm_type": ALGORITHM}
+
+
+def write_recommendations(db: Session, interactions: InteractionMatrix, ranked, batch: int = WRITE_BATCH) -> int:
+    """Replace every item_cf row with `ranked` in a single transaction; returns rows written"""
+    db.execute(delete(Recommendation).where(Recommendation.algorithm_type == ALGORITHM))
+    written = _insert_batches(db, Recommendation, _recommendation_rows(interactions, ranked), batch)
+    db.commit()
+    return written
+
+
+def save_model(db: Session, interactions: InteractionMatrix, similar: sparse.csr_matrix) -> None:
+    """Persist neighbour lists and column norms for incremental_update(); the caller commits"""
+    db.execute(delete(SummaryNeighbor))
+    db.execute(delete(SummaryNorm))
+    coo = similar.tocoo()
+    ids = interactions.item_ids
+    _insert_batches(db, SummaryNeighbor, (
+        {"summary_id": int(ids[r]), "neighbor_id": int(ids[c]), "similarity": float(v)}
+        for r, c, v in zip(coo.row, coo.col, coo.data)
+    ))
+    norms = column_norms(interactions.matrix)
+    _insert_batches(db, SummaryNorm, (
+        {"summary_id": int(item_id), "norm": float(norm)} for item_id, norm in zip(ids, norms) if norm > 0
+    ))
+
+
+def _locked_watermark(db: Session) -> RecommenderWatermark:
+    mark = db.execute(
+        select(RecommenderWatermark).where(RecommenderWatermark.algorithm_type == ALGORITHM).with_for_update()
+    ).scalar_one_or_none()
+    if mark is None:
+        mark = RecommenderWatermark(algorithm_type=ALGORITHM, last_event_id=0)
+        db.add(mark)
+        db.flush()
+    return mark
+
+
+def _settled(db: Session, lag_seconds: float):
+    """Events old enough that every lower event_id has been committed (or rolled back)"""
+    cutoff = db.scalar(select(func.now())) - timedelta(seconds=lag_seconds)
+    return InteractionEvent.created_at <= cutoff
+
+
+def refresh(db: Session, top: int = 20, neighbors: int = 50, lag_seconds: float = RECOMMENDER_EVENT_LAG) -> dict:
+    """Rebuild the item_cf recommendations and the stored model from every interaction"""
+    started = time.perf_counter()
+    mark = _locked_watermark(db)
+    # Chỉ tiến tới event đã ổn định: event mới hơn (có thể còn id nhỏ hơn chưa commit)
+    # sẽ được incremental_update áp dụng lại
+    mark.last_event_id = max(
+        mark.last_event_id,
+        db.scalar(select(func.max(InteractionEvent.event_id)).where(_settled(db, lag_seconds))) or 0,
+    )
+    interactions = build_matrix(*load_interactions(db))
+    loaded = time.perf_counter()
+    similar = item_neighbors(interactions.matrix, neighbors)
+    save_model(db, interactions, similar)
+    written = write_recommendations(db, interactions, top_n(interactions.matrix, similar, top))
+    return {
+        "users": len(interactions.user_ids),
+        "summaries": len(interactions.item_ids),
+        "interactions": int(interactions.matrix.nnz),
+        "rows_written": written,
+        "load_seconds": round(loaded - started, 3),
+        "total_seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def _stored_norms(db: Session, item_ids: np.ndarray) -> np.ndarray:
+    found: dict[int, float] = {}
+    for chunk in _chunks(item_ids.tolist()):
+        found.update(db.execute(
+            select(SummaryNorm.summary_id, SummaryNorm.norm).where(SummaryNorm.summary_id.in_(chunk))
+        ).all())
+    return np.array([found.get(int(item_id), np.nan) for item_id in item_ids], dtype=np.float32)
+
+
+def _stored_lists(db: Session, column, ids: Iterable[int]) -> dict[int, dict[int, float]]:
+    lists: dict[int, dict[int, float]] = {}
+    for chunk in _chunks(ids):
+        for summary_id, neighbor_id, similarity in db.execute(
+            select(SummaryNeighbor.summary_id, SummaryNeighbor.neighbor_id, SummaryNeighbor.similarity)
+            .where(column.in_(chunk))
+        ):
+            lists.setdefault(summary_id, {})[neighbor_id] = similarity
+    return lists
+
+
+def _recompute_neighbourhoods(
+    db: Session, local: InteractionMatrix, changed_items: set[int], k: int,
+) -> tuple[int, int]:
+    """Rewrite neighbour lists and norms of changed summaries and patch them into their neighbours' lists"""
+    ids = local.item_ids
+    index = {int(item_id): i for i, item_id in enumerate(ids)}
+    affected = np.array(sorted(index[item] for item in changed_items if item in index), dtype=np.int64)
+
+    # Cột của summary bị ảnh hưởng là đầy đủ trong `local`; các cột khác lấy norm đã lưu
+    norms = _stored_norms(db, ids)
+    local_norms = column_norms(local.matrix)
+    norms[affected] = local_norms[affected]
+    norms = np.where(np.isnan(norms), local_norms, norms)
+    inverse = _inverse(norms)
+
+    new_lists: dict[int, dict[int, float]] = {item: {} for item in changed_items}
+    similarity_to: dict[int, dict[int, float]] = {}  # j -> {summary bị ảnh hưởng i: sim(i, j)}
+    by_item = local.matrix.T.tocsr()
+    kk = min(k, len(ids) - 1)
+    for start in range(0, len(affected), SIMILARITY_BLOCK):
+        rows = affected[start:start + SIMILARITY_BLOCK]
+        sims = (by_item[rows] @ local.matrix).toarray()
+        sims *= inverse[rows][:, None] * inverse[None, :]
+        sims[np.arange(len(rows)), rows] = 0
+        for r, c in zip(*np.nonzero(sims > 0)):
+            similarity_to.setdefault(int(ids[c]), {})[int(ids[rows[r]])] = float(sims[r, c])
+        if kk > 0:
+            for r, c, v in zip(*_top_k_rows(sims, kk)):
+                new_lists[int(ids[rows[r]])][int(ids[c])] = float(v)
+
+    # Danh sách của summary khác: bỏ/thay các láng giềng vừa đổi, giữ top-k
+    holders = set(_stored_lists(db, SummaryNeighbor.neighbor_id, changed_items))
+    stored = _stored_lists(db, SummaryNeighbor.summary_id, (holders | set(similarity_to)) - changed_items)
+    for owner in (holders | set(similarity_to)) - changed_items:
+        before = stored.get(owner, {})
+        merged = {n: s for n, s in before.items() if n not in changed_items}
+        merged.update(similarity_to.get(owner, {}))
+        best = dict(sorted(merged.items(), key=lambda pair: -pair[1])[:k])
+        if best.keys() != before.keys() or any(abs(best[n] - before[n]) > SCORE_TOLERANCE for n in best):
+            new_lists[owner] = best
+
+    for chunk in _chunks(new_lists):
+        db.execute(delete(SummaryNeighbor).where(SummaryNeighbor.summary_id.in_(chunk)))
+    _insert_batches(db, SummaryNeighbor, (
+        {"summary_id": owner, "neighbor_id": neighbor, "similarity": similarity}
+        for owner, neighbors in new_lists.items() for neighbor, similarity in neighbors.items()
+    ))
+    for chunk in _chunks(changed_items):
+        db.execute(delete(SummaryNorm).where(SummaryNorm.summary_id.in_(chunk)))
+    _insert_batches(db, SummaryNorm, (
+        {"summary_id": int(ids[i]), "norm": float(local_norms[i])} for i in affected if local_norms[i] > 0
+    ))
+    return len(affected), len(new_lists)
+
+
+def _rescore(db: Session, local: InteractionMatrix, top: int) -> dict[int, dict[int, float]]:
+    """New top-N per user of `local`, scored with the stored neighbour lists"""
+    lists = _stored_lists(db, SummaryNeighbor.summary_id, local.item_ids.tolist())
+    targets = {neighbor for neighbors in lists.values() for neighbor in neighbors}
+    ids = np.union1d(local.item_ids, np.fromiter(targets, dtype=np.int64, count=len(targets)))
+    position = np.searchsorted(ids, local.item_ids)
+    coo = local.matrix.tocoo()
+    seen = sparse.csr_matrix((coo.data, (coo.row, position[coo.col])), shape=(len(local.user_ids), len(ids)))
+    rows = [(owner, neighbor, similarity) for owner, neighbors in lists.items() for neighbor, similarity in neighbors.items()]
+    if rows:
+        owners, neighbors_, sims = map(np.array, zip(*rows))
+        neighbors = sparse.csr_matrix(
+            (sims.astype(np.float32), (np.searchsorted(ids, owners), np.searchsorted(ids, neighbors_))),
+            shape=(len(ids), len(ids)),
+        )
+    else:
+        neighbors = sparse.csr_matrix((len(ids), len(ids)), dtype=np.float32)
+    result: dict[int, dict[int, float]] = {int(user_id): {} for user_id in local.user_ids}
+    for user_index, item_indexes, scores in top_n(seen, neighbors, top):
+        result[int(local.user_ids[user_index])] = {int(ids[i]): float(s) for i, s in zip(item_indexes, scores)}
+    return result
+
+
+def _apply_recommendation_diff(db: Session, fresh: dict[int, dict[int, float]]) -> dict:
+    """Insert, update or delete only the item_cf rows whose summary or score changed"""
+    deletes, updates, inserts = [], [], []
+    existing: dict[int, dict[int, tuple[int, float]]] = {}
+    for chunk in _chunks(fresh):
+        for rec_id, user_id, summary_id, score in db.execute(
+            select(Recommendation.recommendation_id, Recommendation.user_id,
+                   Recommendation.recommended_summary_id, Recommendation.score)
+            .where(Recommendation.user_id.in_(chunk), Recommendation.algorithm_type == ALGORITHM)
+        ):
+            existing.setdefault(user_id, {})[summary_id] = (rec_id, score)
+    for user_id, scores in fresh.items():
+        old = existing.get(user_id, {})
+        deletes.extend(rec_id for summary_id, (rec_id, _score) in old.items() if summary_id not in scores)
+        for summary_id, score in scores.items():
+            if summary_id not in old:
+                inserts.append({"user_id": user_id, "recommended_summary_id": summary_id, "score": score,
+                                "algorithm_type": ALGORITHM})
+            elif abs(old[summary_id][1] - score) > SCORE_TOLERANCE:
+                updates.append({"recommendation_id": old[summary_id][0], "score": score})
+    for chunk in _chunks(deletes):
+        db.execute(delete(Recommendation).where(Recommendation.recommendation_id.in_(chunk)))
+    if updates:
+        db.execute(update(Recommendation), updates)
+    _insert_batches(db, Recommendation, inserts)
+    return {"inserted": len(inserts), "updated": len(updates), "deleted": len(deletes)}
+
+
+def incremental_update(
+    db: Session,
+    top: int = 20,
+    neighbors: int = 50,
+    max_events: int = 50_000,
+    lag_seconds: float = RECOMMENDER_EVENT_LAG,
+) -> dict:
+    """Fold settled interaction events newer than the watermark into the stored model and recommendations"""
+    started = time.perf_counter()
+    mark = _locked_watermark(db)
+    events = db.execute(
+        select(InteractionEvent.event_id, InteractionEvent.user_id, InteractionEvent.summary_id, InteractionEvent.book_id)
+        .where(InteractionEvent.event_id > mark.last_event_id, _settled(db, lag_seconds))
+        .order_by(InteractionEvent.event_id)
+        .limit(max_events)
+    ).all()
+    if not events:
+        db.commit()
+        return {"events": 0}
+
+    changed_users = {event.user_id for event in events}
+    changed_items = {event.summary_id for event in events if event.summary_id is not None}
+    book_ids = {event.book_id for event in events if event.book_id is not None}
+    if book_ids:
+        changed_items |= set(db.scalars(
+            select(Summary.id).where(Summary.book_id.in_(book_ids), Summary.status == "approved")
+        ))
+
+    # Mọi user từng tương tác với summary bị ảnh hưởng, kèm toàn bộ tương tác của họ
+    column_users = set(load_interactions(db, items=changed_items)[0].tolist()) if changed_items else set()
+    local = build_matrix(*load_interactions(db, users=changed_users | column_users))
+    recomputed, rewritten = _recompute_neighbourhoods(db, local, changed_items, neighbors)
+    fresh = _rescore(db, local, top)
+    for user_id in changed_users - set(fresh):
+        fresh[user_id] = {}  # không còn tương tác nào: xóa gợi ý cũ
+    diff = _apply_recommendation_diff(db, fresh)
+
+    mark.last_event_id = events[-1].event_id
+    db.commit()
+    return {
+        "events": len(events),
+        "summaries_recomputed": recomputed,
+        "neighbor_lists_rewritten": rewritten,
+        "users_rescored": len(fresh),
+        **diff,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from app.database import SessionLocal
+    from app.main import _import_all_models
+
+    _import_all_models()
+
+    parser = argparse.ArgumentParser(description="Rebuild or incrementally update item-item recommendations")
+    parser.add_argument("--top-n", type=int, default=20, help="recommendations kept per user")
+    parser.add_argument("--neighbors", type=int, default=50, help="similar summaries kept per summary")
+    parser.add_argument("--incremental", action="store_true", help="only apply interaction events since the watermark")
+    parser.add_argument("--watch", type=float, default=0, help="with --incremental: repeat every N seconds")
+    args = parser.parse_args()
+
+    while True:
+        with SessionLocal() as session:
+            if args.incremental:
+                print(incremental_update(session, args.top_n, args.neighbors))
+            else:
+                print(refresh(session, args.top_n, args.neighbors))
+        if not (args.incremental and args.watch):
+            break
+        time.sleep(args.watch)
@@ -0,0 +1,228 @@
+"""Search subsystem for approved summaries.
+
+MySQL uses FULLTEXT indexes on summaries.title, books.title and authors.name
+(MATCH ... AGAINST, relevance-ranked). Other databases (SQLite in dev/tests)
+use the in-process inverted index below, which folds Vietnamese diacritics
+and is updated incrementally by the summary/book/author write handlers.
+"""
+import bisect
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import SEARCH_BACKEND
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Trọng số theo field: tiêu đề summary > tên sách > tác giả
+FIELD_WEIGHTS = {"summary_title": 3.0, "book_title": 2.0, "author_name": 1.0}
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip Vietnamese diacritics ("Nguyễn Nhật Ánh" -> "nguyen nhat anh")"""
+    text = text.replace("đ", "d").replace("Đ", "D")
+    decomposed = unicodedata.normalize("NFD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def tokenize(text: str | None) -> list[str]:
+    if not text:
+        return []
+    return _TOKEN_RE.findall(fold(text))
+
+
+def _document_rows():
+    Summary = models.summary.Summary
+    Book = models.book.Book
+    Author = models.author.Author
+    return (
+        select(Summary.id, Summary.status, Summary.title, Book.title, Author.name)
+        .outerjoin(Book, Summary.book_id == Book.id)
+        .outerjoin(Author, Book.author_id == Author.id)
+    )
+
+
+class InvertedIndex:
+    """Weighted inverted index of approved summaries (summary id -> terms)"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._postings: dict[str, dict[int, float]] = {}
+        self._doc_terms: dict[int, Counter] = {}
+        self._vocabulary: list[str] = []  # sorted, for prefix lookups
+        self._queued: set[int] | None = None  # id được ghi trong lúc đang build lần đầu
+        self.built = False
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def _remove(self, doc_id: int) -> None:
+        terms = self._doc_terms.pop(doc_id, None)
+        if not terms:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                pos = bisect.bisect_left(self._vocabulary, term)
+                if pos < len(self._vocabulary) and self._vocabulary[pos] == term:
+                    self._vocabulary.pop(pos)
+
+    def _add(self, doc_id: int, fields: dict[str, str | None]) -> None:
+        terms: Counter = Counter()
+        for field, value in fields.items():
+            for token in tokenize(value):
+                terms[token] += FIELD_WEIGHTS[field]
+        if not terms:
+            return
+        self._doc_terms[doc_id] = terms
+        for term, weight in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._vocabulary, term)
+            postings[doc_id] = weight
+
+    def apply_rows(self, rows, doc_ids=()) -> None:
+        """Upsert approved rows, drop everything else listed in doc_ids"""
+        with self._lock:
+            seen = set()
+            for summary_id, status, title, book_title, author_name in rows:
+                seen.add(summary_id)
+                self._remove(summary_id)
+                if status == "approved":
+                    self._add(summary_id, {
+                        "summary_title": title,
+                        "book_title": book_title,
+                        "author_name": author_name,
+                    })
+            for doc_id in doc_ids:
+                if doc_id not in seen:
+                    self._remove(doc_id)
+
+    def begin_build(self) -> None:
+        """Start queueing refreshed ids; call before the initial read"""
+        with self._lock:
+            if self._queued is None:
+                self._queued = set()
+
+    def queue(self, doc_ids) -> bool:
+        """Queue ids written while the initial build is running; False if not building"""
+        with self._lock:
+            if self._queued is None:
+                return False
+            self._queued.update(doc_ids)
+            return True
+
+    def take_queued(self) -> list[int]:
+        """Ids queued since the last call; marks the index built once nothing is left"""
+        with self._lock:
+            queued = sorted(self._queued or ())
+            if queued:
+                self._queued = set()
+            else:
+                self._queued = None
+                self.built = True
+            return queued
+
+    def _expand(self, token: str, prefix: bool) -> list[str]:
+        if not prefix:
+            return [token] if token in self._postings else []
+        start = bisect.bisect_left(self._vocabulary, token)
+        end = bisect.bisect_left(self._vocabulary, token + "￿")
+        return self._vocabulary[start:end]
+
+    def search(self, query: str) -> list[tuple[int, float]]:
+        """(summary id, score) matching every query token, best first (last token is a prefix)"""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        with self._lock:
+            total = len(self._doc_terms) or 1
+            scores: dict[int, float] | None = None
+            for i, token in enumerate(tokens):
+                token_scores: dict[int, float] = {}
+                for term in self._expand(token, prefix=i == len(tokens) - 1):
+                    postings = self._postings[term]
+                    idf = math.log(1 + total / len(postings))
+                    for doc_id, weight in postings.items():
+                        token_scores[doc_id] = max(token_scores.get(doc_id, 0.0), weight * idf)
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {d: s + token_scores[d] for d, s in scores.items() if d in token_scores}
+                if not scores:
+                    return []
+        # Cùng thứ tự với keyset (score DESC, id DESC) của search_approved_summaries
+        return sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+
+
+class SearchService:
+    def __init__(self) -> None:
+        self.index = InvertedIndex()
+
+    def uses_fulltext(self, dialect_name: str) -> bool:
+        if SEARCH_BACKEND == "fulltext":
+            return True
+        if SEARCH_BACKEND == "memory":
+            return False
+        return dialect_name == "mysql"
+
+    def fulltext_score(self, q: str):
+        """MATCH ... AGAINST relevance across the three FULLTEXT indexes (MySQL)"""
+        return (
+            match(models.summary.Summary.title, against=q).in_natural_language_mode() * FIELD_WEIGHTS["summary_title"]
+            + match(models.book.Book.title, against=q).in_natural_language_mode() * FIELD_WEIGHTS["book_title"]
+            + match(models.author.Author.name, against=q).in_natural_language_mode() * FIELD_WEIGHTS["author_name"]
+        )
+
+    async def ensure_built(self, db) -> None:
+        """Build the in-process index on first use (AsyncSession)"""
+        if self.index.built:
+            return
+        # Bật hàng đợi trước khi đọc: write nào xen giữa lúc đọc và lúc built=True
+        # vẫn được áp dụng sau lần đọc đầu
+        self.index.begin_build()
+        result = await db.execute(_document_rows())
+        self.index.apply_rows(result.all())
+        while queued := self.index.take_queued():
+            result = await db.execute(_document_rows().where(models.summary.Summary.id.in_(queued)))
+            self.index.apply_rows(result.all(), queued)
+
+    def refresh_summaries(self, db: Session, summary_ids) -> None:
+        """Re-index the given summaries after a write (no-op until the index is built)"""
+        summary_ids = [i for i in set(summary_ids) if i is not None]
+        if not summary_ids or self.index.queue(summary_ids) or not self.index.built:
+            return
+        rows = db.execute(_document_rows().where(models.summary.Summary.id.in_(summary_ids))).all()
+        self.index.apply_rows(rows, summary_ids)
+
+    def _tracking(self) -> bool:
+        return self.index.built or self.index.queue(())
+
+    def summary_ids_for_book(self, db: Session, book_id: int) -> list[int]:
+        if not self._tracking():
+            return []
+        return list(db.scalars(
+            select(models.summary.Summary.id).where(models.summary.Summary.book_id == book_id)
+        ))
+
+    def summary_ids_for_author(self, db: Session, author_id: int) -> list[int]:
+        if not self._tracking():
+            return []
+        return list(db.scalars(
+            select(models.summary.Summary.id)
+            .join(models.book.Book, models.summary.Summary.book_id == models.book.Book.id)
+            .where(models.book.Book.author_id == author_id)
+        ))
+
+
+search_service = SearchService()
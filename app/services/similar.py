@@ -0,0 +1,423 @@
+"""Content-based "similar summaries" index.
+
+Every summary becomes one L2-normalised TF-IDF vector built from its title
+(weighted) and the titles and text of its content sections, tokenised with
+the same diacritic folding as search. Terms are feature-hashed (signed) into
+SIMILAR_INDEX_DIM buckets so there is no vocabulary to keep in memory; IDF
+comes from a hashed document-frequency table fixed at build time.
+
+The index lives in SIMILAR_INDEX_DIR as plain files: a float32 row matrix,
+the summary id of every row, a fingerprint per row and the DF table, plus a
+meta.json naming the current generation. API processes memory-map the
+files at startup (the OS page cache is shared between workers) and remap
+when meta.json changes. A query is one matrix-vector product over the
+mapped rows followed by argpartition.
+
+Section text has no write endpoints, so updates are fingerprint driven:
+update() compares (title, section count, latest timestamp, version sum) per
+summary with the stored fingerprints in one GROUP BY query and re-vectorises
+only the summaries that changed. The summary write handlers call
+refresh_summaries() directly; it skips (and remembers the ids) instead of
+waiting while a CLI build/update holds the advisory write lock. A full
+rebuild refreshes the IDF weights.
+"""
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import SIMILAR_INDEX_DIM, SIMILAR_INDEX_DIR
+from app.services.search import tokenize
+
+Summary = models.summary.Summary
+ContentSection = models.content_section.ContentSection
+
+DF_BUCKETS = 1 << 20
+TITLE_WEIGHT = 3
+CHUNK = 500
+
+
+if os.name == "nt":
+    import msvcrt
+
+    def _lock_file(fh, blocking: bool) -> bool:
+        fh.seek(0)
+        while True:
+            try:
+                msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if not blocking:
+                    return False
+                time.sleep(0.05)
+
+    def _unlock_file(fh) -> None:
+        fh.seek(0)
+        msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+else:
+    import fcntl
+
+    def _lock_file(fh, blocking: bool) -> bool:
+        try:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            return True
+        except BlockingIOError:
+            return False
+
+    def _unlock_file(fh) -> None:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+def _chunks(ids, size: int = CHUNK):
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def _fingerprint(row) -> int:
+    return int.from_bytes(hashlib.blake2b(repr(tuple(row)).encode(), digest_size=8).digest(), "little", signed=True)
+
+
+def _fingerprint_rows(summary_ids=None):
+    # Một dòng mỗi summary; đổi title hoặc thêm/sửa/xoá section đều làm đổi fingerprint
+    stmt = (
+        select(
+            Summary.id,
+            Summary.title,
+            func.count(ContentSection.section_id),
+            func.max(func.coalesce(ContentSection.updated_at, ContentSection.created_at)),
+            func.coalesce(func.sum(ContentSection.version), 0),
+            func.coalesce(func.sum(ContentSection.section_id), 0),
+        )
+        .outerjoin(ContentSection, ContentSection.summary_id == Summary.id)
+        .group_by(Summary.id, Summary.title)
+    )
+    if summary_ids is not None:
+        stmt = stmt.where(Summary.id.in_(summary_ids))
+    return stmt
+
+
+def fingerprints(db: Session, summary_ids=None) -> dict[int, int]:
+    if summary_ids is None:
+        rows = db.execute(_fingerprint_rows()).all()
+    else:
+        rows = [row for chunk in _chunks(summary_ids) for row in db.execute(_fingerprint_rows(chunk)).all()]
+    return {row[0]: _fingerprint(row[1:]) for row in rows}
+
+
+def _term_counts(db: Session, summary_ids: list[int]) -> dict[int, Counter]:
+    """Folded term counts per summary: title x TITLE_WEIGHT + section titles and text"""
+    counts = {
+        summary_id: Counter({term: n * TITLE_WEIGHT for term, n in Counter(tokenize(title)).items()})
+        for summary_id, title in db.execute(select(Summary.id, Summary.title).where(Summary.id.in_(summary_ids)))
+    }
+    sections = db.execute(
+        select(ContentSection.summary_id, ContentSection.title, ContentSection.content)
+        .where(ContentSection.summary_id.in_(summary_ids))
+    )
+    for summary_id, title, content in sections:
+        terms = counts.get(summary_id)
+        if terms is not None:
+            terms.update(tokenize(title))
+            terms.update(tokenize(content))
+    return counts
+
+
+def _hashes(terms) -> np.ndarray:
+    return np.fromiter((zlib.crc32(term.encode()) for term in terms), dtype=np.uint32, count=len(terms))
+
+
+def vectorize(terms: Counter, df: np.ndarray, documents: int, dim: int) -> np.ndarray:
+    """Signed feature-hashed TF-IDF vector, L2-normalised (all zeros for an empty text)"""
+    vector = np.zeros(dim, dtype=np.float32)
+    if not terms:
+        return vector
+    hashes = _hashes(terms.keys())
+    tf = 1.0 + np.log(np.fromiter(terms.values(), dtype=np.float32, count=len(terms)))
+    idf = np.log((1.0 + documents) / (1.0 + df[hashes % DF_BUCKETS])) + 1.0
+    signs = np.where(hashes & 1, -1.0, 1.0).astype(np.float32)
+    np.add.at(vector, (hashes >> 1) % dim, signs * tf * idf.astype(np.float32))
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+class SimilarIndex:
+    """Memory-mapped summary vectors; one instance per process"""
+
+    def __init__(self, directory: str, dim: int = SIMILAR_INDEX_DIM) -> None:
+        self.directory = directory
+        self.dim = dim
+        self.meta: dict | None = None
+        self.vectors: np.ndarray | None = None
+        self.ids: np.ndarray | None = None
+        self.stamps: np.ndarray | None = None
+        self.df: np.ndarray | None = None
+        self._meta_mtime = None
+        self._pending: set[int] = set()  # id chưa refresh được vì lock đang bận
+        self._pending_lock = threading.Lock()
+
+    # --- files -------------------------------------------------------------
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _files(self, generation: int) -> dict[str, str]:
+        return {
+            "vectors": self._path(f"vectors.{generation}.f32"),
+            "ids": self._path(f"ids.{generation}.i64"),
+            "stamps": self._path(f"stamps.{generation}.i64"),
+            "df": self._path(f"df.{generation}.i32"),
+        }
+
+    @contextmanager
+    def _write_lock(self, blocking: bool = True):
+        # Advisory lock (flock/msvcrt) giữ suốt lần ghi: OS tự nhả khi process chết,
+        # nên không cần đoán lock "stale" theo mtime; file lock không bao giờ bị xoá
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path("write.lock"), "a+b") as fh:
+            acquired = _lock_file(fh, blocking)
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    _unlock_file(fh)
+
+    def _open(self, meta: dict, mode: str = "r") -> None:
+        files = self._files(meta["generation"])
+        capacity, dim = meta["capacity"], meta["dim"]
+        self.vectors = np.memmap(files["vectors"], dtype=np.float32, mode=mode, shape=(capacity, dim))
+        self.ids = np.memmap(files["ids"], dtype=np.int64, mode=mode, shape=(capacity,))
+        self.stamps = np.memmap(files["stamps"], dtype=np.int64, mode=mode, shape=(capacity,))
+        self.df = np.memmap(files["df"], dtype=np.int32, mode=mode, shape=(DF_BUCKETS,))
+        self.meta = meta
+
+    def _write_meta(self, meta: dict) -> None:
+        meta = {**meta, "updated_at": datetime.now(timezone.utc).isoformat()}
+        tmp = self._path("meta.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(meta, fh)
+        os.replace(tmp, self._path("meta.json"))
+        self.meta = meta
+        self._meta_mtime = os.stat(self._path("meta.json")).st_mtime_ns
+
+    def _drop_old_generations(self, keep: int) -> None:
+        # Best effort: trên Windows file đang được process khác map sẽ không xoá được
+        for name in os.listdir(self.directory):
+            parts = name.split(".")
+            if len(parts) == 3 and parts[1].isdigit() and int(parts[1]) != keep:
+                try:
+                    os.remove(self._path(name))
+                except OSError:
+                    pass
+
+    def load(self) -> bool:
+        """Map the current generation (read-only); False when no index has been built"""
+        try:
+            stat = os.stat(self._path("meta.json"))
+        except FileNotFoundError:
+            return False
+        if stat.st_mtime_ns == self._meta_mtime:
+            return True
+        with open(self._path("meta.json"), encoding="utf-8") as fh:
+            meta = json.load(fh)
+        self._open(meta)
+        self._meta_mtime = stat.st_mtime_ns
+        return True
+
+    @property
+    def ready(self) -> bool:
+        return self.meta is not None
+
+    # --- query -------------------------------------------------------------
+
+    def similar(self, summary_id: int, k: int) -> list[tuple[int, float]] | None:
+        """Top-k (summary_id, cosine) neighbours; None if summary_id is not indexed"""
+        if not self.load():
+            return None
+        rows = self.meta["rows"]
+        ids = self.ids[:rows]
+        hit = np.flatnonzero(ids == summary_id)
+        if not len(hit):
+            return None
+        scores = np.asarray(self.vectors[:rows] @ self.vectors[hit[0]])
+        scores[hit[0]] = -np.inf
+        scores[ids <= 0] = -np.inf
+        k = min(k, rows - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(ids[row]), float(scores[row])) for row in top if scores[row] > 0]
+
+    # --- build / update ----------------------------------------------------
+
+    def build(self, db: Session) -> dict:
+        """Full rebuild into a new generation: DF pass, then vector pass"""
+        started = time.perf_counter()
+        stamps = fingerprints(db)
+        summary_ids = sorted(stamps)
+        df = np.zeros(DF_BUCKETS, dtype=np.int32)
+        for chunk in _chunks(summary_ids):
+            for terms in _term_counts(db, chunk).values():
+                if terms:
+                    df[np.unique(_hashes(terms.keys()) % DF_BUCKETS)] += 1
+
+        with self._write_lock():
+            generation = (self.meta or {}).get("generation", 0) + 1
+            if os.path.exists(self._path("meta.json")):
+                with open(self._path("meta.json"), encoding="utf-8") as fh:
+                    generation = max(generation, json.load(fh)["generation"] + 1)
+            capacity = max(1024, math.ceil(len(summary_ids) * 1.25))
+            meta = {"generation": generation, "dim": self.dim, "capacity": capacity,
+                    "rows": 0, "documents": len(summary_ids)}
+            files = self._files(generation)
+            np.memmap(files["vectors"], dtype=np.float32, mode="w+", shape=(capacity, self.dim)).flush()
+            for name in ("ids", "stamps"):
+                np.memmap(files[name], dtype=np.int64, mode="w+", shape=(capacity,)).flush()
+            np.memmap(files["df"], dtype=np.int32, mode="w+", shape=(DF_BUCKETS,))[:] = df
+            self._open(meta, mode="r+")
+            row = 0
+            for chunk in _chunks(summary_ids):
+                counts = _term_counts(db, chunk)
+                for summary_id in chunk:
+                    self.vectors[row] = vectorize(counts.get(summary_id, Counter()), df, len(summary_ids), self.dim)
+                    self.ids[row] = summary_id
+                    self.stamps[row] = stamps[summary_id]
+                    row += 1
+            meta["rows"] = row
+            self._flush()
+            self._write_meta(meta)
+            self._drop_old_generations(generation)
+        self._reload()
+        return {"summaries": row, "dim": self.dim, "seconds": round(time.perf_counter() - started, 2)}
+
+    def _flush(self) -> None:
+        for array in (self.vectors, self.ids, self.stamps, self.df):
+            array.flush()
+
+    def _grow(self, needed: int) -> None:
+        # Sang generation mới với capacity lớn hơn; reader remap khi thấy meta.json đổi
+        meta = dict(self.meta)
+        old = {"vectors": self.vectors, "ids": self.ids, "stamps": self.stamps, "df": self.df}
+        meta["generation"] += 1
+        meta["capacity"] = max(needed, math.ceil(meta["capacity"] * 1.5))
+        files = self._files(meta["generation"])
+        rows = meta["rows"]
+        vectors = np.memmap(files["vectors"], dtype=np.float32, mode="w+", shape=(meta["capacity"], meta["dim"]))
+        vectors[:rows] = old["vectors"][:rows]
+        vectors.flush()
+        for name in ("ids", "stamps"):
+            array = np.memmap(files[name], dtype=np.int64, mode="w+", shape=(meta["capacity"],))
+            array[:rows] = old[name][:rows]
+            array.flush()
+        np.memmap(files["df"], dtype=np.int32, mode="w+", shape=(DF_BUCKETS,))[:] = old["df"]
+        self._open(meta, mode="r+")
+        self._write_meta(meta)
+        self._drop_old_generations(meta["generation"])
+
+    def _apply(self, db: Session, current: dict[int, int], removed: set[int]) -> dict:
+        """Re-vectorise summaries whose fingerprint differs and blank removed rows (lock held)"""
+        rows = self.meta["rows"]
+        row_of = {int(summary_id): row for row, summary_id in enumerate(self.ids[:rows]) if summary_id > 0}
+        changed = [i for i, stamp in current.items() if row_of.get(i) is None or self.stamps[row_of[i]] != stamp]
+        free = [row for row in range(rows) if self.ids[row] <= 0]
+        for summary_id in removed:
+            row = row_of.pop(summary_id, None)
+            if row is not None:
+                self.vectors[row] = 0
+                self.ids[row] = 0
+                self.stamps[row] = 0
+                free.append(row)
+        new = sum(1 for i in changed if i not in row_of)
+        if rows + max(0, new - len(free)) > self.meta["capacity"]:
+            self._grow(rows + new - len(free))
+        for chunk in _chunks(changed):
+            counts = _term_counts(db, chunk)
+            for summary_id in chunk:
+                row = row_of.get(summary_id)
+                if row is None:
+                    row = free.pop() if free else rows
+                    rows = max(rows, row + 1)
+                self.vectors[row] = vectorize(
+                    counts.get(summary_id, Counter()), self.df, self.meta["documents"], self.meta["dim"]
+                )
+                self.ids[row] = summary_id
+                self.stamps[row] = current[summary_id]
+        if changed or removed:
+            self._flush()
+            self._write_meta({**self.meta, "rows": rows})
+        return {"changed": len(changed), "removed": len(removed)}
+
+    def _reload(self) -> bool:
+        self._meta_mtime = None
+        return self.load()
+
+    def update(self, db: Session) -> dict:
+        """Bring the index in line with the database, touching only changed summaries"""
+        if not self.load():
+            return self.build(db)
+        started = time.perf_counter()
+        with self._write_lock():
+            self._reload()
+            self._open(self.meta, mode="r+")
+            current = fingerprints(db)
+            indexed = {int(i) for i in self.ids[:self.meta["rows"]] if i > 0}
+            stats = self._apply(db, current, indexed - current.keys())
+        self._reload()
+        return {**stats, "seconds": round(time.perf_counter() - started, 2)}
+
+    def refresh_summaries(self, db: Session, summary_ids) -> None:
+        """Re-index the given summaries after a write (no-op until the index is built)
+
+        Never waits for the write lock: while a build/update holds it the ids
+        are kept and retried with the next refresh (or picked up by --update).
+        """
+        summary_ids = {i for i in summary_ids if i is not None}
+        if not summary_ids or not self.load():
+            return
+        with self._write_lock(blocking=False) as acquired:
+            with self._pending_lock:
+                if not acquired:
+                    self._pending.update(summary_ids)
+                    return
+                summary_ids |= self._pending
+                self._pending = set()
+            self._reload()
+            self._open(self.meta, mode="r+")
+            current = fingerprints(db, summary_ids)
+            self._apply(db, current, summary_ids - current.keys())
+        self._reload()
+
+similar_index = SimilarIndex(SIMILAR_INDEX_DIR)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from app.database import SessionLocal
+    from app.main import _import_all_models
+
+    _import_all_models()
+
+    parser = argparse.ArgumentParser(description="Build or update the similar-summaries index")
+    parser.add_argument("--update", action="store_true", help="only re-vectorise summaries whose content changed")
+    parser.add_argument("--watch", type=float, default=0, help="with --update: repeat every N seconds")
+    args = parser.parse_args()
+
+    while True:
+        with SessionLocal() as session:
+            print(similar_index.update(session) if args.update else similar_index.build(session))
+        if not (args.update and args.watch):
+            break
+        time.sleep(args.watch)
@@ -0,0 +1,124 @@
+"""SM-2 spaced-repetition scheduling for vocabulary flashcards.
+
+Each review is graded 0-5 (5 = perfect recall, < 3 = forgotten). A correct
+answer grows the interval 1 day -> 6 days -> interval * ease; a lapse
+resets the streak and shows the card again tomorrow. Ease moves by the
+SM-2 formula and never drops below MIN_EASE. The next review time is
+stored in due_at so the due queue is a range scan on (user_id, due_at).
+due_at is naive UTC computed in Python (utcnow) both when a card is created
+and when it is rescheduled, never the database clock, whose CURRENT_TIMESTAMP
+follows the session time zone on MySQL.
+
+Batch reviews lock the user's cards with one IN query, replay the grades
+in order in memory and write every card back with one executemany UPDATE,
+all in one transaction.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.models.vocabulary import VocabularyFlashcard as Flashcard, utcnow
+
+MIN_EASE = 1.3
+PASSING_GRADE = 3
+
+
+@dataclass(frozen=True)
+class Schedule:
+    ease: float
+    interval_days: int
+    repetitions: int
+    due_at: datetime
+
+
+def schedule(ease: float, interval_days: int, repetitions: int, grade: int, now: datetime) -> Schedule:
+    """Next SM-2 state after one review graded 0-5"""
+    if grade >= PASSING_GRADE:
+        if repetitions == 0:
+            interval_days = 1
+        elif repetitions == 1:
+            interval_days = 6
+        else:
+            interval_days = max(1, round(interval_days * ease))
+        repetitions += 1
+    else:
+        repetitions = 0
+        interval_days = 1
+    miss = 5 - grade
+    ease = max(MIN_EASE, ease + 0.1 - miss * (0.08 + miss * 0.02))
+    return Schedule(ease, interval_days, repetitions, now + timedelta(days=interval_days))
+
+
+def due_statement(user_id: int, limit: int, now: datetime):
+    # Range scan trên ix_vocabulary_flashcards_user_due, đã đúng thứ tự nên không cần sort
+    return (
+        select(Flashcard)
+        .where(Flashcard.user_id == user_id, Flashcard.due_at <= now)
+        .order_by(Flashcard.due_at, Flashcard.flashcard_id)
+        .limit(limit)
+    )
+
+
+def due_cards(db: Session, user_id: int, limit: int, now: datetime | None = None) -> list[Flashcard]:
+    """The user's next due cards, oldest due first"""
+    return db.execute(due_statement(user_id, limit, now or utcnow())).scalars().all()
+
+
+def submit_reviews(db: Session, user_id: int, reviews) -> list[dict]:
+    """Apply graded reviews (in order) to the user's cards and commit; 404 lists unknown cards"""
+    now = utcnow()
+    card_ids = sorted({review.flashcard_id for review in reviews})
+    try:
+        cards = {
+            card.flashcard_id: card
+            for card in db.execute(
+                select(Flashcard)
+                .where(Flashcard.flashcard_id.in_(card_ids), Flashcard.user_id == user_id)
+                .with_for_update()
+            ).scalars()
+        }
+        missing = [card_id for card_id in card_ids if card_id not in cards]
+        if missing:
+            raise HTTPException(status_code=404, detail={"message": "Flashcard not found", "flashcard_ids": missing})
+
+        rows: dict[int, dict] = {}
+        for review in reviews:
+            card = cards[review.flashcard_id]
+            state = rows.get(card.flashcard_id) or {
+                "flashcard_id": card.flashcard_id,
+                "ease": card.ease,
+                "interval_days": card.interval_days,
+                "repetitions": card.repetitions,
+                "review_count": card.review_count or 0,
+            }
+            nxt = schedule(state["ease"], state["interval_days"], state["repetitions"], review.grade, now)
+            rows[card.flashcard_id] = {
+                **state,
+                "ease": nxt.ease,
+                "interval_days": nxt.interval_days,
+                "repetitions": nxt.repetitions,
+                "due_at": nxt.due_at,
+                "review_count": state["review_count"] + 1,
+                "last_reviewed": now,
+            }
+        result = [
+            {
+                "flashcard_id": card.flashcard_id,
+                "user_id": card.user_id,
+                "word": card.word,
+                "meaning": card.meaning,
+                "created_at": card.created_at,
+                **rows[card.flashcard_id],
+            }
+            for card in (cards[card_id] for card_id in card_ids)
+        ]
+        # ORM bulk UPDATE theo khoá chính: một executemany cho cả batch
+        db.execute(update(Flashcard), list(rows.values()))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return result
@@ -0,0 +1,135 @@
+"""
+Benchmark: sync (threadpool) vs async (AsyncSession) read endpoints.
+Run: python benchmarks/async_vs_sync.py --clients 500 --requests 20
+
+Mặc định chạy in-process trên SQLite (aiosqlite). Để đo với MySQL thật, đặt
+DATABASE_URL trước khi chạy và seed dữ liệu bằng seed_data.py.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+_DB_FILE = os.path.join(tempfile.gettempdir(), "bench_async_vs_sync.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_FILE}")
+
+import httpx  # noqa: E402
+from fastapi import APIRouter, Depends, Query  # noqa: E402
+from sqlalchemy import asc  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.database import Base, SessionLocal, engine, get_db  # noqa: E402
+from app import models  # noqa: E402
+from app.schemas import content_section as section_schema  # noqa: E402
+
+# Bản sync của /sections/by-summary (như trước khi chuyển sang async) để so sánh
+sync_router = APIRouter(prefix="/bench-sync")
+
+
+@sync_router.get("/sections/by-summary/{summary_id}", response_model=list[section_schema.SectionResponse])
+def list_sections_by_summary_sync(
+    summary_id: int,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+):
+    q = (
+        db.query(models.content_section.ContentSection)
+        .filter(models.content_section.ContentSection.summary_id == summary_id)
+        .order_by(asc(models.content_section.ContentSection.section_order))
+    )
+    return q.offset((page - 1) * page_size).limit(page_size).all()
+
+
+app.include_router(sync_router)
+
+
+def seed(summaries: int, sections_per_summary: int) -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        db.add_all(models.summary.Summary(title=f"Summary {i}", status="approved") for i in range(summaries))
+        db.commit()
+        db.add_all(
+            models.content_section.ContentSection(
+                summary_id=s + 1,
+                section_order=o,
+                title=f"Section {o}",
+                content="Lorem ipsum " * 200,
+            )
+            for s in range(summaries)
+            for o in range(sections_per_summary)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+async def run_mode(client: httpx.AsyncClient, path: str, clients: int, requests: int, summaries: int):
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker(n: int):
+        nonlocal errors
+        for i in range(requests):
+            url = path.format(summary_id=(n + i) % summaries + 1)
+            start = time.perf_counter()
+            try:
+                resp = await client.get(url)
+                ok = resp.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(clients)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "elapsed_s": elapsed,
+        "errors": errors,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=20, help="requests per client")
+    parser.add_argument("--summaries", type=int, default=50)
+    parser.add_argument("--sections", type=int, default=20)
+    parser.add_argument("--base-url", default=None, help="benchmark a running server instead of in-process")
+    args = parser.parse_args()
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+    else:
+        seed(args.summaries, args.sections)
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app, raise_app_exceptions=False), base_url="http://bench", timeout=60)
+
+    modes = {
+        "sync": "/bench-sync/sections/by-summary/{summary_id}",
+        "async": "/sections/by-summary/{summary_id}",
+    }
+    async with client:
+        for name, path in modes.items():
+            await client.get(path.format(summary_id=1))  # warm up
+            stats = await run_mode(client, path, args.clients, args.requests, args.summaries)
+            print(
+                f"[{name:5}] clients={args.clients} rps={stats['rps']:.0f} "
+                f"p50={stats['p50_ms']:.1f}ms p95={stats['p95_ms']:.1f}ms total={stats['elapsed_s']:.1f}s errors={stats['errors']}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
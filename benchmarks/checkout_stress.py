@@ -0,0 +1,132 @@
+"""
+Stress test: many buyers checking out carts that compete for the same scarce books.
+Run: python benchmarks/checkout_stress.py --buyers 200 --books 5 --stock 40 --concurrency 8
+
+Mỗi buyer có giỏ hàng ngẫu nhiên trên vài đầu sách ít tồn kho và tất cả cùng gọi
+POST /orders/checkout đồng thời. Sau đó kiểm tra: không có sách nào bị bán quá
+tồn kho, stock đã trừ đúng bằng tổng order_details, tổng tiền khớp giá sách.
+Exit 1 nếu phát hiện oversell hoặc dữ liệu lệch.
+
+--concurrency giới hạn số request đang chạy cùng lúc. Principal được load trên
+session của request nên mỗi request giữ đúng 1 connection; concurrency vượt
+DB_POOL_SIZE + DB_MAX_OVERFLOW chỉ phải chờ pool chứ không deadlock.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from decimal import Decimal
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+_DB_FILE = os.path.join(tempfile.gettempdir(), "bench_checkout_stress.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_FILE}")
+
+import httpx  # noqa: E402
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app import models  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+
+Book = models.book.Book
+OrderDetail = models.order_detail.OrderDetail
+Order = models.order.Order
+
+
+def seed(buyers: int, books: int, stock: int, seed_value: int = 11) -> dict[int, int]:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(seed_value)
+    with engine.begin() as conn:
+        conn.execute(insert(Book), [
+            {"id": b, "title": f"Book {b}", "price": Decimal("9.90") + b, "stock_quantity": stock}
+            for b in range(1, books + 1)
+        ])
+        conn.execute(insert(models.user.User), [
+            {"id": u, "username": f"buyer{u}", "email": f"buyer{u}@example.com", "password_hash": "x"}
+            for u in range(1, buyers + 1)
+        ])
+        conn.execute(insert(models.cart.Cart), [{"id": u, "user_id": u} for u in range(1, buyers + 1)])
+        items = []
+        for u in range(1, buyers + 1):
+            # Thứ tự sách trong giỏ ngẫu nhiên để thử deadlock khi khóa
+            for b in rng.sample(range(1, books + 1), rng.randint(1, min(3, books))):
+                items.append({"cart_id": u, "book_id": b, "quantity": rng.randint(1, 3), "price": Decimal("0.01")})
+        conn.execute(insert(models.cart_item.CartItem), items)
+    return {b: stock for b in range(1, books + 1)}
+
+
+async def run(buyers: int, concurrency: int) -> Counter:
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    statuses: Counter = Counter()
+    gate = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        async def buy(user_id: int):
+            headers = {"Authorization": f"Bearer {create_access_token(subject=user_id)}"}
+            async with gate:
+                resp = await client.post("/orders/checkout", json={"address": "somewhere"}, headers=headers)
+            statuses[resp.status_code] += 1
+
+        await asyncio.gather(*(buy(u) for u in range(1, buyers + 1)))
+    return statuses
+
+
+def verify(initial: dict[int, int], statuses: Counter) -> list[str]:
+    problems = []
+    db = SessionLocal()
+    try:
+        sold = dict(db.execute(
+            select(OrderDetail.book_id, func.sum(OrderDetail.quantity)).group_by(OrderDetail.book_id)
+        ).all())
+        for book in db.execute(select(Book).order_by(Book.id)).scalars():
+            units = sold.get(book.id, 0)
+            if units > initial[book.id]:
+                problems.append(f"book {book.id}: oversold {units} > stock {initial[book.id]}")
+            if book.stock_quantity != initial[book.id] - units:
+                problems.append(f"book {book.id}: stock {book.stock_quantity} != {initial[book.id]} - {units}")
+        orders = db.execute(select(Order)).scalars().all()
+        if len(orders) != statuses[201]:
+            problems.append(f"{len(orders)} orders but {statuses[201]} successful checkouts")
+        for order in orders:
+            expected = sum(d.price * d.quantity for d in order.order_details)
+            if order.total_amount != expected:
+                problems.append(f"order {order.id}: total {order.total_amount} != {expected}")
+    finally:
+        db.close()
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--buyers", type=int, default=200)
+    parser.add_argument("--books", type=int, default=5)
+    parser.add_argument("--stock", type=int, default=40, help="initial stock per book")
+    parser.add_argument("--concurrency", type=int, default=8, help="checkouts in flight at once")
+    args = parser.parse_args()
+
+    initial = seed(args.buyers, args.books, args.stock)
+    start = time.perf_counter()
+    statuses = asyncio.run(run(args.buyers, args.concurrency))
+    elapsed = time.perf_counter() - start
+    print(f"buyers={args.buyers} books={args.books} stock={args.stock} concurrency={args.concurrency} elapsed={elapsed:.2f}s "
+          f"statuses={dict(sorted(statuses.items()))}")
+
+    problems = verify(initial, statuses)
+    unexpected = set(statuses) - {201, 409}
+    if unexpected:
+        problems.append(f"unexpected statuses: {sorted(unexpected)}")
+    for problem in problems:
+        print("FAIL", problem)
+    if problems:
+        sys.exit(1)
+    print("OK: no overselling, stock and order totals consistent")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark: comment thread loading, lazy `replies` traversal vs recursive CTE endpoint.
+Run: python benchmarks/comment_tree.py --comments 10000 --roots 100
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+_DB_FILE = os.path.join(tempfile.gettempdir(), "bench_comment_tree.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_FILE}")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event, insert, select  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.database import Base, SessionLocal, engine, get_async_engine  # noqa: E402
+from app import models  # noqa: E402
+
+Comment = models.comment.Comment
+
+
+def seed(comments: int, roots: int, seed_value: int = 7) -> None:
+    """One summary; `roots` threads, each reply attached to a random earlier comment of its thread"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(seed_value)
+    with engine.begin() as conn:
+        conn.execute(insert(models.user.User), [{"username": "u", "email": "u@example.com", "password_hash": "x"}])
+        conn.execute(insert(models.summary.Summary), [{"title": "Thread", "status": "approved"}])
+        threads: list[list[int]] = []
+        rows = []
+        for comment_id in range(1, comments + 1):
+            if comment_id <= roots:
+                parent = None
+                threads.append([comment_id])
+            else:
+                thread = threads[rng.randrange(roots)]
+                parent = rng.choice(thread[-20:])  # thiên về reply gần đây -> cây sâu
+                thread.append(comment_id)
+            rows.append({"id": comment_id, "summary_id": 1, "user_id": 1, "content": f"comment {comment_id}",
+                         "parent_comment_id": parent})
+        conn.execute(insert(Comment), rows)
+
+
+def count_queries():
+    counter = {"n": 0}
+
+    def before(*_args):
+        counter["n"] += 1
+
+    # Endpoint chạy trên async engine, bản lazy trên engine sync: đếm cả hai
+    engines = [engine, get_async_engine().sync_engine]
+    for target in engines:
+        event.listen(target, "before_cursor_execute", before)
+
+    def stop():
+        for target in engines:
+            event.remove(target, "before_cursor_execute", before)
+
+    return counter, stop
+
+
+def lazy_tree(max_depth: int):
+    """What rendering via Comment.replies does: one lazy load per node"""
+    def walk(comment, depth):
+        node = {"id": comment.id, "content": comment.content, "replies": []}
+        if depth < max_depth:
+            node["replies"] = [walk(reply, depth + 1) for reply in comment.replies]
+        return node
+
+    with SessionLocal() as db:
+        roots = db.scalars(
+            select(Comment).where(Comment.summary_id == 1, Comment.parent_comment_id.is_(None)).order_by(Comment.id.desc())
+        ).all()
+        return [walk(root, 0) for root in roots]
+
+
+def count_nodes(nodes) -> int:
+    return sum(1 + count_nodes(node["replies"]) for node in nodes)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--comments", type=int, default=10_000)
+    parser.add_argument("--roots", type=int, default=100)
+    parser.add_argument("--depth", type=int, default=50)
+    args = parser.parse_args()
+
+    seed(args.comments, args.roots)
+    client = TestClient(app)
+
+    counter, stop = count_queries()
+    start = time.perf_counter()
+    tree = lazy_tree(args.depth)
+    lazy_ms = (time.perf_counter() - start) * 1000
+    lazy_queries, counter["n"] = counter["n"], 0
+    print(f"[lazy replies] nodes={count_nodes(tree)} queries={lazy_queries} time={lazy_ms:.0f}ms")
+
+    start = time.perf_counter()
+    resp = client.get("/summaries/1/comments/tree", params={"limit": args.roots, "depth": args.depth})
+    cte_ms = (time.perf_counter() - start) * 1000
+    stop()
+    print(f"[recursive CTE] nodes={count_nodes(resp.json())} queries={counter['n']} time={cte_ms:.0f}ms (incl. HTTP + serialization)")
+
+
+if __name__ == "__main__":
+    main()
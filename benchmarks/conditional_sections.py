@@ -0,0 +1,100 @@
+"""
+Benchmark: full GET vs conditional GET (If-None-Match -> 304) on /sections/by-summary.
+Run: python benchmarks/conditional_sections.py --sections 50 --requests 500
+
+Mô phỏng reader mở lại một summary đã có trong cache của client: so sánh số byte
+trả về và latency giữa request thường và request kèm ETag.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+_DB_FILE = os.path.join(tempfile.gettempdir(), "bench_conditional_sections.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_FILE}")
+
+import httpx  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app import models  # noqa: E402
+
+
+def seed(sections: int) -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        db.add(models.summary.Summary(title="Summary", status="approved"))
+        db.commit()
+        db.add_all(
+            models.content_section.ContentSection(
+                summary_id=1,
+                section_order=o,
+                title=f"Section {o}",
+                content="Lorem ipsum dolor sit amet " * 150,
+            )
+            for o in range(sections)
+        )
+        db.commit()
+
+
+async def run(client: httpx.AsyncClient, url: str, requests: int, headers: dict) -> dict:
+    latencies = []
+    received = 0
+    statuses = set()
+    for _ in range(requests):
+        start = time.perf_counter()
+        resp = await client.get(url, headers=headers)
+        latencies.append(time.perf_counter() - start)
+        received += len(resp.content)
+        statuses.add(resp.status_code)
+    latencies.sort()
+    return {
+        "status": sorted(statuses),
+        "bytes_per_request": received / requests,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sections", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--base-url", default=None, help="benchmark a running server instead of in-process")
+    parser.add_argument("--summary-id", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+    else:
+        seed(args.sections)
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+    url = f"/sections/by-summary/{args.summary_id}?limit=200"
+    async with client:
+        first = await client.get(url)
+        etag = first.headers["etag"]
+        modes = {
+            "full": {},
+            "if-none-match": {"If-None-Match": etag},
+            "if-modified-since": {"If-Modified-Since": first.headers["last-modified"]},
+        }
+        results = {name: await run(client, url, args.requests, headers) for name, headers in modes.items()}
+
+    full = results["full"]
+    for name, stats in results.items():
+        saved = 1 - stats["bytes_per_request"] / full["bytes_per_request"] if full["bytes_per_request"] else 0
+        print(
+            f"[{name:17}] status={stats['status']} bytes/req={stats['bytes_per_request']:.0f} "
+            f"({saved:.0%} saved) p50={stats['p50_ms']:.2f}ms p95={stats['p95_ms']:.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
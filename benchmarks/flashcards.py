@@ -0,0 +1,142 @@
+"""
+Benchmark: spaced-repetition due queue on 1 million flashcards.
+Run: python benchmarks/flashcards.py --users 10000 --cards-per-user 100 --batch 50
+
+Sinh 1 triệu thẻ với due_at rải từ 20 ngày trước tới 40 ngày sau, rồi đo:
+query due của một user với index (user_id, due_at) và khi tạm bỏ index,
+GET /flashcards/due (p50/p95) và POST /flashcards/reviews theo batch (latency,
+số câu SQL). Exit 1 nếu query due không dùng index, batch review tốn nhiều hơn
+2 câu SQL, hoặc thẻ vừa ôn vẫn còn nằm trong hàng đợi due.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+_DB_FILE = os.path.join(tempfile.gettempdir(), "bench_flashcards.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_FILE}")
+
+import numpy as np  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event, insert, text  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app import models  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.models.vocabulary import VocabularyFlashcard as Flashcard  # noqa: E402
+from app.services import spaced_repetition  # noqa: E402
+
+INDEX = "ix_vocabulary_flashcards_user_due"
+
+
+def seed(users: int, per_user: int, rng) -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    now = spaced_repetition.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(models.user.User), [
+            {"id": u, "username": f"u{u}", "email": f"u{u}@example.com", "password_hash": "x"}
+            for u in range(1, users + 1)
+        ])
+        for start in range(1, users + 1, 500):
+            user_ids = np.repeat(np.arange(start, min(start + 500, users + 1)), per_user)
+            offsets = rng.uniform(-20 * 86400, 40 * 86400, len(user_ids))
+            conn.execute(insert(Flashcard), [
+                {"user_id": int(u), "word": f"word{i}", "meaning": "meaning",
+                 "due_at": now + timedelta(seconds=float(offset)), "ease": 2.5, "interval_days": 0, "repetitions": 0}
+                for i, (u, offset) in enumerate(zip(user_ids, offsets))
+            ])
+
+
+def time_due_query(user_ids, limit: int) -> list[float]:
+    latencies = []
+    with SessionLocal() as db:
+        for user_id in user_ids:
+            start = time.perf_counter()
+            spaced_repetition.due_cards(db, int(user_id), limit)
+            latencies.append(time.perf_counter() - start)
+    return sorted(latencies)
+
+
+def fmt(latencies: list[float]) -> str:
+    return (f"p50={statistics.median(latencies) * 1000:.2f}ms "
+            f"p95={latencies[max(int(len(latencies) * 0.95) - 1, 0)] * 1000:.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--cards-per-user", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=50, help="reviews per POST /flashcards/reviews")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(4)
+    start = time.perf_counter()
+    seed(args.users, args.cards_per_user, rng)
+    print(f"seeded {args.users * args.cards_per_user:,} cards in {time.perf_counter() - start:.1f}s")
+
+    with SessionLocal() as db:
+        stmt = spaced_repetition.due_statement(1, args.limit, spaced_repetition.utcnow())
+        sql = str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+        plan = " | ".join(row[3] for row in db.connection().exec_driver_sql("EXPLAIN QUERY PLAN " + sql))
+    uses_index = INDEX in plan and "TEMP B-TREE" not in plan
+    print(f"plan: {plan}")
+
+    sample = rng.integers(1, args.users + 1, args.requests)
+    print(f"due query with index      {fmt(time_due_query(sample, args.limit))}")
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP INDEX {INDEX}"))
+    print(f"due query without index   {fmt(time_due_query(sample[:20], args.limit))}")
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE INDEX {INDEX} ON vocabulary_flashcards (user_id, due_at)"))
+
+    client = TestClient(app)
+    headers = {u: {"Authorization": f"Bearer {create_access_token(subject=int(u))}"} for u in set(sample.tolist())}
+    latencies = []
+    for user_id in sample:
+        client.get("/flashcards/due", headers=headers[user_id])  # nạp principal cache
+        started = time.perf_counter()
+        resp = client.get("/flashcards/due", params={"limit": args.limit}, headers=headers[user_id])
+        latencies.append(time.perf_counter() - started)
+        assert resp.status_code == 200, resp.text
+    print(f"GET /flashcards/due       {fmt(sorted(latencies))}")
+
+    counter = {"n": 0}
+
+    def before(*_args):
+        counter["n"] += 1
+
+    event.listen(engine, "before_cursor_execute", before)
+    latencies, statements, still_due = [], [], 0
+    for user_id in sample:
+        due = client.get("/flashcards/due", params={"limit": args.batch}, headers=headers[user_id]).json()
+        if not due:
+            continue
+        reviews = [{"flashcard_id": card["flashcard_id"], "grade": int(rng.integers(0, 6))} for card in due]
+        counter["n"] = 0
+        started = time.perf_counter()
+        resp = client.post("/flashcards/reviews", json={"reviews": reviews}, headers=headers[user_id])
+        latencies.append(time.perf_counter() - started)
+        statements.append(counter["n"])
+        assert resp.status_code == 200, resp.text
+        reviewed = {card["flashcard_id"] for card in due}
+        after = client.get("/flashcards/due", params={"limit": args.batch}, headers=headers[user_id]).json()
+        still_due += len(reviewed & {card["flashcard_id"] for card in after})
+    event.remove(engine, "before_cursor_execute", before)
+    print(f"POST /flashcards/reviews  {fmt(sorted(latencies))} ({args.batch} cards, "
+          f"max {max(statements)} SQL statements), reviewed cards still due: {still_due}")
+
+    failed = not uses_index or max(statements) > 2 or still_due
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Benchmark: incremental recommendation update vs full rebuild.
+Run: python benchmarks/incremental_recommendations.py --users 5000 --summaries 1000 --new-ratings 200
+
+Seed ratings, chạy refresh() một lần, ghi thêm rating mới qua POST /ratings/
+(router ghi interaction event), rồi so sánh incremental_update() với một lần
+refresh() đầy đủ: thời gian, số dòng recommendations bị ghi, và tỉ lệ user bị
+ảnh hưởng có top-N giống hệt bản rebuild. Event vừa ghi được xử lý ngay nên
+benchmark chạy với lag_seconds=0 (mặc định RECOMMENDER_EVENT_LAG).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+_DB_FILE = os.path.join(tempfile.gettempdir(), "bench_incremental_recommendations.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_FILE}")
+
+import numpy as np  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app import models  # noqa: E402
+from app.services import recommender  # noqa: E402
+
+Recommendation = models.recommendation.Recommendation
+
+
+def seed(users: int, summaries: int, per_user: int, rng) -> set[tuple[int, int]]:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    popularity = 1.0 / np.arange(1, summaries + 1) ** 0.8
+    popularity /= popularity.sum()
+    pairs = set()
+    for user_id in range(1, users + 1):
+        for summary_id in rng.choice(summaries, size=min(per_user, summaries), replace=False, p=popularity) + 1:
+            pairs.add((user_id, int(summary_id)))
+    with engine.begin() as conn:
+        conn.execute(insert(models.user.User), [
+            {"id": u, "username": f"u{u}", "email": f"u{u}@example.com", "password_hash": "x"} for u in range(1, users + 1)
+        ])
+        conn.execute(insert(models.summary.Summary), [
+            {"id": s, "title": f"Summary {s}", "status": "approved"} for s in range(1, summaries + 1)
+        ])
+        conn.execute(insert(models.rating.Rating), [
+            {"user_id": u, "summary_id": s, "score": float(rng.integers(1, 6))} for u, s in sorted(pairs)
+        ])
+    return pairs
+
+
+def snapshot(user_ids) -> dict[int, list[int]]:
+    with SessionLocal() as db:
+        rows = db.execute(
+            select(Recommendation.user_id, Recommendation.recommended_summary_id)
+            .where(Recommendation.user_id.in_(list(user_ids)), Recommendation.algorithm_type == recommender.ALGORITHM)
+            .order_by(Recommendation.user_id, Recommendation.score.desc())
+        ).all()
+    result: dict[int, list[int]] = {user_id: [] for user_id in user_ids}
+    for user_id, summary_id in rows:
+        result[user_id].append(summary_id)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--summaries", type=int, default=1000)
+    parser.add_argument("--per-user", type=int, default=15)
+    parser.add_argument("--new-ratings", type=int, default=200)
+    parser.add_argument("--top-n", type=int, default=20)
+    parser.add_argument("--neighbors", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(3)
+    pairs = seed(args.users, args.summaries, args.per_user, rng)
+    with SessionLocal() as db:
+        print("initial refresh     ", recommender.refresh(db, args.top_n, args.neighbors, lag_seconds=0))
+
+    client = TestClient(app)
+    touched_users = set()
+    while len(touched_users) < args.new_ratings:
+        user_id, summary_id = int(rng.integers(1, args.users + 1)), int(rng.integers(1, args.summaries + 1))
+        if (user_id, summary_id) in pairs:
+            continue
+        resp = client.post("/ratings/", json={"user_id": user_id, "summary_id": summary_id, "score": 5})
+        assert resp.status_code == 200, resp.text
+        pairs.add((user_id, summary_id))
+        touched_users.add(user_id)
+
+    with SessionLocal() as db:
+        start = time.perf_counter()
+        stats = recommender.incremental_update(db, args.top_n, args.neighbors, lag_seconds=0)
+        incremental_seconds = time.perf_counter() - start
+    print("incremental_update  ", stats)
+    incremental = snapshot(touched_users)
+
+    with SessionLocal() as db:
+        start = time.perf_counter()
+        full_stats = recommender.refresh(db, args.top_n, args.neighbors, lag_seconds=0)
+        full_seconds = time.perf_counter() - start
+    print("full refresh        ", full_stats)
+    rebuilt = snapshot(touched_users)
+
+    same = sum(incremental[u] == rebuilt[u] for u in touched_users)
+    overlap = np.mean([
+        len(set(incremental[u]) & set(rebuilt[u])) / max(len(rebuilt[u]), 1) for u in touched_users
+    ])
+    print(f"incremental {incremental_seconds:.2f}s vs full {full_seconds:.2f}s; "
+          f"rows touched {stats['inserted'] + stats['updated'] + stats['deleted']} vs {full_stats['rows_written']}")
+    print(f"rated users with identical top-{args.top_n}: {same}/{len(touched_users)}, mean overlap {overlap:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Index advisor: EXPLAIN the queries the routers issue and fail on full table scans.
+Run: python benchmarks/index_advisor.py                  # SQLite, seeded temp database
+     DATABASE_URL=mysql+pymysql://... python benchmarks/index_advisor.py --seed
+
+Mặc định seed một database SQLite tạm (đủ lớn để planner ưu tiên index), chạy
+ANALYZE rồi EXPLAIN từng câu query. Với MySQL, thêm --seed để chèn dữ liệu mẫu
+vào database trống (đã chạy alembic upgrade head). Exit code 1 nếu có full scan.
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+from decimal import Decimal
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+_DB_FILE = os.path.join(tempfile.gettempdir(), "bench_index_advisor.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_FILE}")
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from app.main import _import_all_models  # noqa: E402
+from app.database import Base, engine  # noqa: E402
+from app.core.pagination import Keyset, encode_cursor, keyset_statement  # noqa: E402
+from app.core.ownership import owned_select  # noqa: E402
+from app import models  # noqa: E402
+from app.services import spaced_repetition  # noqa: E402
+
+_import_all_models()
+
+Summary = models.summary.Summary
+ContentSection = models.content_section.ContentSection
+CartItem = models.cart_item.CartItem
+Order = models.order.Order
+OrderDetail = models.order_detail.OrderDetail
+Comment = models.comment.Comment
+ReadingHistory = models.reading_history.ReadingHistory
+Rating = models.rating.Rating
+NoteHighlight = models.note.NoteHighlight
+Flashcard = models.vocabulary.VocabularyFlashcard
+
+SUMMARY_KEY = Keyset(Summary.id, descending=True)
+SECTION_KEY = Keyset(ContentSection.section_id, sort=ContentSection.section_order)
+
+
+def seed(scale: int) -> None:
+    users, books, summaries = 20 * scale, 20 * scale, 50 * scale
+    rows = {
+        models.user_role.UserRole: [{"role_name": "writer"}],
+        models.user.User: [
+            {"username": f"user{i}", "email": f"user{i}@example.com", "password_hash": "x", "role_id": 1}
+            for i in range(users)
+        ],
+        models.book.Book: [{"title": f"Book {i}", "price": Decimal("10.00")} for i in range(books)],
+        Summary: [
+            {"title": f"Summary {i}", "user_id": i % users + 1, "book_id": i % books + 1,
+             "status": ("approved", "editing", "rejected", "waiting_for_approval")[i % 4]}
+            for i in range(summaries)
+        ],
+        ContentSection: [
+            {"summary_id": i % summaries + 1, "section_order": i // summaries, "title": f"S{i}", "content": "..."}
+            for i in range(summaries * 4)
+        ],
+        models.cart.Cart: [{"user_id": i + 1} for i in range(users)],
+        CartItem: [
+            {"cart_id": i % users + 1, "book_id": i // users + 1, "quantity": 1, "price": Decimal("10.00")}
+            for i in range(users * 5)
+        ],
+        Order: [{"user_id": i % users + 1, "total_amount": Decimal("10.00")} for i in range(users * 10)],
+        OrderDetail: [
+            {"order_id": i % (users * 10) + 1, "book_id": i % books + 1, "quantity": 1, "price": Decimal("10.00")}
+            for i in range(users * 30)
+        ],
+        Comment: [
+            {"summary_id": i % summaries + 1, "user_id": i % users + 1, "content": "c", "path": f"{i + 1:010d}/"}
+            for i in range(summaries * 2)
+        ],
+        ReadingHistory: [{"user_id": i % users + 1, "summary_id": i // users + 1} for i in range(summaries)],
+        Rating: [{"user_id": i % users + 1, "summary_id": i // users + 1, "score": i % 5 + 1} for i in range(summaries)],
+        NoteHighlight: [{"user_id": i % users + 1, "summary_id": i // users + 1, "note_content": "n"} for i in range(summaries)],
+        Flashcard: [{"user_id": i % users + 1, "word": f"w{i}", "meaning": "m"} for i in range(users * 20)],
+    }
+    with engine.begin() as conn:
+        for model, values in rows.items():
+            conn.execute(insert(model), values)
+        conn.exec_driver_sql("ANALYZE" if engine.dialect.name == "sqlite" else "ANALYZE TABLE " + ", ".join(
+            model.__tablename__ for model in rows))
+
+
+def router_queries() -> dict:
+    """The filtered reads the routers run, built the same way the routers build them"""
+    cursor = encode_cursor(100, 100)
+    section_cursor = encode_cursor(1, 100)
+    return {
+        "GET /summaries/writer/{user_id}": keyset_statement(
+            select(Summary).where(Summary.user_id == 7), SUMMARY_KEY, cursor, 50),
+        "GET /summaries/writer/{user_id}?status_filter": keyset_statement(
+            select(Summary).where(Summary.user_id == 7, Summary.status == "approved"), SUMMARY_KEY, cursor, 50),
+        "GET /summaries/search/approved": keyset_statement(
+            select(Summary).where(Summary.status == "approved"), SUMMARY_KEY, cursor, 20),
+        "search: summary_ids_for_book": select(Summary.id).where(Summary.book_id == 3),
+        "GET /sections/by-summary/{summary_id}": keyset_statement(
+            select(ContentSection).where(ContentSection.summary_id == 5), SECTION_KEY, section_cursor, 50),
+        "GET /sections/by-summary/{summary_id} (validator)": select(
+            func.count(),
+            func.max(func.coalesce(ContentSection.updated_at, ContentSection.created_at)),
+            func.sum(ContentSection.section_id),
+            func.sum(ContentSection.version),
+        ).where(ContentSection.summary_id == 5),
+        "POST /cart-items/ (existing item)": select(CartItem).where(CartItem.cart_id == 3, CartItem.book_id == 2),
+        "GET /cart-items/me": owned_select(CartItem, 3).order_by(CartItem.id),
+        "get_owned(CartItem)": select(CartItem, models.cart.Cart.user_id).join(
+            models.cart.Cart, CartItem.cart_id == models.cart.Cart.id).where(CartItem.id == 42),
+        "GET /orders/": keyset_statement(select(Order).where(Order.user_id == 3), Keyset(Order.id, descending=True), cursor, 50),
+        "GET /order-details/": keyset_statement(owned_select(OrderDetail, 3), Keyset(OrderDetail.id), cursor, 50),
+        "comments by summary": select(Comment).where(Comment.summary_id == 5).order_by(Comment.id),
+        "GET /comments/{comment_id}/subtree": select(Comment).where(
+            Comment.path >= "0000000005/", Comment.path < "00000000050").order_by(Comment.path).limit(500),
+        "bundle: reading position": select(ReadingHistory).where(
+            ReadingHistory.user_id == 3, ReadingHistory.summary_id == 1).limit(1),
+        "bundle: notes": select(NoteHighlight).where(
+            NoteHighlight.user_id == 3, NoteHighlight.summary_id == 1).order_by(NoteHighlight.section_id),
+        "ratings: aggregates": select(Rating.summary_id, func.count(), func.sum(Rating.score)).where(
+            Rating.summary_id.in_([1, 2, 3])).group_by(Rating.summary_id),
+        "GET /flashcards/due": spaced_repetition.due_statement(3, 20, spaced_repetition.utcnow()),
+    }
+
+
+_SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+
+
+def explain(conn, stmt) -> tuple[list[str], list[str]]:
+    """Return (plan lines, tables read with a full scan)"""
+    sql = str(stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    if engine.dialect.name == "sqlite":
+        details = [row[3] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+        scans = [m.group(1) for m in map(_SQLITE_SCAN.match, details) if m]
+        return details, scans
+    rows = conn.exec_driver_sql("EXPLAIN " + sql).mappings().all()
+    details = [f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']} {row['Extra'] or ''}" for row in rows]
+    scans = [row["table"] for row in rows if row["type"] == "ALL"]
+    return details, scans
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=int, default=100, help="dataset size multiplier")
+    parser.add_argument("--seed", action="store_true", help="insert the sample dataset (always done for the temp SQLite file)")
+    parser.add_argument("--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args()
+
+    if engine.url.database == _DB_FILE:
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        seed(args.scale)
+    elif args.seed:
+        seed(args.scale)
+
+    failures = 0
+    with engine.connect() as conn:
+        for label, stmt in router_queries().items():
+            details, scans = explain(conn, stmt)
+            status = "FULL SCAN " + ", ".join(scans) if scans else "ok"
+            failures += bool(scans)
+            print(f"[{status:>9}] {label}")
+            if args.verbose or scans:
+                for line in details:
+                    print(f"             {line}")
+    print(f"{failures} of {len(router_queries())} queries do a full table scan on {engine.dialect.name}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
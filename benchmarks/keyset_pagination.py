@@ -0,0 +1,78 @@
+"""
+Benchmark: OFFSET vs keyset (cursor) pagination at increasing depth.
+Run: python benchmarks/keyset_pagination.py --rows 1000000 --page-size 50
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+_DB_FILE = os.path.join(tempfile.gettempdir(), "bench_keyset.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_FILE}")
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.core.pagination import Keyset, encode_cursor, keyset_statement, total_statement  # noqa: E402
+from app import models  # noqa: E402
+
+Book = models.book.Book
+
+
+def seed(rows: int, chunk: int = 50_000) -> None:
+    with SessionLocal() as db:
+        existing = db.scalar(select(func.count()).select_from(Book)) if engine.dialect.has_table(db.connection(), "books") else 0
+    if existing == rows:
+        return
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for start in range(0, rows, chunk):
+            conn.execute(
+                insert(Book),
+                [{"title": f"Book {i}", "price": Decimal("10.00"), "stock_quantity": i % 100}
+                 for i in range(start, min(start + chunk, rows))],
+            )
+
+
+def timed(db, stmt, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        db.execute(stmt).all()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    seed(args.rows)
+    key = Keyset(Book.id)
+    base = select(Book)
+    depths = sorted({0, 1_000, 10_000, 100_000, args.rows // 2, args.rows - args.page_size})
+    with SessionLocal() as db:
+        print(f"rows={args.rows} page_size={args.page_size} dialect={engine.dialect.name}")
+        for depth in depths:
+            offset_stmt = base.order_by(Book.id).offset(depth).limit(args.page_size)
+            # Cursor của dòng đứng ngay trước trang (id liên tục từ 1)
+            cursor = encode_cursor(depth, depth) if depth else None
+            keyset_stmt = keyset_statement(base, key, cursor, args.page_size)
+            offset_ms = timed(db, offset_stmt, args.repeat)
+            keyset_ms = timed(db, keyset_stmt, args.repeat)
+            print(f"depth={depth:>9}  offset={offset_ms:8.2f}ms  keyset={keyset_ms:6.2f}ms")
+        start = time.perf_counter()
+        total = db.execute(total_statement(base, engine.dialect.name)).scalar()
+        print(f"total estimate={total} in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
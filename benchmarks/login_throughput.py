@@ -0,0 +1,83 @@
+"""
+Benchmark: login throughput vs number of password-hashing worker processes.
+Run: python benchmarks/login_throughput.py --logins 200 --rounds 12
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--logins", type=int, default=200, help="logins per worker setting")
+parser.add_argument("--concurrency", type=int, default=100)
+parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost (BCRYPT_ROUNDS)")
+parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+args = parser.parse_args()
+
+_DB_FILE = os.path.join(tempfile.gettempdir(), "bench_login.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_FILE}")
+os.environ["BCRYPT_ROUNDS"] = str(args.rounds)
+os.environ["PASSWORD_HASH_MAX_QUEUE"] = str(args.concurrency)
+
+import httpx  # noqa: E402
+
+from app.main import app, _import_all_models  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.core.password_pool import password_pool  # noqa: E402
+from app.core.security import get_password_hash  # noqa: E402
+from app import models  # noqa: E402
+
+
+def seed() -> None:
+    _import_all_models()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        db.add(models.user.User(username="bench", email="bench@example.com", password_hash=get_password_hash("bench123")))
+        db.commit()
+    finally:
+        db.close()
+
+
+async def run(client: httpx.AsyncClient, logins: int, concurrency: int) -> tuple[float, int]:
+    sem = asyncio.Semaphore(concurrency)
+    rejected = 0
+
+    async def one():
+        nonlocal rejected
+        async with sem:
+            resp = await client.post("/auth/login", json={"email": "bench@example.com", "password": "bench123"})
+            if resp.status_code == 503:
+                rejected += 1
+            else:
+                resp.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(logins)))
+    return time.perf_counter() - start, rejected
+
+
+async def main():
+    seed()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=300) as client:
+        workers = 1
+        while workers <= args.max_workers:
+            password_pool.resize(workers)
+            await run(client, workers * 2, workers)  # spawn the worker processes before measuring
+            elapsed, rejected = await run(client, args.logins, args.concurrency)
+            print(
+                f"workers={workers:2} rounds={args.rounds} logins={args.logins} "
+                f"throughput={args.logins / elapsed:.1f}/s rejected(503)={rejected}"
+            )
+            workers *= 2
+    password_pool.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
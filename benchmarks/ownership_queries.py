@@ -0,0 +1,107 @@
+"""
+Query-count check for the ownership-scoped cart / order / order-detail routes.
+Run: python benchmarks/ownership_queries.py
+
+Mỗi route được gọi với principal đã nằm trong cache, đếm số câu SQL trên engine
+và so với ngân sách: đọc theo id chỉ được 1 query (resource + owner trong một
+JOIN), kể cả nhánh 403; các route ghi order-detail có thêm một INSERT vào
+interaction_events. Exit 1 nếu route nào vượt ngân sách hoặc sai status.
+"""
+import os
+import sys
+import tempfile
+from decimal import Decimal
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+_DB_FILE = os.path.join(tempfile.gettempdir(), "bench_ownership_queries.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_FILE}")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event, insert  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.database import Base, engine  # noqa: E402
+from app import models  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+
+OWNER, OTHER = 1, 2
+
+# (method, path, body, expected status, max queries)
+ROUTES = [
+    ("GET", "/carts/1", None, 200, 1),
+    ("GET", "/carts/2", None, 403, 1),
+    ("GET", "/cart-items/me", None, 200, 1),
+    ("GET", "/cart-items/1", None, 200, 1),
+    ("GET", "/cart-items/3", None, 403, 1),
+    ("GET", "/cart-items/999", None, 404, 1),
+    ("PUT", "/cart-items/1", {"quantity": 4}, 200, 3),
+    ("DELETE", "/cart-items/2", None, 200, 2),
+    ("GET", "/orders/1", None, 200, 1),
+    ("GET", "/orders/3", None, 403, 1),
+    ("PUT", "/orders/1", {"address": "somewhere"}, 200, 3),
+    ("GET", "/order-details/", None, 200, 1),
+    ("GET", "/order-details/1", None, 200, 1),
+    ("GET", "/order-details/3", None, 403, 1),
+    ("POST", "/order-details/", {"order_id": 1, "book_id": 1, "quantity": 1, "price": "5.00"}, 200, 4),
+    ("POST", "/order-details/", {"order_id": 3, "book_id": 1, "quantity": 1, "price": "5.00"}, 403, 1),
+    ("PUT", "/order-details/1", {"quantity": 2}, 200, 4),
+    ("DELETE", "/order-details/2", None, 200, 3),
+    ("DELETE", "/orders/2", None, 200, 3),
+]
+
+
+def seed() -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.user.User), [
+            {"id": OWNER, "username": "owner", "email": "owner@example.com", "password_hash": "x"},
+            {"id": OTHER, "username": "other", "email": "other@example.com", "password_hash": "x"},
+        ])
+        conn.execute(insert(models.book.Book), [{"id": 1, "title": "Book", "price": Decimal("5.00")},
+                                                {"id": 2, "title": "Book 2", "price": Decimal("7.00")}])
+        conn.execute(insert(models.cart.Cart), [{"id": 1, "user_id": OWNER}, {"id": 2, "user_id": OTHER}])
+        conn.execute(insert(models.cart_item.CartItem), [
+            {"id": 1, "cart_id": 1, "book_id": 1, "quantity": 1, "price": Decimal("5.00")},
+            {"id": 2, "cart_id": 1, "book_id": 2, "quantity": 1, "price": Decimal("7.00")},
+            {"id": 3, "cart_id": 2, "book_id": 1, "quantity": 1, "price": Decimal("5.00")},
+        ])
+        conn.execute(insert(models.order.Order), [
+            {"id": 1, "user_id": OWNER, "total_amount": Decimal("12.00")},
+            {"id": 2, "user_id": OWNER, "total_amount": Decimal("0.00")},
+            {"id": 3, "user_id": OTHER, "total_amount": Decimal("5.00")},
+        ])
+        conn.execute(insert(models.order_detail.OrderDetail), [
+            {"id": 1, "order_id": 1, "book_id": 1, "quantity": 1, "price": Decimal("5.00")},
+            {"id": 2, "order_id": 1, "book_id": 2, "quantity": 1, "price": Decimal("7.00")},
+            {"id": 3, "order_id": 3, "book_id": 1, "quantity": 1, "price": Decimal("5.00")},
+        ])
+
+
+def main():
+    seed()
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {create_access_token(subject=OWNER)}"}
+    client.get("/carts/me", headers=headers)  # nạp principal cache
+
+    counter = {"n": 0}
+
+    def before(*_args):
+        counter["n"] += 1
+
+    event.listen(engine, "before_cursor_execute", before)
+    failures = 0
+    for method, path, body, expected_status, budget in ROUTES:
+        counter["n"] = 0
+        resp = client.request(method, path, json=body, headers=headers)
+        ok = resp.status_code == expected_status and counter["n"] <= budget
+        failures += not ok
+        print(f"[{'ok' if ok else 'FAIL':>4}] {method:6} {path:22} status={resp.status_code} "
+              f"(want {expected_status}) queries={counter['n']} (budget {budget})")
+    print(f"{failures} of {len(ROUTES)} routes over budget or wrong status")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: item-item collaborative filtering at 100k users x 20k summaries.
+Run: python benchmarks/recommendations.py --users 100000 --summaries 20000 --per-user 20
+     python benchmarks/recommendations.py --write   # + ghi top-N vào recommendations và đo GET /recommendations/me
+
+Tương tác được sinh ngẫu nhiên với độ phổ biến theo phân phối Zipf (vài summary
+rất hot, phần đuôi dài), rồi chạy đúng các bước của app.services.recommender:
+dựng ma trận sparse, tính láng giềng cosine theo block, chấm điểm top-N cho mọi user.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+_DB_FILE = os.path.join(tempfile.gettempdir(), "bench_recommendations.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_FILE}")
+
+import numpy as np  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app import models  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.services import recommender  # noqa: E402
+
+
+def synthetic_interactions(users: int, summaries: int, per_user: int, seed: int = 5):
+    rng = np.random.default_rng(seed)
+    counts = rng.poisson(per_user, users).clip(1)
+    user_ids = np.repeat(np.arange(1, users + 1), counts)
+    popularity = 1.0 / np.arange(1, summaries + 1) ** 0.8
+    summary_ids = rng.choice(np.arange(1, summaries + 1), size=len(user_ids), p=popularity / popularity.sum())
+    weights = rng.choice(np.array([0.2, 0.6, 1.0], dtype=np.float32), size=len(user_ids))
+    return user_ids, summary_ids, weights
+
+
+def timed(label: str, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    print(f"{label:<28} {time.perf_counter() - start:8.2f}s")
+    return result
+
+
+def seed_database(users: int, summaries: int) -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.user.User), [
+            {"id": u, "username": f"u{u}", "email": f"u{u}@example.com", "password_hash": "x"}
+            for u in range(1, users + 1)
+        ])
+        conn.execute(insert(models.summary.Summary), [
+            {"id": s, "title": f"Summary {s}", "status": "approved"} for s in range(1, summaries + 1)
+        ])
+
+
+def measure_endpoint(users: int, requests: int) -> None:
+    client = TestClient(app)
+    rng = np.random.default_rng(1)
+    latencies = []
+    for user_id in rng.integers(1, users + 1, requests):
+        headers = {"Authorization": f"Bearer {create_access_token(subject=int(user_id))}"}
+        client.get("/recommendations/me", headers=headers)  # nạp principal cache
+        start = time.perf_counter()
+        resp = client.get("/recommendations/me", headers=headers)
+        latencies.append(time.perf_counter() - start)
+        assert resp.status_code == 200, resp.text
+    latencies.sort()
+    print(f"GET /recommendations/me      p50={statistics.median(latencies) * 1000:.1f}ms "
+          f"p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--summaries", type=int, default=20_000)
+    parser.add_argument("--per-user", type=int, default=20, help="mean interactions per user")
+    parser.add_argument("--top-n", type=int, default=20)
+    parser.add_argument("--neighbors", type=int, default=50)
+    parser.add_argument("--write", action="store_true", help="also bulk-write into SQLite and time the endpoint")
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    raw = synthetic_interactions(args.users, args.summaries, args.per_user)
+    interactions = timed("build matrix", recommender.build_matrix, *raw)
+    print(f"{'':<28} {interactions.matrix.shape[0]} users x {interactions.matrix.shape[1]} summaries, "
+          f"nnz={interactions.matrix.nnz}")
+    similar = timed("item neighbours (cosine)", recommender.item_neighbors, interactions.matrix, args.neighbors)
+    if not args.write:
+        ranked = timed("top-N for every user", lambda: list(
+            recommender.top_n(interactions.matrix, similar, args.top_n)))
+        print(f"{'':<28} {len(ranked)} users scored, {sum(len(items) for _, items, _ in ranked)} rows")
+        return
+
+    seed_database(args.users, args.summaries)
+    with SessionLocal() as db:
+        written = timed("top-N + bulk write", recommender.write_recommendations, db, interactions,
+                        recommender.top_n(interactions.matrix, similar, args.top_n))
+    print(f"{'':<28} {written} rows written")
+    measure_endpoint(args.users, args.requests)
+
+
+if __name__ == "__main__":
+    main()
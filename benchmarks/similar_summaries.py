@@ -0,0 +1,124 @@
+"""
+Benchmark: content-based similar-summaries index.
+Run: python benchmarks/similar_summaries.py --summaries 20000 --sections 3 --changed 100
+
+Sinh summary theo chủ đề (mỗi chủ đề có bộ từ riêng + từ chung), dựng index
+bằng app.services.similar, đo GET /summaries/{id}/similar (p50/p95) và tỉ lệ
+láng giềng cùng chủ đề (precision@10). Sau đó đổi chủ đề của một nhóm summary
+qua ORM (version của section tăng), so sánh update() theo fingerprint với một
+lần build() đầy đủ. Exit 1 nếu precision thấp hoặc update bỏ sót thay đổi.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+_DB_FILE = os.path.join(tempfile.gettempdir(), "bench_similar_summaries.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_FILE}")
+os.environ.setdefault("SIMILAR_INDEX_DIR", os.path.join(tempfile.gettempdir(), "bench_similar_index"))
+
+import numpy as np  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import insert, select  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app import models  # noqa: E402
+from app.services.similar import similar_index  # noqa: E402
+
+ContentSection = models.content_section.ContentSection
+
+COMMON = [f"chung{i}" for i in range(300)]
+
+
+def topic_words(topic: int) -> list[str]:
+    return [f"chude{topic}tu{i}" for i in range(40)]
+
+
+def paragraph(rng, topic: int, words: int) -> str:
+    own = rng.choice(topic_words(topic), size=words // 2)
+    shared = rng.choice(COMMON, size=words - words // 2)
+    return " ".join(np.concatenate([own, shared]))
+
+
+def seed(summaries: int, sections: int, words: int, topics: int, rng) -> np.ndarray:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    topic_of = rng.integers(0, topics, summaries + 1)
+    with engine.begin() as conn:
+        conn.execute(insert(models.summary.Summary), [
+            {"id": s, "title": f"Tóm tắt số {s}", "status": "approved"}
+            for s in range(1, summaries + 1)
+        ])
+        for start in range(1, summaries + 1, 2000):
+            conn.execute(insert(ContentSection), [
+                {"summary_id": s, "section_order": order, "title": f"Phần {order}",
+                 "content": paragraph(rng, int(topic_of[s]), words)}
+                for s in range(start, min(start + 2000, summaries + 1)) for order in range(1, sections + 1)
+            ])
+    return topic_of
+
+
+def precision(client, sample, topic_of, k: int = 10) -> tuple[float, list[float]]:
+    latencies, hits = [], []
+    for summary_id in sample:
+        start = time.perf_counter()
+        resp = client.get(f"/summaries/{summary_id}/similar", params={"limit": k})
+        latencies.append(time.perf_counter() - start)
+        assert resp.status_code == 200, resp.text
+        neighbours = [item["id"] for item in resp.json()]
+        hits.append(np.mean([topic_of[n] == topic_of[summary_id] for n in neighbours]) if neighbours else 0.0)
+    return float(np.mean(hits)), sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--summaries", type=int, default=20_000)
+    parser.add_argument("--sections", type=int, default=3)
+    parser.add_argument("--words", type=int, default=120, help="words per section")
+    parser.add_argument("--topics", type=int, default=200)
+    parser.add_argument("--changed", type=int, default=100, help="summaries moved to another topic")
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(11)
+    topic_of = seed(args.summaries, args.sections, args.words, args.topics, rng)
+    with SessionLocal() as db:
+        print("build          ", similar_index.build(db))
+    size = sum(os.path.getsize(os.path.join(similar_index.directory, name)) for name in os.listdir(similar_index.directory))
+    print(f"index on disk   {size / 1e6:.1f} MB ({similar_index.meta['rows']} rows x {similar_index.meta['dim']} float32)")
+
+    client = TestClient(app)
+    sample = rng.integers(1, args.summaries + 1, args.requests)
+    p_at_10, latencies = precision(client, sample, topic_of)
+    print(f"GET /summaries/{{id}}/similar p50={statistics.median(latencies) * 1000:.1f}ms "
+          f"p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}ms precision@10={p_at_10:.1%}")
+
+    moved = rng.choice(np.arange(1, args.summaries + 1), size=args.changed, replace=False)
+    with SessionLocal() as db:
+        sections = db.scalars(select(ContentSection).where(ContentSection.summary_id.in_(moved.tolist()))).all()
+        for section in sections:
+            new_topic = (int(topic_of[section.summary_id]) + 1) % args.topics
+            section.content = paragraph(rng, new_topic, args.words)
+        db.commit()
+    for summary_id in moved:
+        topic_of[summary_id] = (topic_of[summary_id] + 1) % args.topics
+
+    with SessionLocal() as db:
+        stats = similar_index.update(db)
+    print("update         ", stats)
+    moved_precision, _ = precision(client, moved, topic_of)
+    print(f"moved summaries precision@10={moved_precision:.1%}")
+    with SessionLocal() as db:
+        print("full rebuild   ", similar_index.build(db))
+
+    failed = p_at_10 < 0.9 or moved_precision < 0.9 or stats["changed"] != args.changed
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
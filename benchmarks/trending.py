@@ -0,0 +1,151 @@
+"""
+Benchmark: time-decayed trending leaderboard.
+Run: python benchmarks/trending.py --summaries 20000 --categories 50 --events 1000000 --live-events 20000
+
+Phát lại các sự kiện đọc / rating / comment rải đều trong vài ngày qua (độ phổ
+biến theo Zipf) vào app.core.trending, đo throughput record(), thời gian
+compaction (ghi trending_buckets + nạp lại bằng một query), latency top() và
+GET /summaries/trending. Kết quả được so với điểm decay tính lại bằng NumPy từ
+toàn bộ sự kiện: trước compaction phải khớp tuyệt đối, sau compaction (gom theo
+bucket) overlap top-20 phải >= 90%. Exit 1 nếu không đạt.
+"""
+import argparse
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+_DB_FILE = os.path.join(tempfile.gettempdir(), "bench_trending.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_FILE}")
+
+import numpy as np  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.database import Base, engine  # noqa: E402
+from app import models  # noqa: E402
+from app.config import TRENDING_HALF_LIFE_HOURS  # noqa: E402
+from app.core.trending import EVENT_WEIGHTS, trending  # noqa: E402
+from app.models.trending import TrendingBucket  # noqa: E402
+
+EVENTS = list(EVENT_WEIGHTS)
+
+
+def seed(summaries: int, categories: int, rng) -> np.ndarray:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    category_of = rng.integers(1, categories + 1, summaries + 1)
+    with engine.begin() as conn:
+        conn.execute(insert(models.category.Category), [
+            {"id": c, "category_name": f"Category {c}"} for c in range(1, categories + 1)
+        ])
+        conn.execute(insert(models.book.Book), [
+            {"id": s, "title": f"Book {s}", "price": 0, "category_id": int(category_of[s])} for s in range(1, summaries + 1)
+        ])
+        conn.execute(insert(models.summary.Summary), [
+            {"id": s, "title": f"Summary {s}", "book_id": s, "status": "approved"} for s in range(1, summaries + 1)
+        ])
+    return category_of
+
+
+def expected_top(summary_ids, weights, times, now, k, mask=None) -> list[int]:
+    rate = math.log(2) / (TRENDING_HALF_LIFE_HOURS * 3600)
+    scores = np.bincount(summary_ids, weights=weights * np.exp(-rate * (now - times)))
+    if mask is not None:
+        scores = np.where(mask[:len(scores)], scores, 0)
+    order = np.lexsort((np.arange(len(scores)), -scores))
+    return [int(i) for i in order[:k] if scores[i] > 0]
+
+
+def overlap(a: list[int], b: list[int]) -> float:
+    return len(set(a) & set(b)) / max(len(b), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--summaries", type=int, default=20_000)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--days", type=float, default=3)
+    parser.add_argument("--live-events", type=int, default=20_000)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(8)
+    category_of = seed(args.summaries, args.categories, rng)
+    popularity = 1.0 / np.arange(1, args.summaries + 1) ** 0.9
+    summary_ids = rng.choice(np.arange(1, args.summaries + 1), size=args.events, p=popularity / popularity.sum())
+    now = time.time()
+    times = np.sort(now - rng.uniform(0, args.days * 86400, args.events))
+    kinds = rng.choice(len(EVENTS), size=args.events, p=[0.85, 0.05, 0.10])
+    weights = np.array([EVENT_WEIGHTS[e] for e in EVENTS])[kinds]
+
+    trending.compact(engine)  # nạp category rỗng, epoch = bây giờ
+    start = time.perf_counter()
+    for summary_id, kind, at in zip(summary_ids.tolist(), kinds.tolist(), times.tolist()):
+        trending.record(summary_id, EVENTS[kind], at=at)
+    elapsed = time.perf_counter() - start
+    print(f"record()            {args.events / elapsed:,.0f} events/s ({elapsed:.1f}s)")
+
+    want = expected_top(summary_ids, weights, times, now, args.top)
+    got = [summary_id for summary_id, _ in trending.top(args.top)]
+    exact_before = got == want
+    print(f"top-{args.top} before compaction matches brute force: {exact_before}")
+
+    start = time.perf_counter()
+    kept = trending.compact(engine)
+    print(f"compaction (backfill) {time.perf_counter() - start:.2f}s, {kept} summaries kept")
+    with engine.connect() as conn:
+        print(f"trending_buckets    {conn.scalar(select(func.count()).select_from(TrendingBucket))} rows")
+
+    # Một chu kỳ bình thường: vài chục nghìn lượt đọc mới rồi compaction
+    live = rng.choice(np.arange(1, args.summaries + 1), size=args.live_events, p=popularity / popularity.sum())
+    for summary_id in live.tolist():
+        trending.record(summary_id, "read")
+    start = time.perf_counter()
+    trending.compact(engine)
+    print(f"compaction (steady)   {time.perf_counter() - start:.2f}s after {args.live_events} new reads")
+    summary_ids = np.concatenate([summary_ids, live])
+    weights = np.concatenate([weights, np.full(len(live), EVENT_WEIGHTS["read"])])
+    times = np.concatenate([times, np.full(len(live), time.time())])
+
+    now = time.time()
+    global_overlap = overlap([i for i, _ in trending.top(args.top)], expected_top(summary_ids, weights, times, now, args.top))
+    category_overlaps = []
+    for category_id in range(1, min(args.categories, 10) + 1):
+        mask = category_of == category_id
+        category_overlaps.append(overlap(
+            [i for i, _ in trending.top(args.top, category_id)],
+            expected_top(summary_ids, weights, times, now, args.top, mask),
+        ))
+    print(f"after compaction    global overlap {global_overlap:.0%}, category overlap {np.mean(category_overlaps):.0%}")
+
+    start = time.perf_counter()
+    for _ in range(10_000):
+        trending.top(args.top, int(rng.integers(1, args.categories + 1)))
+    print(f"top()               {(time.perf_counter() - start) / 10_000 * 1e6:.1f}us per call")
+
+    client = TestClient(app)
+    latencies = []
+    for category_id in rng.integers(0, args.categories + 1, args.requests):
+        params = {"limit": args.top, **({"category_id": int(category_id)} if category_id else {})}
+        started = time.perf_counter()
+        resp = client.get("/summaries/trending", params=params)
+        latencies.append(time.perf_counter() - started)
+        assert resp.status_code == 200 and resp.json(), resp.text
+    latencies.sort()
+    print(f"GET /summaries/trending p50={statistics.median(latencies) * 1000:.1f}ms "
+          f"p95={latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}ms")
+
+    failed = not exact_before or global_overlap < 0.9 or np.mean(category_overlaps) < 0.9
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()